@@ -5,6 +5,8 @@ from threading import Thread
 
 import scripts.config as config
 import scripts.data.acquisition.read_data as read_data
+from scripts.data.acquisition.acquisition_process import AcquisitionProcess
+from scripts.data.visualisation.dashboard_process import DashboardProcess
 from scripts.mvc.controllers import ConfigController, GameController
 from scripts.mvc.models import ConfigData
 from scripts.mvc.view import ConfigView, GameView
@@ -30,29 +32,64 @@ class App(tk.Tk):
         self.game_window = None
         self.config_window = ConfigWindow(self)
         self.thread = None
+        self.acquisition_process = None
+        self.dashboard_process = None
 
         self.__update_controllers()
         self.update()
 
     def __update_controllers(self):
         """Calls the update method of the controllers"""
+        if self.acquisition_process:
+            self.acquisition_process.poll()
+            if self.acquisition_process.failed:
+                self.config_window.config_controller.on_acquisition_failed()
         self.config_window.config_controller.update()
         self.after(5, self.__update_controllers)
 
     def create_game_window(self):
-        """Creates the second window (game window) and starts the associated read data thread"""
+        """
+        Creates the second window (game window) and starts the associated read data thread or process and the
+        dashboard process if it is enabled in the config
+        """
         self.game_window = GameWindow(self)
-        # Starting the thread to read data
-        self.thread = Thread(target=read_data.init, args=[self.data_model], daemon=True)
-        self.thread.start()
+        # the rings and the dashboard need the sampling rate and the channels of a replay before the acquisition starts
+        read_data.configure_stream()
+        if config.ACQUISITION_PROCESS:
+            # Starting the worker process to read data
+            self.acquisition_process = AcquisitionProcess(self.data_model)
+            self.acquisition_process.start()
+            telemetry_ring, sample_ring = self.acquisition_process.telemetry_ring, self.acquisition_process.sample_ring
+        else:
+            if config.DASHBOARD:
+                read_data.share_rings()
+            # Starting the thread to read data
+            self.thread = Thread(target=read_data.init, args=[self.data_model], daemon=True)
+            self.thread.start()
+            telemetry_ring, sample_ring = read_data.telemetry_ring, read_data.sample_ring
+        if config.DASHBOARD:
+            channel_names = read_data.channel_names if read_data.live_Data else read_data.chan_labels
+            self.dashboard_process = DashboardProcess(telemetry_ring, sample_ring, channel_names,
+                                                      read_data.SAMPLING_RATE)
+            self.dashboard_process.start()
         self.__data_model.session_recording = True
 
     def destroy_game_window(self):
-        """Destroys the second window (game window) and stops the associated read data thread"""
+        """Destroys the second window (game window) and stops the associated read data thread or process"""
         self.game_window.destroy()
         self.game_window = None
         self.__data_model.session_recording = False
-        self.thread.join()
+        # the dashboard has to detach from the rings before they are freed
+        if self.dashboard_process:
+            self.dashboard_process.join()
+            self.dashboard_process = None
+        if self.acquisition_process:
+            self.acquisition_process.join()
+            self.acquisition_process = None
+        else:
+            self.thread.join()
+            if config.DASHBOARD:
+                read_data.release_rings()
 
     @property
     def data_model(self):
@@ -21,9 +21,46 @@ NOTCH_FILTER = False
 
 # Read Data
 SESSION_RECORDING = True
+ACQUISITION_POLL_INTERVAL = 4  # in ms, time to wait before the board is asked again for new samples
+ACQUISITION_PROCESS = False  # run the data acquisition and the algorithm in a separate process
+REPLAY_SPEED: float = 1  # speed of a session replay, 1 = real time, n = n times faster, 0 = as fast as possible
+REPLAY_BLOCK_SIZE = 25  # maximal amount of samples which are replayed at once
+LATENCY_RECORDING = True  # record the latency of each processing stage, the summary is printed at the session end
+LATENCY_RECORD_SIZE = 10000  # amount of windows which are recorded
+TELEMETRY_RING_SIZE = 1024  # amount of windows the telemetry ring (live plot, loggers, metrics) can hold
+LIVE_PLOT_MAX_FPS = 20  # maximal frame rate of the live plot, further updates are skipped until the next frame
+DASHBOARD = False  # show the pyqtgraph dashboard (liveplot.py) in a separate process, needs pyqtgraph and PyQt5
+DASHBOARD_FPS = 60  # frame rate of the dashboard
+DASHBOARD_EEG_DURATION = 5  # in s, time span of the scrolling EEG traces of the dashboard
+
+# Synthetic Board, generates EEG data with mu rhythm modulation on C3/C4 instead of reading the headset
+SYNTHETIC_BOARD = False
+SYNTHETIC_CHANNELS = 16
+SYNTHETIC_SAMPLING_RATE = 125  # in Hz
+SYNTHETIC_NOISE: float = 5  # standard deviation of the noise in uV
+SYNTHETIC_MU_AMPLITUDE: float = 10  # amplitude of the mu rhythm on C3 and C4 in uV
+SYNTHETIC_ERD: float = 0.5  # relative decrease (ERD) / increase (ERS) of the mu amplitude during motor imagery
+SYNTHETIC_SCHEDULE = [('rest', 4), ('left', 4), ('rest', 4), ('right', 4)]  # repeated (game direction, duration in s)
+
+# Live Filter
+LIVE_BANDSTOP_FILTER = True
+LIVE_BANDSTOP_FREQ: float = 50  # center of the stop band in Hz
+LIVE_BANDSTOP_WIDTH: float = 4  # width of the stop band in Hz
+LIVE_BANDPASS_FILTER = False
+LIVE_BANDPASS_FREQ: [float, float] = [1, 40]  # lower and upper edge of the pass band in Hz
+LIVE_FILTER_ORDER = 4
 
 # Algorithm
 WEIGHT = 1
+BURG_ORDER = 10  # order of the autoregressive model of the burg psd method
+BURG_FREQ_STEP: float = 0.25  # in Hz, resolution of the frequency grid the burg psd is evaluated on
+HCON_NORMALIZATION_MODE = 'calibration'  # baseline of the hcon standardization: calibration | exponential | sliding
+HCON_NORMALIZATION_TIME: float = 30  # in s, duration of the calibration baseline / sliding window / exponential span
+SDFT_RESYNC_INTERVAL = 250  # windows after which the sliding dft is recalculated from scratch to bound numerical drift
+# additional bands, whose band power is integrated from the spectrum of the control band: name -> (f_min, f_max) in Hz,
+# e.g. {'mu': (8, 12), 'beta': (13, 30)}, the spectrum is widened to cover all bands, None to estimate only f_min - f_max
+FREQUENCY_BANDS: dict = None
+CSP_FILTERS: str = None  # path of spatial filters trained with scripts/data/analysis/csp.py, None for the laplacian
 
 # channel configuration of the headset we use
 BCI_CHANNELS = ['C3', 'Cz', 'C4', 'P3', 'Pz', 'P4', 'O1', 'O2', 'FC5', 'FC1', 'FC2', 'FC6', 'CP5', 'CP1', 'CP2',
@@ -0,0 +1,149 @@
+import multiprocessing
+import threading
+import time
+
+import numpy as np
+
+import scripts.data.acquisition.read_data as read_data
+from scripts.data.visualisation.liveplot_matlab import connect_telemetry
+from scripts.data.extraction import trial_handler
+from scripts.mvc.models import ConfigData
+from scripts.utils.control_channel import channel as control_channel
+from scripts.utils.latency import Stage, recorder as latency_recorder
+from scripts.utils.shared_ring import SharedRing
+from scripts.utils.telemetry import create_telemetry_ring
+
+"""
+Script to run the data acquisition and the cursor control algorithm in a separate process.
+The samples and the control outputs are passed to the UI process through shared memory rings.
+"""
+
+# record of the control ring: time stamps (time.perf_counter) of the acquisition of the newest sample and of the
+# emission of the window and the calculated label (0 = left, 1 = right, -1 = none)
+CONTROL_RECORD = np.dtype([('acquisition_time', 'f8'), ('emit_time', 'f8'), ('label', 'i1')])
+CONTROL_RING_SIZE = 1024  # amount of control records
+SAMPLE_RING_DURATION = 10  # in s, amount of samples the sample ring can hold
+JOIN_TIMEOUT = 5  # in s, time the worker gets to stop the stream before the process is terminated
+
+
+class AcquisitionProcess:
+    """
+    Runs read_data in a worker process, so the acquisition and the signal processing get their own core and don't
+    compete with the Tk game loop for the GIL.
+
+    The worker writes the samples into the sample ring, the label of every window into the control ring and the
+    telemetry of every window into the telemetry ring, which is read by the live plot.
+    Only the samples, the labels and the telemetry cross to the UI process. The sliding windows are not shared, they
+    are created and processed in the worker.
+    The UI process calls poll() periodically on the Tk main thread, which posts the control events and passes the
+    samples to the trial_handler, and checks failed, because the board is only connected by the worker.
+    """
+
+    def __init__(self, data_model: ConfigData):
+        """
+        Constructor method, creates the shared memory rings
+        :param ConfigData data_model: data model, a copy of it is passed to the worker process
+        """
+        self.data_model = data_model
+        if read_data.live_Data:
+            trial_handler.set_stream_properties(read_data.NUMBER_CHANNELS, read_data.SAMPLING_RATE)
+        self.control_ring = SharedRing(CONTROL_RING_SIZE, dtype=CONTROL_RECORD)
+        self.sample_ring = SharedRing(int(read_data.SAMPLING_RATE * SAMPLE_RING_DURATION),
+                                      record_shape=(read_data.NUMBER_CHANNELS,))
+        self.control_reader = self.control_ring.reader()
+        self.sample_reader = self.sample_ring.reader()
+        self.telemetry_ring = create_telemetry_ring(shared=True)
+        self.first_data = True
+        latency_recorder.reset()
+
+        # spawn instead of fork, forking the process with the running Tk interpreter is not safe
+        context = multiprocessing.get_context('spawn')
+        self.stop_event = context.Event()
+        self.failed_event = context.Event()
+        self.process = context.Process(target=run_acquisition, daemon=True,
+                                       args=(data_model, self.control_ring.spec, self.sample_ring.spec,
+                                             self.telemetry_ring.spec, self.stop_event, self.failed_event))
+
+    def start(self):
+        """Starts the worker process"""
+        read_data.acquisition_process = self
+        connect_telemetry(self.telemetry_ring)
+        self.process.start()
+
+    def stop(self):
+        """Signals the worker process to stop the stream"""
+        self.stop_event.set()
+
+    def join(self):
+        """
+        Waits for the worker process and frees the shared memory.
+        A worker which does not stop within JOIN_TIMEOUT is terminated, so it cannot block the Tk main thread.
+        """
+        self.stop()
+        self.process.join(JOIN_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.poll()
+        self.control_ring.close()
+        self.sample_ring.close()
+        self.telemetry_ring.close()
+        read_data.acquisition_process = None
+
+    @property
+    def failed(self) -> bool:
+        """True if the worker could not connect the board or terminated with an error"""
+        return self.failed_event.is_set() or self.process.exitcode not in (None, 0)
+
+    def poll(self):
+        """
+        Reads all new records of the rings, has to be called periodically on the Tk main thread
+            (1) sends the move commands of the calculated labels to the game loop (see control_channel)
+            (2) sends the samples to the trial_handler if trial recording is wished
+        """
+        for record in self.control_reader.read():
+            latency_recorder.begin(record['acquisition_time'], record['emit_time'])
+            if record['label'] in (0, 1):
+                control_channel.send(int(record['label']))
+                latency_recorder.mark(Stage.post_event)
+
+        samples = self.sample_reader.read()
+        if len(samples) and self.data_model.trial_recording and read_data.live_Data:
+            if self.first_data:
+                trial_handler.send_raw_data(samples.T, start=time.time())
+                self.first_data = False
+            else:
+                trial_handler.send_raw_data(samples.T)
+
+
+def run_acquisition(data_model: ConfigData, control_spec: dict, sample_spec: dict, telemetry_spec: dict, stop_event,
+                    failed_event):
+    """
+    Entry point of the worker process: connects the board and runs read_data until the stop event is set
+    :param ConfigData data_model: data model
+    :param dict control_spec: spec of the shared control ring
+    :param dict sample_spec: spec of the shared sample ring
+    :param dict telemetry_spec: spec of the shared telemetry ring
+    :param stop_event: multiprocessing.Event to stop the stream
+    :param failed_event: multiprocessing.Event, which is set if the board could not be connected
+    """
+    read_data.is_acquisition_process = True
+    read_data.control_ring = SharedRing.attach(control_spec)
+    read_data.sample_ring = SharedRing.attach(sample_spec)
+    read_data.telemetry_ring = SharedRing.attach(telemetry_spec)
+    try:
+        if read_data.init_board():
+            threading.Thread(target=_stop_on_event, args=[stop_event], daemon=True).start()
+            read_data.init(data_model)
+        else:
+            failed_event.set()
+    finally:
+        read_data.control_ring.close()
+        read_data.sample_ring.close()
+        read_data.telemetry_ring.close()
+
+
+def _stop_on_event(stop_event):
+    stop_event.wait()
+    read_data.stop_stream()
+
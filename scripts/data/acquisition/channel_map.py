@@ -0,0 +1,85 @@
+from typing import List
+
+import numpy as np
+
+import scripts.config as config
+
+""" Script to select and reorder the channels of the sliding windows for the cursor control algorithm """
+
+
+def get_channel_weights(channel_names: List[str]) -> List[int]:
+    """
+    Looks up the weight of each channel in the channel configuration of the headset (BCI_CHANNELS, CH_NAMES_WEIGHT)
+    :param List[str] channel_names: names of the channels
+    :return: List[int]: weight of each channel, 0 for channels which are not part of the configuration
+    """
+    weights = dict(zip(config.BCI_CHANNELS, config.CH_NAMES_WEIGHT))
+    return [weights.get(name, 0) for name in channel_names]
+
+
+def get_laplacian_groups(channel_names: List[str]):
+    """
+    Divides the channels into the areas around C3 and C4.
+    Channels with an even number in the name belong to C4, with an odd number to C3 and channels without a number
+    (midline) to both.
+    :param List[str] channel_names: names of the channels
+    :return: 2 index arrays of the channels around C3 and C4
+    """
+    channels_around_c3 = list()
+    channels_around_c4 = list()
+    for i, name in enumerate(channel_names):
+        c = name[-1]
+        if not c.isnumeric() or int(c) % 2 == 1:
+            channels_around_c3.append(i)
+        if not c.isnumeric() or int(c) % 2 == 0:
+            channels_around_c4.append(i)
+    return np.asarray(channels_around_c3, dtype=int), np.asarray(channels_around_c4, dtype=int)
+
+
+class ChannelMap:
+    """
+    Channel layout of the sliding windows, compiled once per session.
+
+    The map contains the indices of the used channels (weight != 0) with C3 at position 0 and C4 at position 1,
+    followed by the other channels in their original order. Additionally the positions of the channels around C3 and
+    C4 (see get_laplacian_groups) in the selected window are precompiled for the spatial filtering.
+    """
+
+    def __init__(self, channel_names: List[str], weights: List[int] = None):
+        """
+        Constructor method
+        :param List[str] channel_names: names of the channels (rows) of the sliding windows
+        :param List[int] weights: weight of each channel, channels with weight 0 are not used,
+            None to look up the weights in the config
+        :raise ValueError: if C3 or C4 is not a used channel
+        """
+        if weights is None:
+            weights = get_channel_weights(channel_names)
+        used = [i for i in range(len(channel_names)) if weights[i] != 0]
+        used_names = [channel_names[i] for i in used]
+        for name in ('C3', 'C4'):
+            if name not in used_names:
+                raise ValueError(f'Channel {name} is missing in {used_names}')
+        c3 = used[used_names.index('C3')]
+        c4 = used[used_names.index('C4')]
+
+        self.indices = np.asarray([c3, c4] + [i for i in used if i not in (c3, c4)], dtype=int)
+        self.names = [channel_names[i] for i in self.indices]
+        # positions in the selected window, the surrounding channels start at position 2
+        self.channels_around_c3, self.channels_around_c4 = [group + 2 for group in get_laplacian_groups(self.names[2:])]
+        self.__buffer = None
+
+    def __len__(self):
+        return len(self.indices)
+
+    def select(self, window: np.ndarray) -> np.ndarray:
+        """
+        Selects and reorders the channels of a window.
+        The result is written into a buffer, which is reused for the next window of the same size.
+        :param np.ndarray window: channels x samples window
+        :return: np.ndarray: used channels x samples window, only valid until the next call
+        """
+        shape = (len(self.indices), window.shape[1])
+        if self.__buffer is None or self.__buffer.shape != shape or self.__buffer.dtype != window.dtype:
+            self.__buffer = np.empty(shape, dtype=window.dtype)
+        return np.take(window, self.indices, axis=0, out=self.__buffer)
@@ -1,24 +1,36 @@
 import platform
 import time
+from typing import Union
 
 import brainflow
 import numpy as np
 import serial
 import serial.tools.list_ports
 from brainflow.board_shim import BoardShim, BrainFlowInputParams, BrainFlowError
-from numpy_ringbuffer import RingBuffer
 
 import scripts.config as config
+from scripts.data.acquisition.channel_map import ChannelMap
+from scripts.data.acquisition.replay import SessionReplay
+from scripts.data.acquisition.synthetic_board import SyntheticBoard, get_synthetic_channel_names
+from scripts.data.acquisition.stream_filter import StreamFilter, create_stream_filter
+from scripts.data.acquisition.window_buffer import WindowBuffer
+from scripts.data.analysis.csp import load_csp_filters
+from scripts.data.analysis.cursor_control_algorithm import CursorControlPipeline
+from scripts.data.analysis.normalization import create_hcon_normalizer
 from scripts.data.extraction import trial_handler
-from scripts.data.loader.game_dataset_loader import get_channel_rawdata
+from scripts.data.loader.game_dataset_loader import get_session_meta, load_raw_data, to_idxs_of_list_str
+from scripts.data.visualisation.liveplot_matlab import connect_telemetry
 from scripts.mvc.models import ConfigData
-from scripts.utils.QueueManager import QueueManager
+from scripts.utils.latency import recorder as latency_recorder
+from scripts.utils.shared_ring import SharedRing
+from scripts.utils.telemetry import create_telemetry_ring
 
 """ Script to read Data from the OpenBci-Headset and creating the Sliding-Windows """
 
 # constants
 live_Data = True  # boolean to replay a recorded session with session_file_name as file name
 session_file_name = 'session-1-05052022-154258.npz'
+session_path = '../scripts/data/session/' + session_file_name
 chan_labels = ['C3', 'C4', 'FC5', 'FC1', 'FC2', 'FC6', 'CP5', 'CP1', 'CP2', 'CP6']
 
 SAMPLING_RATE = BoardShim.get_sampling_rate(brainflow.board_shim.BoardIds.CYTON_DAISY_BOARD) if live_Data else 125
@@ -35,17 +47,31 @@ OFFSET_SAMPLES: int  # size of offset in amount of samples, *8ms for time
 NUMBER_CHANNELS = len(BoardShim.get_eeg_channels(
     brainflow.board_shim.BoardIds.CYTON_DAISY_BOARD)) if live_Data else len(chan_labels)
 
+# rows of the board data which contain the eeg channels and the names of these channels
+eeg_channels = BoardShim.get_eeg_channels(brainflow.board_shim.BoardIds.CYTON_DAISY_BOARD)
+channel_names = config.BCI_CHANNELS
+
 # global variables
 allow_window_creation = True
-first_window = True
+samples_until_window: int  # amount of samples which are missing until the next sliding window gets emitted
 first_data = True
 stream_available = False  # indicates if stream is available
 
-board: BoardShim
-window_buffer: RingBuffer
+# multiprocessing mode (see acquisition_process)
+is_acquisition_process = False  # indicates if this module runs in the worker process
+acquisition_process = None  # AcquisitionProcess in the UI process, used to stop the worker
+control_ring: SharedRing = None  # receives the calculated label of each window in the worker process
+sample_ring: SharedRing = None  # receives the samples in the worker process or for the dashboard (see share_rings)
+
+board: Union[BoardShim, SyntheticBoard]
+window_buffer: WindowBuffer
+channel_map: ChannelMap
+pipeline: CursorControlPipeline
+stream_filter: StreamFilter
 data_model: ConfigData
 
-queue_manager = QueueManager()
+# telemetry of the algorithm, in the worker process the shared ring of the AcquisitionProcess is attached instead
+telemetry_ring: SharedRing = create_telemetry_ring()
 
 
 def init(data_mdl):
@@ -57,29 +83,86 @@ def init(data_mdl):
     (3) starts the data acquisition
     :param Any data_mdl: data model object
     """
-    queue_manager.connect_queues()
-    global data_model, first_window
+    # the live plot is only available in the UI process, in process mode the AcquisitionProcess connects it
+    if not is_acquisition_process:
+        connect_telemetry(telemetry_ring)
+    global data_model
     data_model = data_mdl
-    first_window = True
+    # the window sizes depend on the sampling rate of the recorded session
+    session_meta = configure_stream()
 
-    global SLIDING_WINDOW_DURATION, SLIDING_WINDOW_SAMPLES, OFFSET_DURATION, OFFSET_SAMPLES, TIME_FOR_ONE_SAMPLE, window_buffer, NUMBER_CHANNELS
+    global SLIDING_WINDOW_DURATION, SLIDING_WINDOW_SAMPLES, OFFSET_DURATION, OFFSET_SAMPLES, window_buffer, NUMBER_CHANNELS
+    global samples_until_window, stream_filter, channel_map, pipeline
     SLIDING_WINDOW_DURATION = data_model.window_size / 1000
     SLIDING_WINDOW_SAMPLES = int(SLIDING_WINDOW_DURATION / TIME_FOR_ONE_SAMPLE)
     OFFSET_DURATION = data_model.window_offset / 1000
     OFFSET_SAMPLES = int(OFFSET_DURATION / TIME_FOR_ONE_SAMPLE)
-    window_buffer = [RingBuffer(capacity=SLIDING_WINDOW_SAMPLES, dtype=float) for _ in range(NUMBER_CHANNELS)]
+    window_buffer = WindowBuffer(NUMBER_CHANNELS, SLIDING_WINDOW_SAMPLES)
+    # the first window is emitted as soon as the buffer is filled, afterwards every OFFSET_SAMPLES
+    samples_until_window = SLIDING_WINDOW_SAMPLES
+    stream_filter = create_stream_filter(NUMBER_CHANNELS, SAMPLING_RATE)
+    # the channels used by the algorithm (C3 and C4 first) are selected with one precompiled index array
+    channel_map = ChannelMap(channel_names if live_Data else chan_labels)
+    spatial_filter = load_csp_filters(config.CSP_FILTERS, channel_map.names) if config.CSP_FILTERS else None
+    # in the worker process the labels are passed to the UI process via the control ring, which sends the commands
+    pipeline = CursorControlPipeline(channel_map.names, SAMPLING_RATE, data_model,
+                                     create_hcon_normalizer(SLIDING_WINDOW_DURATION, OFFSET_DURATION),
+                                     emit_events=not is_acquisition_process, bands=config.FREQUENCY_BANDS,
+                                     spatial_filter=spatial_filter, record_latency=True)
+    latency_recorder.reset()
 
     if live_Data:
+        trial_handler.set_stream_properties(NUMBER_CHANNELS, SAMPLING_RATE)
         try:
             handle_samples()
         except BrainFlowError as err:
             print(err.args[0])
     else:
-        path = '../scripts/data/session/' + session_file_name
-        chan_data, label_data = get_channel_rawdata(session_path=path, ch_names=chan_labels)
+        # the raw data is memory-mapped, the replay reads only the samples of the current block from disk
+        raw_data = load_raw_data(session_path)
+        replay = SessionReplay(raw_data, SAMPLING_RATE, speed=config.REPLAY_SPEED, block_size=config.REPLAY_BLOCK_SIZE,
+                               channel_indices=to_idxs_of_list_str(chan_labels, session_meta['channels']))
         global stream_available
         stream_available = True
-        handle_samples(chan_data)
+        handle_samples(replay)
+        print(f'Replayed {replay.virtual_time:.1f}s of the session in {replay.elapsed_time:.1f}s')
+
+
+def configure_stream():
+    """
+    Sets the sampling rate and the amount of channels of a replay to the ones of the recorded session, live data keeps
+    the ones of the board. Called by init() and by the UI process before the rings and the dashboard are created,
+    because init() runs later on the acquisition thread or in the worker process.
+    :return: dict: metadata of the recorded session, None for live data
+    """
+    global SAMPLING_RATE, TIME_FOR_ONE_SAMPLE, NUMBER_CHANNELS
+    if live_Data:
+        return None
+    session_meta = get_session_meta(session_path)
+    SAMPLING_RATE = session_meta['sampling_rate']
+    TIME_FOR_ONE_SAMPLE = 1 / SAMPLING_RATE
+    NUMBER_CHANNELS = len(chan_labels)
+    return session_meta
+
+
+def share_rings():
+    """
+    Places the telemetry and the samples in shared memory, so the dashboard process can attach them.
+    Only needed if the acquisition runs in a thread, the rings of the AcquisitionProcess are already shared.
+    Has to be called after configure_stream() and before init().
+    """
+    global telemetry_ring, sample_ring
+    telemetry_ring = create_telemetry_ring(shared=True)
+    sample_ring = SharedRing(int(SAMPLING_RATE * config.DASHBOARD_EEG_DURATION), record_shape=(NUMBER_CHANNELS,))
+
+
+def release_rings():
+    """Frees the shared rings of share_rings(), has to be called after the acquisition thread has finished"""
+    global telemetry_ring, sample_ring
+    telemetry_ring.close()
+    sample_ring.close()
+    telemetry_ring = create_telemetry_ring()
+    sample_ring = None
 
 
 def init_board():
@@ -88,14 +171,22 @@ def init_board():
     (1) Search for the serial port
     (2) Board get initialized
     (3) Data stream get started
+    If SYNTHETIC_BOARD is set in the config, a SyntheticBoard is used instead of the headset.
     :return: bool: says if the connection was successful
     """
 
+    if live_Data and config.SYNTHETIC_BOARD:
+        init_synthetic_board()
+        return True
+
     if live_Data:
         params = BrainFlowInputParams()
         params.serial_port = search_port()
 
-        if params.serial_port is not None:
+        if params.serial_port is not None and config.ACQUISITION_PROCESS and not is_acquisition_process:
+            # the board is connected later by the worker process
+            return True
+        elif params.serial_port is not None:
             # BoardShim.enable_dev_board_logger()
             global board, stream_available
             board = BoardShim(brainflow.board_shim.BoardIds.CYTON_DAISY_BOARD, params)
@@ -113,6 +204,22 @@ def init_board():
     return True
 
 
+def init_synthetic_board():
+    """Initializes and starts a SyntheticBoard as configured in the config instead of the headset"""
+    global board, stream_available, SAMPLING_RATE, TIME_FOR_ONE_SAMPLE, NUMBER_CHANNELS, eeg_channels, channel_names
+    channel_names = get_synthetic_channel_names(config.SYNTHETIC_CHANNELS, config.BCI_CHANNELS)
+    SAMPLING_RATE = config.SYNTHETIC_SAMPLING_RATE
+    TIME_FOR_ONE_SAMPLE = 1 / SAMPLING_RATE
+    NUMBER_CHANNELS = len(channel_names)
+    board = SyntheticBoard(channel_names, SAMPLING_RATE, noise=config.SYNTHETIC_NOISE,
+                           mu_amplitude=config.SYNTHETIC_MU_AMPLITUDE, erd=config.SYNTHETIC_ERD,
+                           schedule=config.SYNTHETIC_SCHEDULE)
+    eeg_channels = board.get_eeg_channels()
+    stream_available = True
+    board.prepare_session()
+    board.start_stream()
+
+
 def search_port():
     """
     Search for the name of the used usb port and return it
@@ -140,94 +247,103 @@ def search_port():
     return None
 
 
-def handle_samples(chan_data=None):
+def handle_samples(replay: SessionReplay = None):
     """
-    Reads EEG data from port, sends it to trial_handler and writes into in the window_buffer
-    :param float[] chan_data: raw data from recorded Sessions
+    Reads EEG data blockwise from port, sends it to trial_handler and writes into in the window_buffer
+    :param SessionReplay replay: replay of a recorded session, which is used instead of the board
     """
-    global first_window, window_buffer, allow_window_creation, first_data
-    count_samples = 0
-    sample_index = 0
-    while stream_available and (live_Data or len(chan_data[0]) > sample_index):
-        if chan_data is not None:
-            data = np.ndarray((len(chan_data), 1))
-            for channel_index, samples in enumerate(chan_data[:, sample_index]):
-                data[channel_index, 0] = samples
-            sample_index += 1
-            time.sleep(0.008)
+    global first_data
+    replay_blocks = replay.blocks() if replay is not None else None
+    while stream_available:
+        if replay_blocks is not None:
+            data = next(replay_blocks, None)
+            if data is None:
+                break
+            acquisition_time = time.perf_counter()
         else:
-            data = board.get_board_data(1)[board.get_eeg_channels(
-                brainflow.board_shim.BoardIds.CYTON_DAISY_BOARD)]  # get all data and remove it from internal buffer
-            if len(data[0]) > 0:
-                # filter data
-                for channel in range(NUMBER_CHANNELS):
-                    brainflow.DataFilter.perform_bandstop(data[channel], SAMPLING_RATE, 0.0, 50.0, 5,
-                                                          brainflow.FilterTypes.BUTTERWORTH.value, 0)
-            else:
+            data = read_board_block()
+            if data is None:
                 continue
-            # only sends trial_handler raw data if trial recording is wished
-        if data_model.trial_recording and live_Data:
+            acquisition_time = time.perf_counter()
+            # filter the whole block at once, the filter state is carried over to the next block
+            data = stream_filter.filter(data)
+        # in the worker process the samples are passed to the UI process, which records the trials
+        if sample_ring is not None:
+            sample_ring.write(data.T)
+        # only sends trial_handler raw data if trial recording is wished
+        if not is_acquisition_process and data_model.trial_recording and live_Data:
             if first_data:
                 trial_handler.send_raw_data(data, start=time.time())
                 first_data = False
             else:
                 trial_handler.send_raw_data(data)
         if allow_window_creation:
-            for samples in range(len(data)):
-                window_buffer[samples].extend(data[samples])
-            count_samples += 1
-            if first_window and count_samples == SLIDING_WINDOW_SAMPLES:
-                first_window = False
-                send_window()
-                count_samples = 0
-            elif not first_window and count_samples == OFFSET_SAMPLES:
-                send_window()
-                count_samples = 0
+            write_block(data, acquisition_time)
     if live_Data:
         stop_stream()
+    if is_acquisition_process:
+        # the worker process prints the latency of its own stages, the UI process the latency until the player moves
+        latency_recorder.dump()
 
 
-def sort_channels(sliding_window, used_ch_names):
-    """Filters and sorts the data channels for the algorithm"""
-    filtered_sliding_window = list()
-    filtered_channel_names = list()
-    for i in range(len(used_ch_names)):
-        if config.CH_NAMES_WEIGHT[i] != 0:
-            if used_ch_names[i] == 'C3':
-                filtered_channel_names.insert(0, used_ch_names[i])
-                filtered_sliding_window.insert(0, sliding_window[i])
-            elif used_ch_names[i] == 'C4':
-                filtered_channel_names.insert(1, used_ch_names[i])
-                filtered_sliding_window.insert(1, sliding_window[i])
-            else:
-                filtered_channel_names.append(used_ch_names[i])
-                filtered_sliding_window.append(sliding_window[i])
-
-    filtered_sliding_window = np.asarray(filtered_sliding_window)
-    return filtered_sliding_window, filtered_channel_names
+def read_board_block():
+    """
+    Waits until the board has buffered new samples and drains all of them in one call.
+    Instead of spinning on the board the thread sleeps for ACQUISITION_POLL_INTERVAL between two checks.
+    :return: np.ndarray data: channels x samples block, None if the stream was stopped while waiting
+    """
+    while board.get_board_data_count() == 0:
+        if not stream_available:
+            return None
+        time.sleep(config.ACQUISITION_POLL_INTERVAL / 1000)
+    # get all data and remove it from internal buffer
+    return board.get_board_data()[eeg_channels]
 
 
-def send_window():
-    """Create sliding window and send it to the algorithm"""
-    global window_buffer, NUMBER_CHANNELS
-    window = np.zeros((NUMBER_CHANNELS, SLIDING_WINDOW_SAMPLES), dtype=float)
-    for i in range(len(window)):
-        window[i] = np.array(window_buffer[i])
-    # sort channels for laplacian calculation
-    if live_Data:
-        window, used_channels = sort_channels(window, config.BCI_CHANNELS)
-    else:
-        used_channels = chan_labels
+def write_block(data: np.ndarray, acquisition_time: float = None):
+    """
+    Writes a block of samples into the window_buffer.
+    The block is split at the window boundaries, so the sliding windows are emitted after exactly
+    SLIDING_WINDOW_SAMPLES (first window) and OFFSET_SAMPLES (all further windows), independent of the block size.
+    :param np.ndarray data: channels x samples block
+    :param float acquisition_time: time stamp (time.perf_counter) at which the block was acquired
+    """
+    global samples_until_window
+    start = 0
+    while start < data.shape[1]:
+        stop = min(data.shape[1], start + samples_until_window)
+        window_buffer.extend(data[:, start:stop])
+        samples_until_window -= stop - start
+        start = stop
+        if samples_until_window == 0:
+            send_window(acquisition_time)
+            samples_until_window = OFFSET_SAMPLES
+
+
+def send_window(acquisition_time: float = None):
+    """
+    Create sliding window and send it to the algorithm
+    :param float acquisition_time: time stamp (time.perf_counter) at which the newest sample of the window was acquired
+    """
+    emit_time = time.perf_counter()
+    if acquisition_time is None:
+        acquisition_time = emit_time
+    latency_recorder.begin(acquisition_time, emit_time)
+    # select and sort the channels for laplacian calculation out of the read-only view of the newest samples
+    window = channel_map.select(window_buffer.get_window())
     # push window to cursor control algorithm
-    from scripts.data.analysis.cursor_control_algorithm import perform_algorithm
-    perform_algorithm(window, used_channels, SAMPLING_RATE, data_mdl=data_model, queue_manager=queue_manager,
-                      offset_in_percentage=OFFSET_DURATION / SLIDING_WINDOW_DURATION)
+    label = pipeline.process(window, new_samples=OFFSET_SAMPLES, telemetry=telemetry_ring)
+    # in the worker process the label is passed to the UI process, which posts the move events
+    if control_ring is not None:
+        control_ring.write([(acquisition_time, emit_time, label)])
 
 
 def stop_stream():
     """Stops the data stream and the releases session"""
     global stream_available
     stream_available = False
+    if acquisition_process is not None:
+        acquisition_process.stop()
     if live_Data and 'board' in globals() and board:
         try:
             board.stop_stream()
@@ -0,0 +1,89 @@
+import time
+from typing import List
+
+import numpy as np
+
+""" Script to replay a recorded session as a stream of sample blocks, paced by a virtual clock """
+
+
+class SessionReplay:
+    """
+    Replays recorded channel data blockwise.
+
+    The virtual clock of the replay is the amount of already replayed samples divided by the sampling rate.
+    Depending on the speed the virtual clock is coupled to the wall clock:
+        - speed = 1: real time
+        - speed = n: n times faster than real time
+        - speed = 0: as fast as possible, blocks of block_size samples are replayed without waiting
+    The replayed samples are the same in every mode, only the block sizes differ. As the windows are cut at fixed
+    sample boundaries, the algorithm gets exactly the same windows in all modes.
+    """
+
+    def __init__(self, chan_data: np.ndarray, sampling_rate: float, speed: float = 1.0, block_size: int = 25,
+                 channel_indices: List[int] = None):
+        """
+        Constructor method
+        :param np.ndarray chan_data: channels x samples data of the session, may be a np.memmap
+        :param float sampling_rate: sampling rate of the recorded session in Hz
+        :param float speed: replay speed relative to real time, 0 to replay as fast as possible
+        :param int block_size: maximal amount of samples of one block
+        :param List[int] channel_indices: channels of chan_data which are replayed, None to replay all channels
+        :raise ValueError: if the speed is negative
+        """
+        if speed < 0:
+            raise ValueError(f'Invalid replay speed: {speed}')
+        self.chan_data = chan_data
+        self.channel_indices = channel_indices
+        self.sampling_rate = sampling_rate
+        self.speed = speed
+        self.block_size = block_size
+        self.replayed_samples = 0
+        self.start_time = None
+        self.stop_time = None
+
+    @property
+    def virtual_time(self):
+        """Time in s of the recorded session which has been replayed"""
+        return self.replayed_samples / self.sampling_rate
+
+    @property
+    def elapsed_time(self):
+        """Wall clock time in s which has been needed for the replay"""
+        if self.start_time is None:
+            return 0.0
+        return (self.stop_time or time.perf_counter()) - self.start_time
+
+    def blocks(self):
+        """
+        Generator which yields the session data blockwise (channels x samples) until all samples are replayed
+        """
+        n_samples = self.chan_data.shape[1]
+        self.start_time = time.perf_counter()
+        self.stop_time = None
+        while self.replayed_samples < n_samples:
+            if self.speed:
+                due_samples = self.__wait_for_samples()
+            else:
+                due_samples = self.block_size
+            stop = min(n_samples, self.replayed_samples + due_samples)
+            # with a memory-mapped session only the samples of the current block are read from disk
+            if self.channel_indices is None:
+                block = self.chan_data[:, self.replayed_samples:stop]
+            else:
+                block = self.chan_data[self.channel_indices, self.replayed_samples:stop]
+            self.replayed_samples = stop
+            yield block
+        self.stop_time = time.perf_counter()
+
+    def __wait_for_samples(self):
+        """
+        Sleeps until at least one sample is due according to the virtual clock
+        :return: int: amount of due samples, at most block_size
+        """
+        samples_per_second = self.sampling_rate * self.speed
+        due_samples = int((time.perf_counter() - self.start_time) * samples_per_second) - self.replayed_samples
+        if due_samples <= 0:
+            next_sample_time = self.start_time + (self.replayed_samples + 1) / samples_per_second
+            time.sleep(max(0.0, next_sample_time - time.perf_counter()))
+            due_samples = 1
+        return min(due_samples, self.block_size)
@@ -0,0 +1,72 @@
+import numpy as np
+from scipy import signal
+
+import scripts.config as config
+
+""" Script for filtering the live EEG stream blockwise without losing the filter state between two blocks """
+
+
+class StreamFilter:
+    """
+    Causal IIR filter for a multichannel stream, built from second-order sections (SOS).
+
+    The filter state (zi) of every channel is carried from one block to the next,
+    so filtering a stream block by block gives the same result as filtering the whole stream at once.
+    """
+
+    def __init__(self, n_channels: int, sampling_rate: float, bandstop: [float, float] = None,
+                 bandpass: [float, float] = None, order: int = 4):
+        """
+        Constructor method
+        :param int n_channels: amount of channels of the stream
+        :param float sampling_rate: sampling rate of the stream in Hz
+        :param [float, float] bandstop: lower and upper edge of the stop band in Hz, None to disable
+        :param [float, float] bandpass: lower and upper edge of the pass band in Hz, None to disable
+        :param int order: order of each butterworth filter
+        :raise ValueError: if a band edge is not below the nyquist frequency
+        """
+        sections = list()
+        for btype, band in (('bandstop', bandstop), ('bandpass', bandpass)):
+            if band is None:
+                continue
+            if not 0 < band[0] < band[1] < sampling_rate / 2:
+                raise ValueError(f'Invalid {btype} band {band} for a sampling rate of {sampling_rate} Hz')
+            sections.append(signal.butter(order, band, btype=btype, fs=sampling_rate, output='sos'))
+
+        self.n_channels = n_channels
+        self.sos = np.concatenate(sections) if sections else None
+        self.zi = None
+
+    def filter(self, data: np.ndarray) -> np.ndarray:
+        """
+        Filters a block of samples of all channels in one vectorized call and updates the filter state
+        :param np.ndarray data: channels x samples block
+        :return: np.ndarray: filtered block
+        """
+        if self.sos is None or data.shape[1] == 0:
+            return data
+        if self.zi is None:
+            # start in the steady state of the first sample to avoid a large transient at the beginning of the stream
+            self.zi = signal.sosfilt_zi(self.sos)[:, None, :] * data[:, 0][None, :, None]
+        filtered, self.zi = signal.sosfilt(self.sos, data, axis=-1, zi=self.zi)
+        return filtered
+
+    def reset(self):
+        """Resets the filter state, the next block is treated as the start of a new stream"""
+        self.zi = None
+
+
+def create_stream_filter(n_channels: int, sampling_rate: float) -> StreamFilter:
+    """
+    Creates the stream filter for the live data as configured in the config
+    :param int n_channels: amount of channels of the stream
+    :param float sampling_rate: sampling rate of the stream in Hz
+    :return: StreamFilter
+    """
+    bandstop = None
+    if config.LIVE_BANDSTOP_FILTER:
+        bandstop = [config.LIVE_BANDSTOP_FREQ - config.LIVE_BANDSTOP_WIDTH / 2,
+                    config.LIVE_BANDSTOP_FREQ + config.LIVE_BANDSTOP_WIDTH / 2]
+    bandpass = config.LIVE_BANDPASS_FREQ if config.LIVE_BANDPASS_FILTER else None
+    return StreamFilter(n_channels, sampling_rate, bandstop=bandstop, bandpass=bandpass,
+                        order=config.LIVE_FILTER_ORDER)
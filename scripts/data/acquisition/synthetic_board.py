@@ -0,0 +1,127 @@
+import time
+from typing import List
+
+import numpy as np
+
+""" Script for a synthetic EEG board which can be used instead of the OpenBCI headset """
+
+
+class SyntheticBoard:
+    """
+    Generates synthetic EEG data in real time and offers the part of the BoardShim interface used by read_data.
+
+    Every channel contains gaussian noise. C3 and C4 additionally contain a mu rhythm (8-12 Hz), whose amplitude follows
+    a repeated schedule of periods, which are named after the game direction the cursor control algorithm derives from
+    them (hcon = C4 * WEIGHT - C3, label 0 = left for a high hcon):
+        - 'left':  event-related desynchronisation (ERD) on C3 and synchronisation (ERS) on C4 -> label 0
+        - 'right': ERD on C4 and ERS on C3 -> label 1
+        - 'rest':  no modulation -> label -1
+    The samples are generated on demand according to the time passed since start_stream().
+    """
+
+    def __init__(self, channel_names: List[str], sampling_rate: int, noise: float = 5.0, mu_amplitude: float = 10.0,
+                 erd: float = 0.5, schedule: List[tuple] = None, seed: int = None):
+        """
+        Constructor method
+        :param List[str] channel_names: names of the generated channels, should contain C3 and C4
+        :param int sampling_rate: sampling rate in Hz
+        :param float noise: standard deviation of the noise in uV
+        :param float mu_amplitude: amplitude of the unmodulated mu rhythm in uV
+        :param float erd: relative decrease (ERD) and increase (ERS) of the mu amplitude during motor imagery
+        :param List[tuple] schedule: repeated schedule of ('left' | 'right' | 'rest', duration in s)
+        :param int seed: seed of the random number generator
+        """
+        self.channel_names = channel_names
+        self.sampling_rate = sampling_rate
+        self.noise = noise
+        self.mu_amplitude = mu_amplitude
+        self.erd = erd
+        self.schedule = schedule if schedule else [('rest', 4), ('left', 4), ('rest', 4), ('right', 4)]
+        self.rng = np.random.default_rng(seed)
+
+        self.__c3 = channel_names.index('C3') if 'C3' in channel_names else None
+        self.__c4 = channel_names.index('C4') if 'C4' in channel_names else None
+        # end of each schedule entry in samples and the corresponding amplitude factors for C3 and C4
+        durations = [round(duration * sampling_rate) for _, duration in self.schedule]
+        self.__schedule_ends = np.cumsum(durations)
+        factors = {'left': (1 - erd, 1 + erd), 'right': (1 + erd, 1 - erd), 'rest': (1.0, 1.0)}
+        self.__schedule_factors = np.array([factors[label] for label, _ in self.schedule])
+        # each hemisphere gets its own mu frequency, so C3 and C4 are not perfectly correlated
+        self.__mu_freqs = self.rng.uniform(9, 11, size=2)
+
+        self.__start_time = None
+        self.__generated_samples = 0
+
+    def prepare_session(self):
+        """Nothing to prepare, exists for compatibility with the BoardShim"""
+
+    def release_session(self):
+        """Nothing to release, exists for compatibility with the BoardShim"""
+
+    def start_stream(self):
+        """Starts the virtual stream, samples are generated from now on"""
+        self.__start_time = time.perf_counter()
+        self.__generated_samples = 0
+
+    def stop_stream(self):
+        """Stops the virtual stream"""
+        self.__start_time = None
+
+    def get_eeg_channels(self) -> List[int]:
+        """
+        :return: rows of get_board_data() which contain EEG data
+        """
+        return list(range(len(self.channel_names)))
+
+    def get_board_data_count(self) -> int:
+        """
+        :return: amount of samples which are due since the last call of get_board_data()
+        """
+        if self.__start_time is None:
+            return 0
+        return int((time.perf_counter() - self.__start_time) * self.sampling_rate) - self.__generated_samples
+
+    def get_board_data(self) -> np.ndarray:
+        """
+        Generates all due samples
+        :return: np.ndarray: channels x samples block
+        """
+        return self.generate(self.get_board_data_count())
+
+    def get_label(self, sample_index: int) -> str:
+        """
+        :param int sample_index: index of a sample since the start of the stream
+        :return: str: scheduled motor imagery of the sample
+        """
+        entry = np.searchsorted(self.__schedule_ends, sample_index % self.__schedule_ends[-1], side='right')
+        return self.schedule[entry][0]
+
+    def generate(self, n_samples: int) -> np.ndarray:
+        """
+        Generates the next n_samples samples of all channels
+        :param int n_samples: amount of samples
+        :return: np.ndarray: channels x samples block
+        """
+        n_samples = max(n_samples, 0)
+        sample_indices = np.arange(self.__generated_samples, self.__generated_samples + n_samples)
+        self.__generated_samples += n_samples
+
+        data = self.rng.normal(scale=self.noise, size=(len(self.channel_names), n_samples))
+        entries = np.searchsorted(self.__schedule_ends, sample_indices % self.__schedule_ends[-1], side='right')
+        factors = self.__schedule_factors[entries]
+        t = sample_indices / self.sampling_rate
+        for hemisphere, channel in enumerate((self.__c3, self.__c4)):
+            if channel is not None:
+                data[channel] += self.mu_amplitude * factors[:, hemisphere] * \
+                                 np.sin(2 * np.pi * self.__mu_freqs[hemisphere] * t)
+        return data
+
+
+def get_synthetic_channel_names(n_channels: int, channel_names: List[str]) -> List[str]:
+    """
+    Uses the names of the headset channels for the synthetic channels and adds generic names for additional channels
+    :param int n_channels: amount of synthetic channels
+    :param List[str] channel_names: names of the headset channels
+    :return: List[str]: names of the synthetic channels
+    """
+    return list(channel_names[:n_channels]) + [f'EEG{i + 1}' for i in range(len(channel_names), n_channels)]
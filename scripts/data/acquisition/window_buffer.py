@@ -0,0 +1,70 @@
+import numpy as np
+
+""" Script for a preallocated multichannel circular buffer which hands out the sliding windows without copying """
+
+
+class WindowBuffer:
+    """
+    Circular buffer for channels x samples data with a fixed capacity (= size of a sliding window).
+
+    The samples are stored twice in a buffer of double length (mirrored layout): a sample at position p is also
+    written to position p + capacity. Because of that the last `capacity` samples are always available as one
+    contiguous slice, which is returned as a view instead of a copy.
+    """
+
+    def __init__(self, n_channels: int, capacity: int, dtype=float):
+        """
+        Constructor method
+        :param int n_channels: amount of channels
+        :param int capacity: amount of samples of a window
+        :param dtype: data type of the samples
+        """
+        self.capacity = capacity
+        self.__buffer = np.zeros((n_channels, 2 * capacity), dtype=dtype)
+        self.__head = 0  # position of the oldest sample, the next sample gets written here
+        self.__count = 0  # amount of valid samples in the buffer
+
+    @property
+    def is_full(self):
+        return self.__count == self.capacity
+
+    def __len__(self):
+        return self.__count
+
+    def extend(self, data: np.ndarray):
+        """
+        Writes a block of samples of all channels into the buffer.
+        Only the newest `capacity` samples are kept if the block is larger than the buffer.
+        :param np.ndarray data: channels x samples block
+        """
+        n_samples = data.shape[1]
+        if n_samples >= self.capacity:
+            data = data[:, n_samples - self.capacity:]
+            self.__buffer[:, :self.capacity] = data
+            self.__buffer[:, self.capacity:] = data
+            self.__head = 0
+            self.__count = self.capacity
+            return
+
+        # write the block in at most two contiguous parts and mirror both into the second half
+        first = min(n_samples, self.capacity - self.__head)
+        self.__write(self.__head, data[:, :first])
+        self.__write(0, data[:, first:])
+        self.__head = (self.__head + n_samples) % self.capacity
+        self.__count = min(self.__count + n_samples, self.capacity)
+
+    def __write(self, position, data):
+        n_samples = data.shape[1]
+        if n_samples:
+            self.__buffer[:, position:position + n_samples] = data
+            self.__buffer[:, position + self.capacity:position + self.capacity + n_samples] = data
+
+    def get_window(self) -> np.ndarray:
+        """
+        Returns the last `capacity` samples of all channels, oldest sample first.
+        The returned array is a read-only view into the buffer and only valid until the next call of extend().
+        :return: np.ndarray: channels x capacity view
+        """
+        window = self.__buffer[:, self.__head:self.__head + self.capacity]
+        window.flags.writeable = False
+        return window
@@ -0,0 +1,181 @@
+import argparse
+from typing import List
+
+import numpy as np
+import scipy.linalg
+from scipy import signal
+
+from scripts.data.acquisition.channel_map import ChannelMap
+from scripts.data.acquisition.stream_filter import create_stream_filter
+from scripts.data.loader.game_dataset_loader import get_session_meta, load_raw_data
+
+"""
+Script to train Common Spatial Patterns (CSP) filters with the LEFT and RIGHT trials of recorded sessions.
+
+The trials are cut into epochs of the window size of the algorithm. Online each channel of a sliding window is
+standardized before the spatial filtering and the band power calculation, so each channel of an epoch is scaled by the
+standard deviation of the unfiltered epoch before the covariance of the band is calculated.
+The two filters are the generalized eigenvectors of the class covariances with the smallest and the largest eigenvalue.
+They replace C3a and C4a of the laplacian: the first filter has a high band power during RIGHT trials, the second one
+during LEFT trials (see CursorControlPipeline).
+
+Usage: python -m scripts.data.analysis.csp session1.npz session2.npz -o csp_filters.npz
+"""
+
+LEFT = 0
+RIGHT = 1
+
+
+def extract_epochs(chan_data: np.ndarray, positions: np.ndarray, durations: np.ndarray, epoch_samples: int):
+    """
+    Cuts the trials into non-overlapping epochs with one fancy indexing operation
+    :param np.ndarray chan_data: channels x samples data
+    :param np.ndarray positions: first sample of each trial
+    :param np.ndarray durations: amount of samples of each trial
+    :param int epoch_samples: amount of samples of an epoch
+    :return: np.ndarray: epochs x channels x samples
+             np.ndarray: index of the trial of each epoch
+    """
+    positions = np.asarray(positions, dtype=int)
+    # shorter trials and the end of the recording are cut off
+    durations = np.minimum(np.asarray(durations, dtype=int), chan_data.shape[1] - positions)
+    n_epochs = np.maximum(durations // epoch_samples, 0)
+    trials = np.repeat(np.arange(len(positions)), n_epochs)
+    # position of each epoch within its trial
+    epoch_in_trial = np.arange(len(trials)) - np.repeat(np.cumsum(n_epochs) - n_epochs, n_epochs)
+    starts = positions[trials] + epoch_in_trial * epoch_samples
+    epochs = chan_data[:, starts[:, np.newaxis] + np.arange(epoch_samples)]
+    return np.transpose(epochs, (1, 0, 2)), trials
+
+
+def calculate_class_covariances(epochs: np.ndarray, labels: np.ndarray):
+    """
+    :param np.ndarray epochs: epochs x channels x samples
+    :param np.ndarray labels: label of each epoch (LEFT or RIGHT)
+    :raise ValueError: if there is no epoch of a class
+    :return: mean trace-normalized covariance of the LEFT epochs and of the RIGHT epochs (channels x channels)
+    """
+    covariances = np.einsum('ecs,eds->ecd', epochs, epochs) / epochs.shape[-1]
+    covariances /= np.trace(covariances, axis1=1, axis2=2)[:, np.newaxis, np.newaxis]
+    class_covariances = list()
+    for label in (LEFT, RIGHT):
+        in_class = labels == label
+        if not in_class.any():
+            raise ValueError(f'No epochs with the label {label}')
+        class_covariances.append(np.mean(covariances[in_class], axis=0))
+    return class_covariances
+
+
+def train_csp(covariance_left: np.ndarray, covariance_right: np.ndarray):
+    """
+    Solves the generalized eigenvalue problem C_left w = lambda (C_left + C_right) w
+    :param np.ndarray covariance_left: covariance of the LEFT epochs
+    :param np.ndarray covariance_right: covariance of the RIGHT epochs
+    :return: np.ndarray: filters (2 x channels), high variance during RIGHT trials (smallest eigenvalue) and during
+             LEFT trials (largest eigenvalue)
+             np.ndarray: the corresponding eigenvalues
+    """
+    eigenvalues, eigenvectors = scipy.linalg.eigh(covariance_left, covariance_left + covariance_right)
+    used = [0, -1]
+    return eigenvectors[:, used].T, eigenvalues[used]
+
+
+def load_trials(session_path: str, f_min: float, f_max: float):
+    """
+    Loads a MindPong session, filtered like the live stream and additionally in between f_min and f_max
+    :param str session_path: path of the npz file
+    :param float f_min: lowest frequency of the band in Hz
+    :param float f_max: highest frequency of the band in Hz
+    :return: chan_data: used channels x samples (see ChannelMap), filtered like the live stream
+             band_data: chan_data filtered in between f_min and f_max
+             channel_names: names of the used channels
+             sampling_rate: sampling rate in Hz
+             positions, durations, labels: LEFT and RIGHT trials
+    """
+    meta = get_session_meta(session_path)
+    sampling_rate = meta['sampling_rate']
+    channel_map = ChannelMap(list(meta['channels']))
+    chan_data = np.asarray(load_raw_data(session_path), dtype=float)
+    chan_data = create_stream_filter(chan_data.shape[0], sampling_rate).filter(chan_data)[channel_map.indices]
+    sos = signal.butter(4, [f_min, f_max], btype='bandpass', fs=sampling_rate, output='sos')
+    band_data = signal.sosfiltfilt(sos, chan_data, axis=-1)
+
+    with np.load(session_path, allow_pickle=True) as data:
+        labels = np.asarray([getattr(event_type, 'value', event_type) for event_type in data['event_type']])
+        positions = np.asarray(data['event_pos'], dtype=int)
+        durations = np.asarray(data['event_duration'], dtype=int)
+    used = np.isin(labels, (LEFT, RIGHT))
+    return chan_data, band_data, channel_map.names, sampling_rate, positions[used], durations[used], labels[used]
+
+
+def train_csp_from_sessions(session_paths: List[str], window_size: int = 1000, f_min: float = 8, f_max: float = 12):
+    """
+    Trains the CSP filters with the LEFT and RIGHT trials of sessions
+    :param List[str] session_paths: paths of the npz files, all sessions need the same channels
+    :param int window_size: size of the epochs in ms, should be the window size of the algorithm
+    :param float f_min: lowest frequency of the band in Hz
+    :param float f_max: highest frequency of the band in Hz
+    :raise ValueError: if the sessions have different channels or there is no epoch of a class
+    :return: filters (2 x channels), eigenvalues and channel names
+    """
+    all_epochs, all_labels, channel_names = list(), list(), None
+    for session_path in session_paths:
+        chan_data, band_data, names, sampling_rate, positions, durations, labels = load_trials(session_path, f_min,
+                                                                                              f_max)
+        if channel_names is not None and names != channel_names:
+            raise ValueError(f'The channels of {session_path} differ: {names} != {channel_names}')
+        channel_names = names
+        epoch_samples = int(window_size / 1000 * sampling_rate)
+        epochs, trials = extract_epochs(chan_data, positions, durations, epoch_samples)
+        band_epochs, _ = extract_epochs(band_data, positions, durations, epoch_samples)
+        std = np.std(epochs, axis=-1, keepdims=True)
+        all_epochs.append(np.divide(band_epochs, std, out=np.zeros_like(band_epochs), where=std > 0))
+        all_labels.append(labels[trials])
+    filters, eigenvalues = train_csp(*calculate_class_covariances(np.concatenate(all_epochs),
+                                                                   np.concatenate(all_labels)))
+    return filters, eigenvalues, channel_names
+
+
+def save_csp_filters(file_path: str, filters: np.ndarray, eigenvalues: np.ndarray, channel_names: List[str]):
+    """
+    :param str file_path: path of the npz file
+    :param np.ndarray filters: filters (2 x channels)
+    :param np.ndarray eigenvalues: the corresponding eigenvalues
+    :param List[str] channel_names: names of the channels (columns of the filters)
+    """
+    np.savez(file_path, filters=filters, eigenvalues=eigenvalues, channels=np.asarray(channel_names))
+
+
+def load_csp_filters(file_path: str, channel_names: List[str]) -> np.ndarray:
+    """
+    Loads the CSP filters as spatial filter for the channels of the sliding windows
+    :param str file_path: path of the npz file
+    :param List[str] channel_names: names of the channels of the sliding windows
+    :raise ValueError: if the channels differ from the channels the filters were trained with
+    :return: np.ndarray: filters (2 x channels) in the order of channel_names
+    """
+    with np.load(file_path) as data:
+        filters = data['filters']
+        trained_names = [str(name) for name in data['channels']]
+    if sorted(trained_names) != sorted(channel_names):
+        raise ValueError(f'The filters were trained with the channels {trained_names}, not {list(channel_names)}')
+    return np.ascontiguousarray(filters[:, [trained_names.index(name) for name in channel_names]])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trains CSP filters with recorded sessions')
+    parser.add_argument('sessions', nargs='+', help='MindPong npz sessions')
+    parser.add_argument('-o', '--output', default='csp_filters.npz', help='path of the filter file')
+    parser.add_argument('--window-size', type=int, default=1000, help='in ms')
+    parser.add_argument('--f-min', type=float, default=8)
+    parser.add_argument('--f-max', type=float, default=12)
+    args = parser.parse_args()
+
+    filters, eigenvalues, channel_names = train_csp_from_sessions(args.sessions, args.window_size, args.f_min,
+                                                                  args.f_max)
+    save_csp_filters(args.output, filters, eigenvalues, channel_names)
+    print(f'Saved the filters of {channel_names} to {args.output}, eigenvalues: {eigenvalues}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,20 @@
 import enum
+import time
+from functools import lru_cache
 
-import mne
 import numpy as np
 import scipy.integrate
-from numpy import linspace
-from numpy_ringbuffer import RingBuffer
 from scipy import signal
 
 import scripts.config as config
-from scripts.data.acquisition.read_data import QueueManager
-# from spectrum import arburg, arma2psd
-from scripts.utils.event_listener import post_event
+from scripts.data.acquisition.channel_map import get_laplacian_groups
+from scripts.data.analysis.multitaper import psd_multitaper
+from scripts.data.analysis.normalization import RunningNormalizer
+from scripts.data.analysis.sliding_dft import FLAT_CHANNEL_TOLERANCE, SlidingDFT
+from scripts.utils.control_channel import channel as control_channel
+from scripts.utils.latency import Stage, recorder as latency_recorder
+from scripts.utils.shared_ring import SharedRing
+from scripts.utils.telemetry import TELEMETRY_RECORD
 
 
 class PSD_METHOD(enum.Enum):
@@ -21,27 +25,62 @@ class PSD_METHOD(enum.Enum):
     multitaper = 2
     periodogram = 3
     burg = 4
+    sliding_dft = 5
 
 
-# Global variables
-ringbuffer_hcon = None
-F_MIN: float
-F_MAX: float
-SAMPLING_FREQ: int
+# default psd method of the pipelines
 USED_METHOD = PSD_METHOD.multitaper
 
 
-def standardize_data(in_data: np.ndarray):
+class Workspace:
     """
-    Standardizes input data
+    Preallocated arrays of the window path of a pipeline, so steady-state processing creates no temporary arrays.
+    The arrays only fit windows of the given shape, a pipeline creates a new workspace if the shape changes.
+    """
+
+    def __init__(self, shape: tuple, n_filtered: int = 2):
+        """
+        Constructor method
+        :param shape: shape of the windows (channels x samples)
+        :param n_filtered: amount of spatially filtered channels
+        """
+        self.shape = tuple(shape)
+        statistics_shape = self.shape[:-1] + (1,)
+        self.mean = np.empty(statistics_shape)
+        self.std = np.empty(statistics_shape)
+        self.tolerance = np.empty(statistics_shape)
+        self.is_valid = np.empty(statistics_shape, dtype=bool)
+        self.squares = np.empty(self.shape)
+        self.standardized = np.empty(self.shape)
+        self.filtered = np.empty((n_filtered, self.shape[-1]))
+
+
+def standardize_data(in_data: np.ndarray, workspace: Workspace = None):
+    """
+    Standardizes input data, all channels at once
     Benefit of standardization rather than normalisation, as standardization is much more robust against outliers.
-    :param in_data: samples of a channel
-    :return: Standardized data
+    Flat channels (standard deviation ~ 0) are set to 0 instead of NaN.
+    :param in_data: samples of a channel or channels x samples
+    :param workspace: preallocated arrays for the calculation and the result, None to allocate new arrays
+    :return: Standardized data, the array of the workspace if given
     """
-    mean = np.mean(in_data)
-    std = np.std(in_data)
-    out_data = in_data - mean
-    out_data = out_data / std
+    in_data = np.asarray(in_data, dtype=float)
+    if workspace is None:
+        workspace = Workspace(in_data.shape)
+    np.mean(in_data, axis=-1, keepdims=True, out=workspace.mean)
+    out_data = np.subtract(in_data, workspace.mean, out=workspace.standardized)
+    # same steps as np.std, but into the workspace
+    np.multiply(out_data, out_data, out=workspace.squares)
+    np.mean(workspace.squares, axis=-1, keepdims=True, out=workspace.std)
+    np.sqrt(workspace.std, out=workspace.std)
+    # zero-variance guard, relative to the offset of the channel because of the rounding errors of the mean (see
+    # FLAT_CHANNEL_TOLERANCE)
+    np.abs(workspace.mean, out=workspace.tolerance)
+    np.add(workspace.tolerance, 1, out=workspace.tolerance)
+    np.multiply(workspace.tolerance, FLAT_CHANNEL_TOLERANCE, out=workspace.tolerance)
+    np.greater(workspace.std, workspace.tolerance, out=workspace.is_valid)
+    np.divide(out_data, workspace.std, out=out_data, where=workspace.is_valid)
+    np.multiply(out_data, workspace.is_valid, out=out_data)
     return out_data
 
 
@@ -53,16 +92,7 @@ def calculate_laplacian(samples: np.ndarray):
     :param samples: samples of each channel
     :return: calculated average
     """
-    result = list()
-    for i in range(len(samples[0])):
-        average = 0
-        for j in range(len(samples)):
-            average += samples[j][i]
-        average /= len(samples)
-        result.append(average)
-
-    result = np.asarray(result)
-    return result
+    return np.mean(np.asarray(samples), axis=0)
 
 
 def split_laplacian_areas(samples_list: np.ndarray, used_ch_names: list):
@@ -73,26 +103,27 @@ def split_laplacian_areas(samples_list: np.ndarray, used_ch_names: list):
     :param used_ch_names: list of the channel names associated with the channel
     :return: 2 list containing sorted channels belonging to c3 and c4
     """
-    channels_around_c3 = list()
-    channels_around_c4 = list()
+    samples_list = np.asarray(samples_list)
+    channels_around_c3, channels_around_c4 = get_laplacian_groups(used_ch_names)
+    return samples_list[channels_around_c3], samples_list[channels_around_c4]
 
-    for i in range(len(used_ch_names)):
-        c = used_ch_names[i][-1]
 
-        # sort into channels belonging to c3 and c4
-        if c.isnumeric():
-            if int(c) % 2 == 0:
-                channels_around_c4.append(samples_list[i])
-            else:
-                channels_around_c3.append(samples_list[i])
-        else:
-            channels_around_c3.append(samples_list[i])
-            channels_around_c4.append(samples_list[i])
-
-    # convert back to np arrays
-    channels_around_c3 = np.asarray(channels_around_c3)
-    channels_around_c4 = np.asarray(channels_around_c4)
-    return channels_around_c3, channels_around_c4
+@lru_cache(maxsize=8)
+def get_laplacian_matrix(used_ch_names: tuple) -> np.ndarray:
+    """
+    Derives the weights of the laplacian spatial filter from the channel names.
+    Row 0 contains C3 minus the average of the channels around C3, row 1 C4 minus the average of the channels around C4
+    (see split_laplacian_areas). The matrix is cached, as the channel names don't change during a session.
+    :param used_ch_names: associated names of all channels (with C3 at position 0 and C4 at position 1)
+    :return: read-only 2 x n_channels weight matrix
+    """
+    weights = np.zeros((2, len(used_ch_names)))
+    weights[0, 0] = weights[1, 1] = 1
+    for row, channels in enumerate(get_laplacian_groups(used_ch_names[2:])):
+        if len(channels):
+            weights[row, channels + 2] -= 1 / len(channels)
+    weights.flags.writeable = False
+    return weights
 
 
 def calculate_spatial_filtering(samples_list: np.ndarray, used_ch_names: list):
@@ -102,214 +133,476 @@ def calculate_spatial_filtering(samples_list: np.ndarray, used_ch_names: list):
     :param samples_list: samples of all channels (with C3 at position 0 and C4 at position 1)
     :return: filtered C3, C4 samples
     """
-    samples_c3a = list()
-    samples_c4a = list()
-    # splits the channels into c3 and c4 related channels
-    split_channels = split_laplacian_areas(samples_list[2:], used_ch_names[2:])
-    # calculate the average for the c3 and c4 related channels
-    samples_average_c3 = calculate_laplacian(split_channels[0][:])
-    samples_average_c4 = calculate_laplacian(split_channels[1][:])
-
-    for i in range(len(samples_list[0])):
-        samples_c3a.append(samples_list[0][i] - samples_average_c3[i])
-        samples_c4a.append(samples_list[1][i] - samples_average_c4[i])
-
-    # convert back to np arrays
-    samples_c3a = np.asarray(samples_c3a)
-    samples_c4a = np.asarray(samples_c4a)
+    samples_c3a, samples_c4a = get_laplacian_matrix(tuple(used_ch_names)) @ np.asarray(samples_list)
     return samples_c3a, samples_c4a
 
 
-def perform_multitaper(samples: np.ndarray, jobs=-1):
+def perform_multitaper(samples: np.ndarray, sfreq: float, f_min: float, f_max: float, bandwidth: float = None):
     """
     Performs multitaper function to convert all samples from time into frequency domain
-    :param samples: all samples from a channel (should be filtered)
-    :param jobs: number of jobs to run in parallel (-1 = num of available CPU cores)
-    :return: psd_abs: power spectral density (PSD) of the samples
+    :param samples: all samples from a channel or channels x samples (should be filtered)
+    :param sfreq: sampling frequency of the samples
+    :param f_min: lowest frequency of the band
+    :param f_max: highest frequency of the band
+    :param bandwidth: frequency bandwidth of the tapers, None for the width of the band
+    :return: psd_abs: power spectral density (PSD) of the samples in between f_min and f_max
              freqs: the corresponding frequencies
     """
-    _bandwidth = F_MAX - F_MIN if F_MAX - F_MIN > 0 else 1
-    psds, freqs = mne.time_frequency.psd_array_multitaper(samples, sfreq=SAMPLING_FREQ, n_jobs=jobs, bandwidth=_bandwidth, fmin=F_MIN, fmax=F_MAX, verbose=False)
-    psds_abs = np.abs(psds)
+    _bandwidth = bandwidth if bandwidth is not None else f_max - f_min if f_max - f_min > 0 else 1
+    psds, freqs = psd_multitaper(samples, sfreq=sfreq, bandwidth=_bandwidth, fmin=f_min, fmax=f_max)
 
-    return psds_abs, freqs
+    return psds, freqs
 
 
-def perform_periodogram(samples: np.ndarray):
-    return signal.periodogram(samples, SAMPLING_FREQ)
+def perform_periodogram(samples: np.ndarray, sfreq: float):
+    return signal.periodogram(samples, sfreq, axis=-1)
 
 
-def perform_rfft(samples: np.ndarray):
+def perform_rfft(samples: np.ndarray, sfreq: float):
     """
     Performs fft function to convert all samples from time into frequency domain
-    :param samples: all samples from a channel (should be filtered)
+    :param samples: all samples from a channel or channels x samples (should be filtered)
+    :param sfreq: sampling frequency of the samples
     :return: fft_spectrum_abs: power spectral density (PSD) of the samples
              freqs: the corresponding frequencies
     """
-    fft_spectrum = np.fft.rfft(samples)
-    freqs = np.fft.rfftfreq(len(samples), d=1 / SAMPLING_FREQ)
+    fft_spectrum = np.fft.rfft(samples, axis=-1)
+    freqs = np.fft.rfftfreq(np.shape(samples)[-1], d=1 / sfreq)
     fft_spectrum_abs = np.abs(fft_spectrum)
 
     return fft_spectrum_abs, freqs
 
 
-def perform_burg(sample: np.array):
+def calculate_burg_coefficients(samples: np.ndarray, order: int):
     """
-     recommended for small window sizes
-    :param sample: all samples from a channel (should be filtered)
-    :return: fft_spectrum_abs: power spectral density (PSD) of the samples
+    Estimates the coefficients of an autoregressive model with the burg method, vectorized over the channels
+    :param samples: samples of each channel (channels x samples)
+    :param order: order of the autoregressive model, must be smaller than the amount of samples
+    :return: ar_coefficients: a_0 (= 1) .. a_order of each channel (channels x order + 1)
+             variance: variance of the driving white noise of each channel
+    """
+    samples = np.asarray(samples, dtype=float)
+    ar_coefficients = np.zeros((samples.shape[0], order + 1))
+    ar_coefficients[:, 0] = 1
+    variance = np.mean(samples ** 2, axis=1)
+    forward_error = samples[:, 1:]
+    backward_error = samples[:, :-1]
+    for m in range(1, order + 1):
+        denominator = np.sum(forward_error ** 2, axis=1) + np.sum(backward_error ** 2, axis=1)
+        reflection = np.divide(-2 * np.sum(forward_error * backward_error, axis=1), denominator,
+                               out=np.zeros_like(denominator), where=denominator > 0)
+        # Levinson recursion: a_k = a_k + reflection * a_(m-k)
+        ar_coefficients[:, 1:m + 1] += reflection[:, np.newaxis] * ar_coefficients[:, m - 1::-1]
+        variance *= 1 - reflection ** 2
+        forward_error, backward_error = (forward_error + reflection[:, np.newaxis] * backward_error)[:, 1:], \
+                                        (backward_error + reflection[:, np.newaxis] * forward_error)[:, :-1]
+    return ar_coefficients, variance
+
+
+def perform_burg(samples: np.ndarray, sfreq: float, f_min: float, f_max: float, order: int = None):
+    """
+    Estimates the PSD with an autoregressive model (burg method), recommended for small window sizes.
+    The AR spectrum is only evaluated on the frequency grid in between f_min and f_max.
+    :param samples: all samples from a channel or channels x samples (should be filtered)
+    :param sfreq: sampling frequency of the samples
+    :param f_min: lowest frequency of the band
+    :param f_max: highest frequency of the band
+    :param order: order of the autoregressive model, None for config.BURG_ORDER
+    :return: psd: power spectral density (PSD) of the samples in between f_min and f_max
              freqs: the corresponding frequencies
     """
-    AR, P, k = arburg(sample, 10)
-    PSD = arma2psd(AR)
-    space = linspace(0, 50, PSD.size)
-
-    # caution! bandpass filter with 50Hz required
-    return PSD, space
+    samples = np.asarray(samples)
+    order = config.BURG_ORDER if order is None else order
+    ar_coefficients, variance = calculate_burg_coefficients(np.atleast_2d(samples), order)
+    freqs = np.arange(f_min, f_max + config.BURG_FREQ_STEP / 2, config.BURG_FREQ_STEP)
+    # frequency response of the AR filter: sum_k a_k * e^(-j2pi f k / fs)
+    response = ar_coefficients @ np.exp(-2j * np.pi * np.outer(np.arange(order + 1), freqs) / sfreq)
+    # one-sided psd
+    psd = 2 * variance[:, np.newaxis] / (sfreq * np.abs(response) ** 2)
+    return (psd if samples.ndim > 1 else psd[0]), freqs
+
+
+@lru_cache(maxsize=32)
+def get_band_bins(n_fft: int, sfreq: float, f_min: float, f_max: float) -> slice:
+    """
+    Maps a frequency band to the rfft bins of a window.
+    The bins only depend on the window length, the sampling frequency and the band, so they are calculated once and
+    cached.
+    :param n_fft: amount of samples of the window
+    :param sfreq: sampling frequency in Hz
+    :param f_min: lowest frequency of the band
+    :param f_max: highest frequency of the band
+    :return: slice of the rfft bins in between f_min and f_max (inclusive)
+    """
+    freqs = np.fft.rfftfreq(n_fft, 1 / sfreq)
+    in_band = np.flatnonzero((freqs >= f_min) & (freqs <= f_max))
+    return slice(in_band[0], in_band[-1] + 1) if len(in_band) else slice(0, 0)
 
 
-def integrate_psd_values(samples: np.ndarray, frequency_list: np.ndarray, used_filter: PSD_METHOD = None, freq_range: [int, int] = None):
+def integrate_psd_values(samples: np.ndarray, frequency_list: np.ndarray, used_filter: PSD_METHOD = None,
+                         freq_range: [int, int] = None, n_fft: int = None, sfreq: float = None):
     """
-    Integrates over the calculated PSD values in between the specified frequencies (F_MIN, F_MAX)
-    :param freq_range: Optional frequency range
+    Integrates over the calculated PSD values in between the specified frequencies
+    :param freq_range: frequency range of the band, required for psd methods which return the whole spectrum
     :param used_filter: Set the previously used filter to control integration
-    :param samples: F(C3), F(C4)
+    :param samples: F(C3), F(C4), the last axis contains the frequencies
     :param frequency_list: list of the included frequencies
+    :param n_fft: amount of samples of the window, if the frequencies are consecutive rfft bins of it, so the bins of
+           the frequency range are cached (see get_band_bins), None for other frequency grids (e.g. burg)
+    :param sfreq: sampling frequency of the window, required with n_fft
+    :raise ValueError: if the psd method returns the whole spectrum, but no frequency range is given
     :return: sum of all PSDs in the given frequency range
     """
-
-    psds_in_band_power = list()
-    requested_frequency_range = list()
-
-    # Set FMIN and FMAX if freq_range ist not None
-    if freq_range:
-        global F_MIN, F_MAX
-        F_MIN = freq_range[0]
-        F_MAX = freq_range[1]
-
+    samples = np.asarray(samples)
+    frequency_list = np.asarray(frequency_list)
     # psd methods whose return values do not automatically contain exclusively the desired frequency range must be modified.
-    if (used_filter is not None and (used_filter == PSD_METHOD.fft or used_filter == PSD_METHOD.burg or used_filter == PSD_METHOD.periodogram)) or freq_range:
-        for i in range(len(frequency_list)):
-            if F_MAX >= frequency_list[i] >= F_MIN:
-                psds_in_band_power.append(samples[i])
-                requested_frequency_range.append(frequency_list[i])
-
-        band_power = scipy.integrate.trapz(psds_in_band_power, requested_frequency_range) if len(requested_frequency_range) > 0 else 0
-    # only Multitaper returns the already  desired frequency range
-    else:
-        band_power = scipy.integrate.trapz(samples, frequency_list)
-
-    return band_power
+    if freq_range and n_fft is not None and len(frequency_list):
+        bins = get_band_bins(n_fft, sfreq, freq_range[0], freq_range[1])
+        # the frequencies may start above 0 Hz (e.g. multitaper and sliding dft)
+        first_bin = int(round(frequency_list[0] * n_fft / sfreq))
+        bins = slice(max(bins.start - first_bin, 0), max(bins.stop - first_bin, 0))
+        samples = samples[..., bins]
+        frequency_list = frequency_list[bins]
+    elif freq_range:
+        in_band = (frequency_list >= freq_range[0]) & (frequency_list <= freq_range[1])
+        samples = samples[..., in_band]
+        frequency_list = frequency_list[in_band]
+    elif used_filter in (PSD_METHOD.fft, PSD_METHOD.periodogram):
+        raise ValueError(f'The psd of {used_filter} has to be integrated with a frequency range')
+    # multitaper, burg and sliding dft return only the desired frequency range
+    if len(frequency_list) == 0:
+        return np.zeros(samples.shape[:-1]) if samples.ndim > 1 else 0
+    return scipy.integrate.trapezoid(samples, frequency_list, axis=-1)
+
+
+def integrate_band_powers(samples: np.ndarray, frequency_list: np.ndarray, bands: dict, n_fft: int = None,
+                          sfreq: float = None) -> dict:
+    """
+    Integrates several frequency bands of the same psd
+    :param samples: F(C3), F(C4), the last axis contains the frequencies
+    :param frequency_list: list of the included frequencies
+    :param bands: name -> (lowest frequency, highest frequency) of each band
+    :param n_fft: amount of samples of the window, see integrate_psd_values
+    :param sfreq: sampling frequency of the window, see integrate_psd_values
+    :return: name -> band power of each band
+    """
+    return {name: integrate_psd_values(samples, frequency_list, freq_range=band, n_fft=n_fft, sfreq=sfreq)
+            for name, band in bands.items()}
 
 
-def manage_ringbuffer(window_size=1.0, offset_in_percentage: float = 0.2):
+def get_windows(chan_data: np.ndarray, window_samples: int, offset_samples: int) -> np.ndarray:
     """
-    Das ist ein Singleton :)
-    amount of samples within 30 seconds = 30s / 1/250Hz
-    size of Ringbuffer = samples within 30s / (sliding_window_factor * 50)
-    :return: Ringbuffer instance
+    Creates all sliding windows of a recording as strided view, no data is copied
+    :param chan_data: samples of a recording (channels x samples)
+    :param window_samples: amount of samples of a sliding window
+    :param offset_samples: amount of samples between the start of two sliding windows
+    :return: read-only channels x windows x samples view
     """
-    global ringbuffer_hcon
-    if ringbuffer_hcon is None:
-        offset = window_size / (offset_in_percentage * 100.0)
-        ringbuffer_hcon = RingBuffer(capacity=int(((30 - window_size) / offset) + 1))
-    return ringbuffer_hcon
+    return np.lib.stride_tricks.sliding_window_view(np.asarray(chan_data), window_samples, axis=1)[:, ::offset_samples]
 
 
-def clear_ring_buffer():
-    global ringbuffer_hcon
-    ringbuffer_hcon = None
+class CursorControlPipeline:
+    """
+    Cursor control algorithm, which converts sliding windows into the corresponding horizontal movement.
 
+    A pipeline owns its configuration (channels, sampling rate, frequency band, psd method) and the state which is
+    carried over from window to window (sliding dft, hcon normalization), so independent pipelines can run side by side,
+    e.g. to compare parameter sets on the same stream. Only pipelines with emit_events post the move events and only
+    pipelines with record_latency (by default the ones with emit_events) record the latency.
 
-def perform_algorithm(sliding_window, used_ch_names, sample_rate, data_mdl, queue_manager: QueueManager = None, offset_in_percentage=0.2):
+    The power of the additional bands of the last window is kept in band_powers. It is not part of the control signal
+    nor the telemetry and is meant as an extension point, e.g. for features of other classifiers or for loggers, which
+    read it after process().
     """
-    Converts a sliding window into the corresponding horizontal movement
-    Contains following steps:
-        (1) Spatial filtering
-        (2) Spectral analysis
-        (3) Band Power calculation
-        (4) Derive normalized cursor control samples
+
+    def __init__(self, used_ch_names: list, sample_rate: float, data_mdl, normalizer: RunningNormalizer,
+                 psd_method: PSD_METHOD = None, emit_events: bool = True, bands: dict = None,
+                 spatial_filter: np.ndarray = None, record_latency: bool = None):
+        """
+        Constructor method
+        :param used_ch_names: name of the used channels of the windows (with C3 at position 0 and C4 at position 1)
+        :param sample_rate: sample rate of the samples
+        :param data_mdl: reference of datamodel, where constants of cc_algorithm are stored
+        :param normalizer: running statistics of the previous hcon values, which are used to standardize hcon
+        :param psd_method: method for psd estimation, None for USED_METHOD
+        :param emit_events: post the move events for the calculated labels
+        :param bands: name -> (lowest frequency, highest frequency) of additional bands, whose band power is
+               integrated from the same spectrum (see band_powers), e.g. config.FREQUENCY_BANDS
+        :param spatial_filter: weights of C3a and C4a (2 x used channels), e.g. trained CSP filters (see csp.py),
+               None for the laplacian
+        :param record_latency: record the latency of the processing stages, None for emit_events
+        """
+        self.used_ch_names = list(used_ch_names)
+        self.sample_rate = sample_rate
+        self.data_mdl = data_mdl
+        self.f_min = data_mdl.f_min
+        self.f_max = data_mdl.f_max
+        self.normalizer = normalizer
+        self.psd_method = USED_METHOD if psd_method is None else psd_method
+        self.emit_events = emit_events
+        self.record_latency = emit_events if record_latency is None else record_latency
+        if spatial_filter is None:
+            spatial_filter = get_laplacian_matrix(tuple(self.used_ch_names))
+        elif np.shape(spatial_filter) != (2, len(self.used_ch_names)):
+            raise ValueError(f'Invalid shape of the spatial filter: {np.shape(spatial_filter)}')
+        self.spatial_filter = spatial_filter
+        self.sliding_dft = SlidingDFT(config.SDFT_RESYNC_INTERVAL)
+        self.bands = dict(bands) if bands else dict()
+        # the spectrum is estimated once for the control band and all additional bands
+        self.spectrum_min = min([self.f_min] + [band[0] for band in self.bands.values()])
+        self.spectrum_max = max([self.f_max] + [band[1] for band in self.bands.values()])
+        self.band_powers = dict()  # band power of C3a and C4a in the additional bands of the last window
+        self.__workspace = None
+        self.__telemetry_record = np.zeros(1, dtype=TELEMETRY_RECORD)
+
+    def reset(self):
+        """Resets the state, which is carried over from window to window"""
+        self.sliding_dft.reset()
+        self.normalizer.reset()
+
+    def perform_spectral_analysis(self, samples: np.ndarray):
+        """
+        Estimates the psd of the spatially filtered channels with the psd method of the pipeline
+        :param samples: C3a, C4a x ... x samples
+        :return: psds: C3a, C4a x ... x frequencies
+                 freqs: the corresponding frequencies
+        """
+        if self.psd_method == PSD_METHOD.fft:
+            return perform_rfft(samples, self.sample_rate)
+        elif self.psd_method == PSD_METHOD.periodogram or self.psd_method == PSD_METHOD.sliding_dft:
+            # offline the sliding dft is replaced by the periodogram it equals
+            freqs, psds = perform_periodogram(samples, self.sample_rate)
+            return psds, freqs
+        elif self.psd_method == PSD_METHOD.burg:
+            psds, freqs = perform_burg(np.reshape(samples, (-1, np.shape(samples)[-1])), self.sample_rate,
+                                       self.spectrum_min, self.spectrum_max)
+            return psds.reshape(np.shape(samples)[:-1] + freqs.shape), freqs
+        elif self.psd_method == PSD_METHOD.multitaper:
+            # all channels are estimated with one batched fft
+            # the bandwidth of the tapers is the width of the control band, also if additional bands are estimated
+            return perform_multitaper(samples, self.sample_rate, self.spectrum_min, self.spectrum_max,
+                                      bandwidth=self.f_max - self.f_min if self.f_max - self.f_min > 0 else 1)
+        raise NotImplementedError(f'The specified method {self.psd_method} is NOT supported!')
+
+    def calculate_band_power(self, psds: np.ndarray, freqs: np.ndarray, n_samples: int = None):
+        """
+        :param psds: psds of C3a and C4a (the last axis contains the frequencies)
+        :param freqs: the corresponding frequencies
+        :param n_samples: amount of samples of the windows, to look the bins of the band up in the cache
+        :return: band power of C3a and C4a in between f_min and f_max
+        """
+        return integrate_psd_values(psds, freqs, self.psd_method, freq_range=(self.f_min, self.f_max),
+                                    n_fft=self.__get_n_fft(n_samples), sfreq=self.sample_rate)
+
+    def calculate_band_powers(self, psds: np.ndarray, freqs: np.ndarray, n_samples: int = None) -> dict:
+        """
+        :param psds: psds of C3a and C4a (the last axis contains the frequencies)
+        :param freqs: the corresponding frequencies
+        :param n_samples: amount of samples of the windows, to look the bins of the bands up in the cache
+        :return: name -> band power of C3a and C4a of each additional band
+        """
+        return integrate_band_powers(psds, freqs, self.bands, n_fft=self.__get_n_fft(n_samples),
+                                     sfreq=self.sample_rate)
+
+    def process(self, sliding_window, new_samples: int = None, telemetry: SharedRing = None):
+        """
+        Converts a sliding window into the corresponding horizontal movement
+        Contains following steps:
+            (1) Spatial filtering
+            (2) Spectral analysis
+            (3) Band Power calculation
+            (4) Derive normalized cursor control samples
+        :param sliding_window: A sliding window (SW) with the used channels (SW(t) should be overlapping with SW(t+1))
+        :param new_samples: amount of samples which are new compared to the previous window, needed by the sliding
+               dft, None if unknown
+        :param telemetry: ring for the telemetry record of the window (see telemetry.py), None to skip it
+        :return: the calculated label (0 = left, 1 = right, -1 = none)
+        """
+        # the sliding dft applies step 0 and 1 in the frequency domain
+        if self.psd_method != PSD_METHOD.sliding_dft:
+            # 0. mute outliers (the sliding window may be a read-only view of the window buffer, so the result is
+            # written into the workspace)
+            workspace = self.__get_workspace(np.shape(sliding_window))
+            sliding_window = standardize_data(sliding_window, workspace)
+            self.__mark(Stage.standardization)
+
+            # 1. Spatial filtering
+            samples = np.matmul(self.spatial_filter, sliding_window, out=workspace.filtered)
+            self.__mark(Stage.spatial_filtering)
+
+            # 2. Spectral analysis
+            psds, freqs = self.perform_spectral_analysis(samples)
+        else:
+            psds, freqs = self.sliding_dft.psd(np.asarray(sliding_window), self.spatial_filter,
+                                               0 if new_samples is None else new_samples,
+                                               self.sample_rate, self.spectrum_min, self.spectrum_max)
+        self.__mark(Stage.spectral_analysis)
+
+        # 3. Band Power calculation
+        n_samples = np.shape(sliding_window)[-1]
+        area_c3, area_c4 = self.calculate_band_power(psds, freqs, n_samples)
+        if self.bands:
+            self.band_powers = self.calculate_band_powers(psds, freqs, n_samples)
+        self.__mark(Stage.band_power)
+
+        # 4. derivation of the control signal hcon from integrated PSD values of c3 and c4
+        hcon = (area_c4 * config.WEIGHT) - area_c3
+
+        # The current hcon is standardized with the running mean and standard deviation of the previous hcon values
+        # (depending on the normalization mode of the first or the last 30 seconds).
+        self.normalizer.update(hcon)
+        standardized_hcon = self.normalizer.standardize(hcon)
+        self.__mark(Stage.normalization)
+
+        # converts the returned hcon to the corresponding label
+        if standardized_hcon > self.data_mdl.threshold - 0.2:
+            # left signal
+            calculated_label = 0
+            # send the command to the game loop, which moves the player left on the Tk main thread
+            if self.emit_events:
+                control_channel.send(calculated_label)
+                self.__mark(Stage.post_event)
+        elif standardized_hcon < -self.data_mdl.threshold:
+            # right signal
+            calculated_label = 1
+            # send the command to the game loop, which moves the player right on the Tk main thread
+            if self.emit_events:
+                control_channel.send(calculated_label)
+                self.__mark(Stage.post_event)
+        else:
+            calculated_label = -1
+
+        # one record per window for the live plot, loggers and metrics, the readers keep their own cursors
+        if telemetry is not None:
+            record = self.__telemetry_record[0]
+            record['time'] = time.perf_counter()
+            record['c3_pow'] = area_c3
+            record['c4_pow'] = area_c4
+            record['hcon'] = hcon
+            record['hcon_stand'] = standardized_hcon
+            record['label'] = calculated_label
+            telemetry.write(self.__telemetry_record)
+
+        return calculated_label
+
+    def filter_windows(self, windows: np.ndarray) -> np.ndarray:
+        """
+        Steps (0) and (1) for many windows: standardizes each channel of each window and applies the spatial filter
+        :param windows: used channels x windows x samples
+        :return: C3a, C4a x windows x samples
+        """
+        return np.tensordot(self.spatial_filter, standardize_data(windows), axes=1)
+
+    def calculate_hcon(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Steps (2) - (4) without the normalization for many windows
+        :param samples: spatially filtered C3a, C4a x windows x samples
+        :return: hcon of each window
+        """
+        psds, freqs = self.perform_spectral_analysis(samples)
+        area_c3, area_c4 = self.calculate_band_power(psds, freqs, np.shape(samples)[-1])
+        return (area_c4 * config.WEIGHT) - area_c3
+
+    def classify(self, standardized_hcon: np.ndarray, threshold: float = None) -> np.ndarray:
+        """
+        Converts standardized hcon values into labels
+        :param standardized_hcon: standardized hcon of each window
+        :param threshold: threshold of the movement, None for the threshold of the data model
+        :return: label of each window (0 = left, 1 = right, -1 = none)
+        """
+        threshold = self.data_mdl.threshold if threshold is None else threshold
+        labels = np.full(len(standardized_hcon), -1, dtype=int)
+        labels[standardized_hcon < -threshold] = 1
+        labels[standardized_hcon > threshold - 0.2] = 0
+        return labels
+
+    def normalize(self, hcon: np.ndarray) -> np.ndarray:
+        """
+        Standardizes hcon values in their order, each with the statistics of the previous values
+        :param hcon: hcon of each window
+        :return: standardized hcon of each window
+        """
+        standardized_hcon = np.empty_like(hcon)
+        for i, value in enumerate(hcon):
+            self.normalizer.update(value)
+            standardized_hcon[i] = self.normalizer.standardize(value)
+        return standardized_hcon
+
+    def process_batch(self, chan_data: np.ndarray, window_samples: int, offset_samples: int, chunk_size: int = 1024):
+        """
+        Offline version of process, which evaluates all sliding windows of a recording at once.
+        The windows are strided views of chan_data, the steps (0) - (3) are calculated as array operations for chunks of
+        chunk_size windows. No events are posted and no plot data is sent.
+        :param chan_data: samples of a recording (used channels x samples)
+        :param window_samples: amount of samples of a sliding window
+        :param offset_samples: amount of samples between the start of two sliding windows
+        :param chunk_size: amount of windows which are processed at once, limits the memory usage
+        :return: hcon: control signal of each window
+                 standardized_hcon: standardized control signal of each window
+                 labels: calculated label of each window (0 = left, 1 = right, -1 = none)
+        """
+        windows = get_windows(chan_data, window_samples, offset_samples)
+        hcon = np.empty(windows.shape[1])
+        for start in range(0, windows.shape[1], chunk_size):
+            samples = self.filter_windows(windows[:, start:start + chunk_size])
+            hcon[start:start + chunk_size] = self.calculate_hcon(samples)
+
+        # 4. normalization, each window is standardized with the statistics of the previous windows
+        standardized_hcon = self.normalize(hcon)
+        return hcon, standardized_hcon, self.classify(standardized_hcon)
+
+    def __get_workspace(self, shape: tuple) -> Workspace:
+        if self.__workspace is None or self.__workspace.shape != tuple(shape):
+            self.__workspace = Workspace(shape, len(self.spatial_filter))
+        return self.__workspace
+
+    def __get_n_fft(self, n_samples: int):
+        # only burg does not estimate the psd on the rfft bins of the window
+        return n_samples if self.psd_method != PSD_METHOD.burg else None
+
+    def __mark(self, stage: Stage):
+        if self.record_latency:
+            latency_recorder.mark(stage)
+
+
+def perform_algorithm(sliding_window, used_ch_names, sample_rate, data_mdl, normalizer: RunningNormalizer,
+                      telemetry: SharedRing = None, offset_in_percentage=0.2,
+                      new_samples: int = None):
+    """
+    Converts a sliding window into the corresponding horizontal movement with a temporary CursorControlPipeline.
+    Streams should use one CursorControlPipeline for all windows, so its state is carried over.
     :param data_mdl: reference of datamodel, where constants of cc_algorithm are stored
-    :param queue_manager: reference of queue manager to pass data to liveplot in another thread
+    :param normalizer: running statistics of the previous hcon values, which are used to standardize hcon
+    :param telemetry: ring for the telemetry record of the window (see telemetry.py), None to skip it
     :param sample_rate: sample rate of the samples
     :param used_ch_names: name of the used channel from the samples
     :param sliding_window: A sliding window (SW) with n channels, n must contain C3 and C4
            (SW(t) should be overlapping with SW(t+1))
     :param offset_in_percentage: offset between start of new window in percentage
-    :return: the normalized value representing horizontal movement
-    """
-
-    # 0. mute outliers
-    for i in range(len(sliding_window)):
-        sliding_window[i] = standardize_data(sliding_window[i])
-
-    global SAMPLING_FREQ, F_MIN, F_MAX
-    SAMPLING_FREQ = sample_rate
-    F_MIN = data_mdl.f_min
-    F_MAX = data_mdl.f_max
-
-    # 1. Spatial filtering
-    samples_c3a, samples_c4a = calculate_spatial_filtering(sliding_window, used_ch_names)
-
-    # 2. Spectral analysis
-    if USED_METHOD == PSD_METHOD.fft:
-        psd_c3a, f_c3a = perform_rfft(samples_c3a)
-        psd_c4a, f_c4a = perform_rfft(samples_c4a)
-    elif USED_METHOD == PSD_METHOD.periodogram:
-        f_c3a, psd_c3a = perform_periodogram(samples_c3a)
-        f_c4a, psd_c4a = perform_periodogram(samples_c4a)
-    elif USED_METHOD == PSD_METHOD.burg:
-        f_c3a, psd_c3a = perform_burg(samples_c3a)
-        f_c4a, psd_c4a = perform_burg(samples_c4a)
-    elif USED_METHOD == PSD_METHOD.multitaper:
-        psd_c3a, f_c3a = perform_multitaper(samples_c3a)
-        psd_c4a, f_c4a = perform_multitaper(samples_c4a)
-    else:
-        raise NotImplementedError(f'The specified method {USED_METHOD} is NOT supported!')
-
-    # 3. Band Power calculation
-    area_c3 = integrate_psd_values(psd_c3a, f_c3a, USED_METHOD)
-    area_c4 = integrate_psd_values(psd_c4a, f_c4a, USED_METHOD)
-
-    # 4. derivation of the control signal hcon from integrated PSD values of c3 and c4
-    hcon = (area_c4 * config.WEIGHT) - area_c3
-
-    ringbuffer = manage_ringbuffer((len(sliding_window[0]) + 1) / sample_rate, offset_in_percentage)
-    # Conditional instruction is responsible for writing to the ring buffer only in the first 30 seconds.
-    if not ringbuffer.is_full:
-        ringbuffer.append(hcon)
-
-    # From the collected previous calculated hcon values from (the last) 30 seconds,
-    # a standard deviation and a mean value are determined.
-    # The current hcon is standardized with these values
-    values = np.array(ringbuffer)
-    mean = np.mean(values)
-    standard_deviation = np.std(values)
-    standardized_hcon = (hcon - mean) / standard_deviation if standard_deviation else 0
-
-    # converts the returned hcon to the corresponding label
-    if standardized_hcon > data_mdl.threshold - 0.2:
-        # left signal
-        calculated_label = 0
-        # call move_left_direction event for the game to move left
-        post_event("move_left_direction")
-    elif standardized_hcon < -data_mdl.threshold:
-        # right signal
-        calculated_label = 1
-        # call move_right_direction event for the game to move right
-        post_event("move_right_direction")
-    else:
-        calculated_label = -1
-
-    # only fill queues if the plot gets drawn and queues are not full
-    if data_mdl.draw_plot and queue_manager:
-        if not queue_manager.queue_hcon.full():
-            queue_manager.queue_hcon_stand.put(standardized_hcon)
-            queue_manager.queue_hcon.put(hcon)
-        if not queue_manager.queue_c3_pow.full() and not queue_manager.queue_c4_pow.full():
-            queue_manager.queue_c3_pow.put(area_c3)
-            queue_manager.queue_c4_pow.put(area_c4)
-        if not queue_manager.queue_clabel.full():
-            queue_manager.queue_clabel.put(calculated_label, True)
-
-    return calculated_label
+    :param new_samples: amount of samples which are new compared to the previous window,
+           None to derive it from offset_in_percentage
+    :return: the calculated label (0 = left, 1 = right, -1 = none)
+    """
+    if new_samples is None:
+        new_samples = round(offset_in_percentage * len(sliding_window[0]))
+    pipeline = CursorControlPipeline(used_ch_names, sample_rate, data_mdl, normalizer)
+    return pipeline.process(sliding_window, new_samples, telemetry)
+
+
+def perform_algorithm_batch(chan_data: np.ndarray, used_ch_names, sample_rate, data_mdl, window_samples: int,
+                            offset_samples: int, normalizer: RunningNormalizer, chunk_size: int = 1024):
+    """
+    Offline version of perform_algorithm, which evaluates all sliding windows of a recording at once,
+    see CursorControlPipeline.process_batch
+    :param chan_data: samples of a recording (channels x samples) with C3 at position 0 and C4 at position 1
+    :param used_ch_names: associated names of all channels
+    :param sample_rate: sample rate of the samples
+    :param data_mdl: reference of datamodel, where constants of cc_algorithm are stored
+    :param window_samples: amount of samples of a sliding window
+    :param offset_samples: amount of samples between the start of two sliding windows
+    :param normalizer: running statistics which are used to standardize hcon
+    :param chunk_size: amount of windows which are processed at once, limits the memory usage
+    :return: hcon, standardized_hcon and labels of each window
+    """
+    pipeline = CursorControlPipeline(used_ch_names, sample_rate, data_mdl, normalizer, emit_events=False)
+    return pipeline.process_batch(chan_data, window_samples, offset_samples, chunk_size)
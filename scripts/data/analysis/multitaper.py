@@ -0,0 +1,82 @@
+from functools import lru_cache
+
+import numpy as np
+from scipy.signal.windows import dpss
+
+""" Script for the multitaper power spectral density estimation of the sliding windows """
+
+
+@lru_cache(maxsize=16)
+def get_tapers(n_samples: int, bandwidth: float, sfreq: float):
+    """
+    Calculates the DPSS tapers and their weights. The tapers only depend on the window length, the bandwidth and the
+    sampling frequency, so they are cached and shared by all windows of a session.
+    Like mne, only tapers with an eigenvalue (spectral concentration) > 0.9 are used.
+    :param int n_samples: amount of samples of a window
+    :param float bandwidth: frequency bandwidth of the tapers in Hz
+    :param float sfreq: sampling frequency in Hz
+    :raise ValueError: if the bandwidth is smaller than the frequency resolution sfreq / n_samples
+    :return: read-only tapers (n_tapers x n_samples) and weights (n_tapers x 1)
+    """
+    half_nbw = float(bandwidth) * n_samples / (2.0 * sfreq)
+    if half_nbw < 0.5:
+        raise ValueError(f'The bandwidth {bandwidth} is too small, use a value of at least {sfreq / n_samples}')
+    if n_samples <= 1:
+        tapers, eigenvalues = np.ones((1, n_samples)), np.ones(1)
+    else:
+        tapers, eigenvalues = dpss(n_samples, half_nbw, int(2 * half_nbw), sym=False, return_ratios=True)
+    used = eigenvalues > 0.9
+    if not used.any():
+        used = [np.argmax(eigenvalues)]
+    tapers = np.ascontiguousarray(tapers[used])
+    weights = np.sqrt(eigenvalues[used])[:, np.newaxis]
+    tapers.flags.writeable = False
+    weights.flags.writeable = False
+    return tapers, weights
+
+
+@lru_cache(maxsize=16)
+def get_frequency_bins(n_samples: int, sfreq: float, fmin: float, fmax: float):
+    """
+    :param int n_samples: amount of samples of a window
+    :param float sfreq: sampling frequency in Hz
+    :param float fmin: lowest frequency in Hz
+    :param float fmax: highest frequency in Hz
+    :return: slice of the rfft bins in between fmin and fmax (inclusive) and the corresponding frequencies
+    """
+    freqs = np.fft.rfftfreq(n_samples, 1.0 / sfreq)
+    bins = np.flatnonzero((freqs >= fmin) & (freqs <= fmax))
+    bins = slice(bins[0], bins[-1] + 1) if len(bins) else slice(0, 0)
+    freqs = freqs[bins]
+    freqs.flags.writeable = False
+    return bins, freqs
+
+
+def psd_multitaper(samples: np.ndarray, sfreq: float, bandwidth: float, fmin: float = 0.0, fmax: float = np.inf):
+    """
+    Multitaper PSD estimation, equivalent to mne.time_frequency.psd_array_multitaper with the default parameters
+    (low_bias=True, adaptive=False, normalization='length', remove_dc=True).
+    All channels and tapers are transformed with one batched rfft.
+    :param np.ndarray samples: samples (n_samples) or channels x samples
+    :param float sfreq: sampling frequency in Hz
+    :param float bandwidth: frequency bandwidth of the tapers in Hz
+    :param float fmin: lowest frequency in Hz
+    :param float fmax: highest frequency in Hz
+    :return: psds: PSD of each channel in between fmin and fmax
+             freqs: the corresponding frequencies
+    """
+    samples = np.asarray(samples, dtype=float)
+    n_samples = samples.shape[-1]
+    tapers, weights = get_tapers(n_samples, bandwidth, sfreq)
+    bins, freqs = get_frequency_bins(n_samples, sfreq, fmin, fmax)
+
+    samples = samples - np.mean(samples, axis=-1, keepdims=True)
+    # channels x tapers x frequencies
+    spectra = np.fft.rfft(samples[..., np.newaxis, :] * tapers, axis=-1)[..., bins]
+    psds = np.sum(np.abs(weights * spectra) ** 2, axis=-2) * (2 / np.sum(weights ** 2))
+    # the one-sided spectrum contains the DC and the Nyquist bin only once
+    if len(freqs) and bins.start == 0:
+        psds[..., 0] /= 2
+    if len(freqs) and n_samples % 2 == 0 and bins.stop == n_samples // 2 + 1:
+        psds[..., -1] /= 2
+    return psds, freqs
@@ -0,0 +1,131 @@
+import enum
+
+import numpy as np
+
+import scripts.config as config
+
+""" Script for the running normalization of the control signal hcon """
+
+
+class NORMALIZATION_MODE(enum.Enum):
+    """
+    Baseline of the hcon normalization
+    """
+    calibration = 1  # mean and std of the first values, frozen afterwards
+    exponential = 2  # exponentially weighted mean and std, older values fade out
+    sliding = 3  # mean and std of the newest values
+
+
+class RunningNormalizer:
+    """
+    Standardizes a stream of values with a running mean and standard deviation, each update costs O(1).
+
+    The statistics are updated with Welford's algorithm. In sliding mode the evicted values are subtracted again, to
+    bound the accumulated rounding errors the statistics are recalculated from the kept values once per capacity updates.
+    """
+
+    def __init__(self, mode: NORMALIZATION_MODE = NORMALIZATION_MODE.calibration, capacity: int = 100):
+        """
+        Constructor method
+        :param NORMALIZATION_MODE mode: baseline of the normalization
+        :param int capacity: amount of values of the calibration baseline and of the sliding window,
+            span of the exponential weighting (alpha = 2 / (capacity + 1))
+        :raise ValueError: if the capacity is smaller than 1
+        """
+        if capacity < 1:
+            raise ValueError(f'Invalid capacity: {capacity}')
+        self.mode = mode
+        self.capacity = capacity
+        self.alpha = 2 / (capacity + 1)
+        self.__values = np.zeros(capacity) if mode == NORMALIZATION_MODE.sliding else None
+        self.reset()
+
+    def reset(self):
+        """Clears the statistics"""
+        self.count = 0  # amount of values the statistics are based on
+        self.updates = 0  # amount of all updates
+        self.mean = 0.0
+        self.__m2 = 0.0  # sum of squared deviations from the mean (variance for the exponential mode)
+
+    @property
+    def is_frozen(self) -> bool:
+        """In calibration mode the statistics are frozen after capacity values"""
+        return self.mode == NORMALIZATION_MODE.calibration and self.count >= self.capacity
+
+    @property
+    def variance(self) -> float:
+        """Population variance of the baseline"""
+        if self.mode == NORMALIZATION_MODE.exponential:
+            return self.__m2
+        return self.__m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation of the baseline"""
+        return float(np.sqrt(max(self.variance, 0.0)))
+
+    def update(self, value: float):
+        """
+        Adds a value to the statistics
+        :param float value: new value
+        """
+        if self.is_frozen:
+            return
+        if self.mode == NORMALIZATION_MODE.exponential:
+            if self.count == 0:
+                self.mean = value
+            else:
+                delta = value - self.mean
+                self.mean += self.alpha * delta
+                self.__m2 = (1 - self.alpha) * (self.__m2 + self.alpha * delta * delta)
+            self.count += 1
+        elif self.mode == NORMALIZATION_MODE.sliding:
+            position = self.updates % self.capacity
+            if self.count == self.capacity:
+                self.__remove(self.__values[position])
+            self.__values[position] = value
+            self.__add(value)
+            if position == self.capacity - 1:
+                self.__resync()
+        else:
+            self.__add(value)
+        self.updates += 1
+
+    def standardize(self, value: float) -> float:
+        """
+        :param float value: value to standardize
+        :return: float: standardized value, 0 if the standard deviation is 0
+        """
+        std = self.std
+        return (value - self.mean) / std if std else 0
+
+    def __add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.__m2 += delta * (value - self.mean)
+
+    def __remove(self, value: float):
+        self.count -= 1
+        if self.count == 0:
+            self.mean = self.__m2 = 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self.__m2 -= delta * (value - self.mean)
+
+    def __resync(self):
+        values = self.__values[:self.count]
+        self.mean = float(np.mean(values))
+        self.__m2 = float(np.sum((values - self.mean) ** 2))
+
+
+def create_hcon_normalizer(window_duration: float, offset_duration: float) -> RunningNormalizer:
+    """
+    Creates the normalizer of the control signal hcon according to the config
+    :param float window_duration: duration of a sliding window in s
+    :param float offset_duration: offset between the sliding windows in s
+    :return: RunningNormalizer: with a capacity of the amount of windows within HCON_NORMALIZATION_TIME
+    """
+    capacity = int(max(config.HCON_NORMALIZATION_TIME - window_duration, 0) / offset_duration) + 1
+    return RunningNormalizer(NORMALIZATION_MODE[config.HCON_NORMALIZATION_MODE], capacity)
@@ -0,0 +1,138 @@
+import numpy as np
+
+""" Script to track the spectrum of the overlapping sliding windows with a recursive sliding DFT """
+
+# channels with a standard deviation below this fraction of their offset (+ 1) count as flat and are standardized to 0,
+# relative to the offset because of the rounding errors of the mean
+FLAT_CHANNEL_TOLERANCE = 1e-10
+
+
+class SlidingDFT:
+    """
+    Sliding DFT of a fixed set of frequency bins of multichannel windows.
+
+    Consecutive sliding windows share most of their samples. Instead of transforming every window from scratch, the DFT
+    bins of the previous window are updated with the samples which entered and left the window:
+        X_new(f) = e^(j2pi f k/n) * (X_old(f) + sum_m (x_in[m] - x_out[m]) * e^(-j2pi f m/n)),  m = 0..k-1
+    which costs O(channels x bins x new samples) per window. The mean and the standard deviation of the channels are
+    tracked the same way with a running sum and sum of squares. The recursion accumulates rounding errors, so the bins
+    and the sums are recalculated from the whole window every resync_interval windows.
+    """
+
+    def __init__(self, resync_interval: int = 250):
+        """
+        Constructor method
+        :param int resync_interval: amount of recursive updates after which the bins are recalculated from scratch
+        """
+        self.resync_interval = resync_interval
+        self.reset()
+
+    def reset(self):
+        """Clears the state, the next window is transformed from scratch"""
+        self.bins = None
+        self.freqs = None
+        self.spectrum = None  # channels x bins
+        self.updates_since_sync = 0
+        self.__layout = None
+        self.__twiddles = None  # samples x bins: e^(-j2pi f m/n)
+        self.__samples = None  # channels x samples ring of the samples of the window, oldest sample at __start
+        self.__start = 0
+        # running sums of the samples of the window, shifted by __shift (the mean at the last resync) against
+        # cancellation
+        self.__shift = None
+        self.__sum = None
+        self.__sum_squares = None
+
+    def __configure(self, n_channels: int, n_samples: int, sfreq: float, fmin: float, fmax: float):
+        """Calculates the bins and twiddle factors, if the window layout has changed"""
+        layout = (n_channels, n_samples, sfreq, fmin, fmax)
+        if layout == self.__layout:
+            return
+        self.reset()
+        self.__layout = layout
+        freqs = np.fft.rfftfreq(n_samples, 1.0 / sfreq)
+        self.bins = np.flatnonzero((freqs >= fmin) & (freqs <= fmax))
+        self.freqs = freqs[self.bins]
+        self.__twiddles = np.exp(-2j * np.pi * np.outer(np.arange(n_samples), self.bins) / n_samples)
+        self.__samples = np.empty((n_channels, n_samples))
+
+    def update(self, window: np.ndarray, new_samples: int, sfreq: float, fmin: float, fmax: float) -> np.ndarray:
+        """
+        Updates the DFT bins with the newest window
+        :param np.ndarray window: channels x samples window
+        :param int new_samples: amount of samples which are new compared to the previous window
+        :param float sfreq: sampling frequency in Hz
+        :param float fmin: lowest frequency in Hz
+        :param float fmax: highest frequency in Hz
+        :return: np.ndarray: DFT bins of the window (channels x bins), see freqs for the frequencies
+        """
+        n_channels, n_samples = window.shape
+        self.__configure(n_channels, n_samples, sfreq, fmin, fmax)
+        if self.spectrum is None or not 0 < new_samples < n_samples \
+                or self.updates_since_sync >= self.resync_interval:
+            self.spectrum = window @ self.__twiddles[:n_samples]
+            np.copyto(self.__samples, window)
+            self.__start = 0
+            self.__shift = np.mean(window, axis=1)
+            deviations = window - self.__shift[:, np.newaxis]
+            self.__sum = np.sum(deviations, axis=1)
+            self.__sum_squares = np.sum(deviations ** 2, axis=1)
+            self.updates_since_sync = 0
+        else:
+            # only the entering samples are copied, they replace the leaving samples in the ring
+            positions = (self.__start + np.arange(new_samples)) % n_samples
+            leaving = self.__samples[:, positions] - self.__shift[:, np.newaxis]
+            entering = window[:, n_samples - new_samples:]
+            self.__samples[:, positions] = entering
+            self.__start = (self.__start + new_samples) % n_samples
+            entering = entering - self.__shift[:, np.newaxis]
+            difference = entering - leaving
+            self.spectrum += difference @ self.__twiddles[:new_samples]
+            # shift by new_samples: e^(j2pi f k/n) = conj(e^(-j2pi f k/n))
+            self.spectrum *= np.conj(self.__twiddles[new_samples])
+            self.__sum += np.sum(difference, axis=1)
+            self.__sum_squares += np.sum(entering ** 2 - leaving ** 2, axis=1)
+            self.updates_since_sync += 1
+        return self.spectrum
+
+    def __moments(self, n_samples: int):
+        """
+        Calculates the mean and the standard deviation of the channels of the window from the running sums
+        :param int n_samples: amount of samples of the window
+        :return: mean, std: per channel
+        """
+        mean = self.__sum / n_samples
+        variance = np.maximum(self.__sum_squares / n_samples - mean ** 2, 0)
+        return mean + self.__shift, np.sqrt(variance)
+
+    def psd(self, window: np.ndarray, weights: np.ndarray, new_samples: int, sfreq: float, fmin: float, fmax: float):
+        """
+        Calculates the PSD of spatially filtered, standardized channels.
+        Standardization (per channel and window) and spatial filtering are linear, so they are applied to the tracked
+        bins of the unstandardized channels instead of the samples. The result equals a periodogram (boxcar window,
+        constant detrend) of the filtered channels, restricted to the bins in between fmin and fmax. Flat channels
+        (see FLAT_CHANNEL_TOLERANCE) are standardized to 0.
+        :param np.ndarray window: channels x samples window (unstandardized)
+        :param np.ndarray weights: m x channels weights of the spatial filter
+        :param int new_samples: amount of samples which are new compared to the previous window
+        :param float sfreq: sampling frequency in Hz
+        :param float fmin: lowest frequency in Hz
+        :param float fmax: highest frequency in Hz
+        :return: psds: m x bins PSD of the spatially filtered channels
+                 freqs: the corresponding frequencies
+        """
+        spectrum = self.update(window, new_samples, sfreq, fmin, fmax)
+        n_samples = window.shape[1]
+        mean, std = self.__moments(n_samples)
+        # the same zero-variance guard as the standardization of the samples
+        is_valid = std > FLAT_CHANNEL_TOLERANCE * (np.abs(mean) + 1)
+        scale = np.divide(1.0, std, out=np.zeros_like(std), where=is_valid)
+        filtered = weights @ (spectrum * scale[:, np.newaxis])
+        psds = np.abs(filtered) ** 2 * (2 / (sfreq * n_samples))
+        if len(self.bins):
+            # the standardized channels have no DC component
+            if self.bins[0] == 0:
+                psds[:, 0] = 0
+            if n_samples % 2 == 0 and self.bins[-1] == n_samples // 2:
+                psds[:, -1] /= 2
+        return psds, self.freqs
@@ -0,0 +1,264 @@
+import argparse
+import itertools
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+from typing import List
+
+import numpy as np
+
+import scripts.config as config
+from scripts.data.acquisition.channel_map import ChannelMap
+from scripts.data.acquisition.stream_filter import create_stream_filter
+from scripts.data.analysis.cursor_control_algorithm import CursorControlPipeline, PSD_METHOD, USED_METHOD, get_windows
+from scripts.data.analysis.normalization import create_hcon_normalizer
+from scripts.data.loader import bcic_dataset_loader as bdl
+from scripts.data.loader.game_dataset_loader import get_session_meta, load_raw_data
+from scripts.mvc.models import ConfigData
+
+"""
+Script to sweep the parameters of the cursor control algorithm over recorded sessions.
+
+The sessions are loaded and filtered once and placed in shared memory, the grid is evaluated by a process pool.
+Grid points which share the channels, the window size and the window offset are evaluated by the same task, so the
+standardization and the spatial filtering of the windows are only calculated once per group. The thresholds of a
+frequency band share the whole calculation up to the standardized hcon.
+
+Usage: python -m scripts.data.analysis.sweep session1.npz session2.npz --f-min 6 8 10 --threshold 1 1.5
+"""
+
+# attached sessions of a worker process: name -> (chan_data, labels, sampling rate, channel names)
+sessions = dict()
+_shared_memory = list()
+
+
+class Session:
+    """Recorded session in shared memory, which can be attached in the worker processes via its spec"""
+
+    def __init__(self, name: str, chan_data: np.ndarray, labels: np.ndarray, sampling_rate: float,
+                 channel_names: List[str]):
+        """
+        Constructor method, copies the data into shared memory
+        :param str name: name of the session
+        :param np.ndarray chan_data: channels x samples data
+        :param np.ndarray labels: label of each sample (0 = left, 1 = right, -1 = none)
+        :param float sampling_rate: sampling rate in Hz
+        :param List[str] channel_names: names of the channels
+        """
+        self.name = name
+        self.sampling_rate = sampling_rate
+        self.channel_names = list(channel_names)
+        self.memory = list()
+        self.specs = [self.__share(np.ascontiguousarray(chan_data, dtype=float)),
+                      self.__share(np.ascontiguousarray(labels, dtype=np.int8))]
+
+    def __share(self, array: np.ndarray) -> tuple:
+        memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=memory.buf)[:] = array
+        self.memory.append(memory)
+        return memory.name, array.shape, array.dtype.str
+
+    @property
+    def spec(self) -> tuple:
+        """Picklable description of the session"""
+        return self.name, self.specs, self.sampling_rate, self.channel_names
+
+    def close(self):
+        """Frees the shared memory"""
+        for memory in self.memory:
+            memory.close()
+            memory.unlink()
+        self.memory.clear()
+
+
+def load_session(session_path: str) -> Session:
+    """
+    Loads a MindPong session, the raw data is filtered like the live stream (see stream_filter)
+    :param str session_path: path of the npz file
+    :return: Session
+    """
+    meta = get_session_meta(session_path)
+    chan_data = np.asarray(load_raw_data(session_path), dtype=float)
+    chan_data = create_stream_filter(chan_data.shape[0], meta['sampling_rate']).filter(chan_data)
+
+    labels = np.full(chan_data.shape[1], -1, dtype=np.int8)
+    with np.load(session_path, allow_pickle=True) as data:
+        for pos, duration, event_type in zip(data['event_pos'], data['event_duration'], data['event_type']):
+            value = getattr(event_type, 'value', event_type)
+            # only left (0) and right (1) trials are evaluated
+            if value in (0, 1):
+                labels[int(pos):int(pos) + int(duration)] = value
+    return Session(os.path.basename(session_path), chan_data, labels, meta['sampling_rate'], meta['channels'])
+
+
+def load_bcic_session(subject: int) -> Session:
+    """
+    Loads the training data of a subject of the BCIC dataset (see bcic_dataset_loader)
+    :param int subject: number of the subject
+    :return: Session
+    """
+    chan_data, labels = bdl.get_channel_rawdata(subject)
+    labels = np.where(np.isin(labels, (0, 1)), labels, -1)
+    return Session(f'BCIC A0{subject}T', chan_data, labels, bdl.SAMPLERATE, bdl.CHANNELS)
+
+
+def attach_sessions(session_specs: list):
+    """
+    Initializer of the worker processes, attaches the sessions in shared memory
+    :param list session_specs: specs of the sessions
+    """
+    for name, specs, sampling_rate, channel_names in session_specs:
+        arrays = list()
+        for memory_name, shape, dtype in specs:
+            memory = shared_memory.SharedMemory(name=memory_name)
+            _shared_memory.append(memory)
+            array = np.ndarray(shape, np.dtype(dtype), buffer=memory.buf)
+            array.flags.writeable = False
+            arrays.append(array)
+        sessions[name] = (arrays[0], arrays[1], sampling_rate, channel_names)
+
+
+def get_trials(labels: np.ndarray) -> List[tuple]:
+    """
+    :param np.ndarray labels: label of each sample
+    :return: List[tuple]: (start, stop, label) of each left and right trial
+    """
+    changes = np.flatnonzero(np.diff(labels)) + 1
+    bounds = np.concatenate(([0], changes, [len(labels)]))
+    return [(start, stop, labels[start]) for start, stop in zip(bounds[:-1], bounds[1:]) if labels[start] in (0, 1)]
+
+
+def calculate_trial_accuracy(window_labels: np.ndarray, window_ends: np.ndarray, trials: List[tuple]) -> float:
+    """
+    A trial is classified correctly if the majority of the movements during the trial goes into the right direction.
+    The movement of a window is assigned to the trial which contains the newest sample of the window.
+    :param np.ndarray window_labels: calculated label of each window
+    :param np.ndarray window_ends: index of the newest sample of each window
+    :param List[tuple] trials: (start, stop, label) of each trial
+    :return: float: ratio of correctly classified trials
+    """
+    if not trials:
+        return np.nan
+    correct = 0
+    for start, stop, label in trials:
+        first, last = np.searchsorted(window_ends, (start, stop))
+        votes = window_labels[first:last]
+        correct += np.count_nonzero(votes == label) > np.count_nonzero(votes == 1 - label)
+    return correct / len(trials)
+
+
+def evaluate_group(task: tuple) -> List[dict]:
+    """
+    Evaluates all grid points of a session, which share the channels, the window size and the window offset
+    :param tuple task: session name, channels, window size (ms), window offset (ms), bands, thresholds, psd method
+    :return: List[dict]: accuracy of each grid point
+    """
+    session_name, channels, window_size, window_offset, bands, thresholds, psd_method = task
+    chan_data, labels, sampling_rate, channel_names = sessions[session_name]
+    weights = [1 if name in channels else 0 for name in channel_names]
+    channel_map = ChannelMap(channel_names, weights)
+    window_samples = int(window_size / 1000 * sampling_rate)
+    offset_samples = int(window_offset / 1000 * sampling_rate)
+    windows = get_windows(chan_data[channel_map.indices], window_samples, offset_samples)
+    window_ends = np.arange(windows.shape[1]) * offset_samples + window_samples - 1
+    trials = get_trials(labels)
+
+    pipelines = list()
+    for f_min, f_max in bands:
+        data_mdl = ConfigData(f_min=f_min, f_max=f_max, window_size=window_size, window_offset=window_offset)
+        normalizer = create_hcon_normalizer(window_size / 1000, window_offset / 1000)
+        pipelines.append(CursorControlPipeline(channel_map.names, sampling_rate, data_mdl, normalizer,
+                                               psd_method=psd_method, emit_events=False))
+
+    hcon = np.empty((len(bands), windows.shape[1]))
+    chunk_size = 1024
+    for start in range(0, windows.shape[1], chunk_size):
+        # standardization and spatial filtering are shared by all bands
+        samples = pipelines[0].filter_windows(windows[:, start:start + chunk_size])
+        for i, pipeline in enumerate(pipelines):
+            hcon[i, start:start + chunk_size] = pipeline.calculate_hcon(samples)
+
+    results = list()
+    for pipeline, band_hcon in zip(pipelines, hcon):
+        standardized_hcon = pipeline.normalize(band_hcon)
+        for threshold in thresholds:
+            window_labels = pipeline.classify(standardized_hcon, threshold)
+            results.append({'session': session_name, 'channels': channels, 'window_size': window_size,
+                            'window_offset': window_offset, 'f_min': pipeline.f_min, 'f_max': pipeline.f_max,
+                            'threshold': threshold,
+                            'accuracy': calculate_trial_accuracy(window_labels, window_ends, trials)})
+    return results
+
+
+def run_sweep(loaded_sessions: List[Session], channels: List[tuple], window_sizes: List[int],
+              window_offsets: List[int], bands: List[tuple], thresholds: List[float],
+              psd_method: PSD_METHOD = None, processes: int = None) -> List[dict]:
+    """
+    Evaluates the parameter grid on all sessions with a process pool
+    :param List[Session] loaded_sessions: sessions in shared memory
+    :param List[tuple] channels: sets of used channel names
+    :param List[int] window_sizes: window sizes in ms
+    :param List[int] window_offsets: window offsets in ms
+    :param List[tuple] bands: frequency bands (f_min, f_max) in Hz
+    :param List[float] thresholds: thresholds of the movement
+    :param PSD_METHOD psd_method: method for psd estimation, None for USED_METHOD
+    :param int processes: amount of worker processes, None for the amount of cores
+    :return: List[dict]: grid points ranked by the mean accuracy over all sessions
+    """
+    psd_method = USED_METHOD if psd_method is None else psd_method
+    tasks = [(session.name, tuple(channel_set), window_size, window_offset, bands, thresholds, psd_method)
+             for session, channel_set, window_size, window_offset
+             in itertools.product(loaded_sessions, channels, window_sizes, window_offsets)]
+
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(processes, initializer=attach_sessions,
+                      initargs=([session.spec for session in loaded_sessions],)) as pool:
+        results = [result for group in pool.imap_unordered(evaluate_group, tasks) for result in group]
+
+    # mean accuracy of each grid point over all sessions
+    ranking = dict()
+    for result in results:
+        key = (result['channels'], result['window_size'], result['window_offset'], result['f_min'], result['f_max'],
+               result['threshold'])
+        ranking.setdefault(key, list()).append(result['accuracy'])
+    ranked = [{'channels': key[0], 'window_size': key[1], 'window_offset': key[2], 'f_min': key[3], 'f_max': key[4],
+               'threshold': key[5], 'accuracy': float(np.nanmean(accuracies)) if not np.all(np.isnan(accuracies))
+               else np.nan, 'sessions': len(accuracies)} for key, accuracies in ranking.items()]
+    return sorted(ranked, key=lambda row: -np.nan_to_num(row['accuracy'], nan=-1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweeps the parameters of the cursor control algorithm')
+    parser.add_argument('sessions', nargs='*', help='MindPong npz sessions')
+    parser.add_argument('--bcic', nargs='*', type=int, default=[], help='subjects of the BCIC dataset')
+    parser.add_argument('--f-min', nargs='+', type=float, default=[8])
+    parser.add_argument('--f-max', nargs='+', type=float, default=[12])
+    parser.add_argument('--window-size', nargs='+', type=int, default=[1000], help='in ms')
+    parser.add_argument('--window-offset', nargs='+', type=int, default=[200], help='in ms')
+    parser.add_argument('--threshold', nargs='+', type=float, default=[1.5])
+    parser.add_argument('--channels', nargs='+', action='append',
+                        help='used channel names, can be repeated for several channel sets')
+    parser.add_argument('--method', choices=[method.name for method in PSD_METHOD], default=USED_METHOD.name)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--top', type=int, default=20, help='amount of printed grid points')
+    args = parser.parse_args()
+
+    channels = args.channels if args.channels else \
+        [[name for name, weight in zip(config.BCI_CHANNELS, config.CH_NAMES_WEIGHT) if weight != 0]]
+    bands = [(f_min, f_max) for f_min, f_max in itertools.product(args.f_min, args.f_max) if f_min < f_max]
+    loaded_sessions = [load_session(path) for path in args.sessions] + [load_bcic_session(s) for s in args.bcic]
+    try:
+        ranked = run_sweep(loaded_sessions, channels, args.window_size, args.window_offset, bands, args.threshold,
+                           PSD_METHOD[args.method], args.processes)
+    finally:
+        for session in loaded_sessions:
+            session.close()
+
+    print(f'{"accuracy":>9}{"f_min":>7}{"f_max":>7}{"window":>8}{"offset":>8}{"threshold":>11}  channels')
+    for row in ranked[:args.top]:
+        print(f'{row["accuracy"]:>9.3f}{row["f_min"]:>7g}{row["f_max"]:>7g}{row["window_size"]:>8}'
+              f'{row["window_offset"]:>8}{row["threshold"]:>11g}  {" ".join(row["channels"])}')
+
+
+if __name__ == '__main__':
+    main()
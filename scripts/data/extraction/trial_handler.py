@@ -30,19 +30,33 @@ count_trials = 0
 count_event_types = 0
 
 
+def set_stream_properties(n_channels: int, sampling_rate: float):
+    """
+    Sets the amount of channels and the sampling rate of the recorded stream and clears the raw data buffer.
+    Has to be called at the start of each live session before the first send_raw_data(), read_data and the
+    AcquisitionProcess call it with the properties of the connected board (headset or synthetic board)
+    :param int n_channels: amount of eeg channels
+    :param float sampling_rate: sampling rate in Hz
+    """
+    global NUMBER_CHANNELS, TIME_FOR_ONE_SAMPLE, raw_data
+    NUMBER_CHANNELS = n_channels
+    TIME_FOR_ONE_SAMPLE = 1 / sampling_rate
+    raw_data = [[] for _ in range(NUMBER_CHANNELS)]
+
+
 def send_raw_data(data, start: time.time() = None):
     """
     Start time of the session is passed only at the first data transfer of the session
     (1) If start is not None the time stamp of the start of session get saved in start_time
     (2) Sent data get saved in raw_data
-    :param data[] data: raw data from the data acquisition
+    :param data[] data: raw data block (channels x samples) from the data acquisition
     :param time.time() start: time stamp of the start of the session
     """
     if start is not None:
         global start_time
         start_time = start
     for i in range(len(raw_data)):
-        raw_data[i].append(data[i][0])
+        raw_data[i].extend(data[i])
 
 
 def mark_trial(start: float, end: float, label: Labels):
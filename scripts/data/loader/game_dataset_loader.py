@@ -3,6 +3,7 @@ Based on bcic_data_loading.py
 Script to read npz files from MindPong and converting them in a Format for the ML-BCI-framework
 """
 
+import zipfile
 from typing import List
 
 import mne
@@ -36,6 +37,52 @@ def to_idxs_of_list_str(elements: List[str], list: List[str]):
     return [list_upper.index(el.upper()) for el in elements]
 
 
+def get_session_meta(session_path: str) -> dict:
+    """
+    loads only the metadata of a npz session file
+    :param session_path: path of the npz file
+    :return: metadata of the session, e.g. meta['sampling_rate'], meta['channels']
+    """
+    with np.load(session_path, allow_pickle=True) as data:
+        return dict(data['meta'].tolist())
+
+
+def load_raw_data(session_path: str, member: str = 'raw_data') -> np.ndarray:
+    """
+    Memory-maps the raw data of a npz session file without loading it into RAM.
+    np.savez stores the arrays uncompressed, so the .npy member can be mapped directly at its offset in the zip file.
+    Only the samples which are accessed are read from disk. Compressed files and arrays which can't be mapped
+    (e.g. object arrays) are loaded completely as before.
+    :param session_path: path of the npz file
+    :param member: name of the array in the npz file
+    :return: read-only np.memmap (or np.ndarray) with the channels x samples raw data
+    """
+    with zipfile.ZipFile(session_path) as archive:
+        info = archive.getinfo(member + '.npy')
+        can_be_mapped = info.compress_type == zipfile.ZIP_STORED
+
+    if can_be_mapped:
+        with open(session_path, 'rb') as file:
+            # skip the local file header: 30 bytes + file name + extra field
+            file.seek(info.header_offset + 26)
+            name_length, extra_length = np.frombuffer(file.read(4), dtype='<u2')
+            file.seek(info.header_offset + 30 + int(name_length) + int(extra_length))
+            version = np.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+            elif version == (2, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+            else:
+                dtype = np.dtype(object)
+            offset = file.tell()
+        if not dtype.hasobject and np.prod(shape) > 0:
+            return np.memmap(session_path, dtype=dtype, mode='r', offset=offset, shape=shape,
+                             order='F' if fortran_order else 'C')
+
+    with np.load(session_path, allow_pickle=True) as data:
+        return data[member]
+
+
 def get_channel_rawdata(session_path: str, ch_names: List[str] = None):
     """
     loads the npz file and transforms the data for the ML-BCI framework
@@ -49,7 +96,7 @@ def get_channel_rawdata(session_path: str, ch_names: List[str] = None):
     data = np.load(session_path, allow_pickle=True)
 
     meta = data['meta']
-    chan_data = data['raw_data']
+    chan_data = load_raw_data(session_path)
     event_type = data['event_type']
     event_pos = data['event_pos']
     event_dur = data['event_duration']
@@ -61,6 +108,7 @@ def get_channel_rawdata(session_path: str, ch_names: List[str] = None):
         # select channels
         try:
             ch_idxs = to_idxs_of_list_str(ch_names, channels)
+            # only the selected channels are read from the memory-mapped file
             chan_data = chan_data[ch_idxs, :]
         except ValueError:
             print('Channel name unknown/not present')
@@ -0,0 +1,84 @@
+import multiprocessing
+
+import numpy as np
+
+from scripts.utils.shared_ring import SharedRing
+
+"""
+Script to run the pyqtgraph dashboard (see liveplot.py) in a separate process.
+The dashboard attaches the shared telemetry and sample rings and only reads them, pyqtgraph is only imported by the
+dashboard process.
+"""
+
+JOIN_TIMEOUT = 2  # in s, time the dashboard gets to close its window before the process is terminated
+
+
+class DashboardProcess:
+    """
+    Shows the dashboard in a worker process, so the rendering gets its own core and its own GUI event loop and never
+    competes with the acquisition or the Tk game loop. The rings stay owned by their writer, the dashboard only reads
+    them with its own readers.
+    """
+
+    def __init__(self, telemetry_ring: SharedRing, sample_ring: SharedRing, channel_names: list, sampling_rate: int):
+        """
+        Constructor method
+        :param SharedRing telemetry_ring: shared telemetry ring of the algorithm (see telemetry.py)
+        :param SharedRing sample_ring: shared ring of the EEG samples (channels per record)
+        :param list channel_names: names of the channels of the samples
+        :param int sampling_rate: sampling rate of the samples in Hz
+        """
+        # spawn instead of fork, forking the process with the running Tk interpreter is not safe
+        context = multiprocessing.get_context('spawn')
+        self.stop_event = context.Event()
+        self.process = context.Process(target=run_dashboard, daemon=True,
+                                       args=(telemetry_ring.spec, sample_ring.spec, list(channel_names),
+                                             sampling_rate, self.stop_event))
+
+    def start(self):
+        """Starts the dashboard process"""
+        self.process.start()
+
+    def join(self):
+        """
+        Closes the dashboard and waits for the process, has to be called before the rings are closed.
+        A dashboard which does not close within JOIN_TIMEOUT is terminated, so it cannot block the Tk main thread.
+        """
+        self.stop_event.set()
+        self.process.join(JOIN_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+
+
+def run_dashboard(telemetry_spec: dict, sample_spec: dict, channel_names: list, sampling_rate: int, stop_event):
+    """
+    Entry point of the dashboard process: attaches the shared rings and shows the dashboard until it is closed or the
+    stop event is set, afterwards the rings are detached again
+    :param dict telemetry_spec: spec of the shared telemetry ring
+    :param dict sample_spec: spec of the shared sample ring
+    :param list channel_names: names of the channels of the samples
+    :param int sampling_rate: sampling rate of the samples in Hz
+    :param stop_event: multiprocessing.Event to close the dashboard
+    """
+    from scripts.data.visualisation.liveplot import start_liveplot
+    telemetry = SharedRing.attach(telemetry_spec)
+    samples = SharedRing.attach(sample_spec)
+    try:
+        start_liveplot(telemetry, samples, channel_names, sampling_rate, stop_event)
+    finally:
+        telemetry.close()
+        samples.close()
+
+
+def shift(data: np.ndarray, values: np.ndarray):
+    """
+    Shifts the data of a graph in place and appends the new values at the end
+    :param np.ndarray data: preallocated data, oldest value first
+    :param np.ndarray values: at most len(data) new values
+    """
+    n_values = len(values)
+    if n_values == 0:
+        return
+    data[:-n_values] = data[n_values:]
+    data[-n_values:] = values
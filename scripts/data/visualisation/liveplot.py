@@ -1,84 +1,136 @@
-import queue
 import sys
-import time
 
+import numpy as np
 import pyqtgraph as pg
 from PyQt5 import QtWidgets, QtCore
 
-main_window = None
-queues = list()
-is_window_ready = False
+import scripts.config as config
+from scripts.data.visualisation.dashboard_process import shift
+from scripts.utils.shared_ring import SharedRing
+from scripts.utils.telemetry import TELEMETRY_RECORD
 
+"""
+Live dashboard of the telemetry of the cursor control algorithm and of the EEG samples, rendered with pyqtgraph.
 
-class MainWindow(QtWidgets.QMainWindow):
-    def __init__(self, *args, **kwargs):
-        super(MainWindow, self).__init__(*args, **kwargs)
+The dashboard runs in its own process (see dashboard_process.py) and only reads the shared telemetry and sample rings
+with its own readers, so the rendering never blocks the acquisition or the game.
+"""
 
-        self.graphWidget = pg.PlotWidget()
-        self.setCentralWidget(self.graphWidget)
+# constants
+AXES_SIZE = 200  # amount of windows which are shown
+EEG_SPACING = 100  # in uV, vertical distance between two EEG traces
 
-        self.x = list(range(100))
+# graphs of the telemetry: (field, subplot, colour, name)
+TELEMETRY_GRAPHS = [('c3_pow', 'pow', '#0096db', 'C3 pow'),
+                    ('c4_pow', 'pow', '#009d6b', 'C4 pow'),
+                    ('hcon', 'hcon', '#f17a2c', 'hcon'),
+                    ('hcon_stand', 'hcon', '#FFC107', 'hcon standardized'),
+                    ('label', 'label', '#96669e', 'calculated label')]
 
-        self.graphWidget.setYRange(-1.1, 1.1)
-        self.graphWidget.addLegend()
 
+class MainWindow(QtWidgets.QMainWindow):
+    """
+    Window with the band power, hcon and label of the last AXES_SIZE windows and the scrolling EEG traces of the last
+    DASHBOARD_EEG_DURATION seconds. The data is kept in preallocated arrays, which are shifted in place on each frame.
+    """
+
+    def __init__(self, telemetry: SharedRing, samples: SharedRing, channel_names: list, sampling_rate: int,
+                 stop_event=None, *args, **kwargs):
+        """
+        Constructor method
+        :param SharedRing telemetry: telemetry ring of the algorithm (see telemetry.py)
+        :param SharedRing samples: ring of the EEG samples (channels per record)
+        :param list channel_names: names of the channels of the samples
+        :param int sampling_rate: sampling rate of the samples in Hz
+        :param stop_event: multiprocessing.Event, the window closes as soon as it is set
+        """
+        super(MainWindow, self).__init__(*args, **kwargs)
+        self.stop_event = stop_event
+        self.telemetry_reader = telemetry.reader()
+        self.sample_reader = samples.reader()
+
+        self.graphWidget = pg.GraphicsLayoutWidget()
         self.graphWidget.setBackground('k')
-        # self.graphWidget.showGrid(x=True, y=True)
+        self.setCentralWidget(self.graphWidget)
+
+        # telemetry
+        self.x = np.arange(AXES_SIZE)
+        self.telemetry_data = np.zeros(AXES_SIZE, dtype=TELEMETRY_RECORD)
+        # initialize label with -1 alias not defined
+        self.telemetry_data['label'] = -1
+        plots = dict()
+        for row, plot_label in enumerate(('pow', 'hcon', 'label')):
+            plots[plot_label] = self.graphWidget.addPlot(row=row, col=0, title=plot_label)
+            plots[plot_label].addLegend(offset=(10, 10))
+            plots[plot_label].getAxis('bottom').setStyle(showValues=False)
+        plots['label'].setYRange(-1.1, 1.1)
+        plots['label'].getAxis('left').setTicks([[(-1, 'n'), (0, 'l'), (1, 'r')]])
+        self.telemetry_curves = list()
+        for field, plot_label, colour, name in TELEMETRY_GRAPHS:
+            curve = plots[plot_label].plot(self.x, self.telemetry_data[field].astype(float), name=name,
+                                           pen=pg.mkPen(width=2, color=colour))
+            self.telemetry_curves.append((field, curve))
+
+        # EEG
+        n_channels = samples.record_shape[0]
+        if len(channel_names) != n_channels:
+            channel_names = [f'ch {index + 1}' for index in range(n_channels)]
+        self.eeg_time = np.arange(-int(config.DASHBOARD_EEG_DURATION * sampling_rate), 0) / sampling_rate
+        self.eeg_data = np.zeros((len(self.eeg_time), n_channels))
+        # the first channel is drawn at the top
+        self.eeg_offsets = np.arange(n_channels)[::-1] * EEG_SPACING
+        eeg_plot = self.graphWidget.addPlot(row=0, col=1, rowspan=3, title='EEG')
+        eeg_plot.setClipToView(True)
+        eeg_plot.setDownsampling(auto=True, mode='peak')
+        eeg_plot.setYRange(-EEG_SPACING, n_channels * EEG_SPACING)
+        eeg_plot.getAxis('left').setTicks([list(zip(self.eeg_offsets, channel_names))])
+        eeg_plot.setLabel('bottom', 'time', units='s')
+        self.eeg_curves = [eeg_plot.plot(self.eeg_time, self.eeg_data[:, channel] + self.eeg_offsets[channel],
+                                         pen=pg.mkPen(color=pg.intColor(channel, hues=n_channels)))
+                           for channel in range(n_channels)]
 
         self.timer = QtCore.QTimer()
-        self.timer.setInterval(50)
+        self.timer.setInterval(int(1000 / config.DASHBOARD_FPS))
         self.timer.timeout.connect(self.update_plot_data)
         self.timer.start()
 
-    def add_plot(self, queue):
-        global queues
-        plot = self.graphWidget.plot(self.x, list(queue[2].queue), name=queue[0], pen=pg.mkPen(width=2, color=queue[1]))
-        queues.append((queue[2], plot, list(range(100))))
-
     def update_plot_data(self):
         """
-        Periodically called to update the values by extracting the current values from the queues.
+        Periodically called to read the new records of both rings and to update the graphs, graphs without new data
+        are not updated.
         """
-        try:
-            global queues
-            # update x value
-            self.x = self.x[1:]  # Remove the first y element.
-            self.x.append(self.x[-1] + 1)  # Add a new value 1 higher than the last.
-
-            for index, queueItem in enumerate(queues):
-                # update values
-                q = queueItem[0]
-                plot = queueItem[1]
-                data_line = queueItem[2]
-
-                data_line = data_line[1:]  # Get and remove the first element of the queue
-                data_line.append(q.get())
-                plot.setData(self.x, data_line)  # Update the data.
-                queues[index] = (q, plot, data_line)
-        except:
-            time.sleep(0.005)
-
-
-def add_queue(q: (str, str, queue.Queue)):
-    """
-    Adds a queue to the live plot
-    :param q: consists of the name of the label and the corresponding queue
-    """
-    global main_window
-    if main_window:
-        main_window.add_plot(q)
-
-
-def start_liveplot():
+        if self.stop_event is not None and self.stop_event.is_set():
+            self.close()
+            return
+        # only the newest records can be shown
+        records = self.telemetry_reader.read(AXES_SIZE)
+        if len(records):
+            shift(self.telemetry_data, records)
+            for field, curve in self.telemetry_curves:
+                curve.setData(self.x, self.telemetry_data[field].astype(float))
+
+        samples = self.sample_reader.read(len(self.eeg_time))
+        if len(samples):
+            shift(self.eeg_data, samples)
+            # each channel is centered on its offset
+            traces = self.eeg_data - np.mean(self.eeg_data, axis=0) + self.eeg_offsets
+            for channel, curve in enumerate(self.eeg_curves):
+                curve.setData(self.eeg_time, traces[:, channel])
+
+
+def start_liveplot(telemetry: SharedRing, samples: SharedRing, channel_names: list, sampling_rate: int,
+                   stop_event=None):
     """
-    starts the live plot window
+    Shows the live plot window until it is closed or the stop event is set, called by the dashboard process (see
+    dashboard_process.run_dashboard), which attaches and detaches the rings
+    :param SharedRing telemetry: attached telemetry ring
+    :param SharedRing samples: attached sample ring
+    :param list channel_names: names of the channels of the samples
+    :param int sampling_rate: sampling rate of the samples in Hz
+    :param stop_event: multiprocessing.Event to close the window
     """
-    global main_window
     app = QtWidgets.QApplication(sys.argv)
-    main_window = MainWindow()
+    main_window = MainWindow(telemetry, samples, channel_names, sampling_rate, stop_event)
+    main_window.setWindowTitle('MindPong Dashboard')
     main_window.show()
-    main_window.showFullScreen()
-    global is_window_ready
-    is_window_ready = True
-    window = app.exec_()
-    sys.exit(window)
+    app.exec_()
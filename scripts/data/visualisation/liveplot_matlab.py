@@ -1,19 +1,36 @@
-import queue
+import time
 from pathlib import Path
 
 import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
 
+from scripts import config
+from scripts.utils.shared_ring import SharedRing
+
+"""
+Live plot of the telemetry of the cursor control algorithm.
+
+The plot is rendered with blitting: the static part of the figure (axes, ticks, titles and legends) is drawn once and
+cached as background, afterwards only the line artists are drawn onto the restored background. The whole figure is
+only redrawn if the y-limits of a subplot change or the canvas was resized. The updates are limited to
+config.LIVE_PLOT_MAX_FPS, the records are kept in the telemetry ring until the next frame.
+"""
+
 # constants
 AXES_SIZE = 200
 MIN_Y_BORDER_SCALING = -1
 MAX_Y_BORDER_SCALING = 1
+SHRINK_FACTOR = 2  # the y-limits shrink if they are this many times larger than the range of the plotted values
 
 # global data
 queues = list()
 fig = None
 plots = dict()
+telemetry_reader = None  # reader of the telemetry ring of the algorithm
+background = None  # cached static part of the figure
+draw_connection = None  # id of the draw_event callback of the canvas
+last_frame_time = 0.0  # time.perf_counter() of the last rendered frame
 
 # necessary!!! to make sure the backend is the correct one
 matplotlib.use('TkAgg')
@@ -26,107 +43,124 @@ plt.style.use(str(style_path))
 
 class PlotData:
     """
-    Stores plot relevant data for a queue:
-        - q         = queue
+    Stores plot relevant data for a field of the telemetry records:
+        - field     = name of the field
         - ax        = subplot
         - x_data    = x-values
         - y_data    = y-values
-        - line      = 2D-line (=> plot)
+        - line      = 2D-line (=> plot), animated so it is only drawn by blitting
         - name      = name of the plot
 
     Used to update each plot in liveplot cycle
     """
 
-    def __init__(self, q: queue.Queue, ax, plot_label, colour, name):
-        self.q = q
+    def __init__(self, field: str, ax, plot_label, colour, name):
+        self.field = field
         self.ax = ax
         self.designation = name
-        self.x_data = list(range(AXES_SIZE))
+        self.x_data = np.arange(AXES_SIZE)
         # initialize label with -1 alias not defined
-        self.y_data = np.zeros(AXES_SIZE) if plot_label != 'label' else np.full(AXES_SIZE, -1)
+        self.y_data = np.zeros(AXES_SIZE) if plot_label != 'label' else np.full(AXES_SIZE, -1.0)
         # use straight edges for label
         if plot_label == 'label':
-            self.line, = ax.step(self.x_data, self.y_data, color=colour, label=self.designation)
+            self.line, = ax.step(self.x_data, self.y_data, color=colour, label=self.designation, animated=True)
         else:
-            self.line, = ax.plot(self.x_data, self.y_data, color=colour, label=self.designation)
+            self.line, = ax.plot(self.x_data, self.y_data, color=colour, label=self.designation, animated=True)
         self.color = colour
         self.title = plot_label
 
+    def append(self, values: np.ndarray):
+        """
+        Shifts the y-values in place and appends the new values
+        :param np.ndarray values: at most AXES_SIZE new values
+        """
+        n_values = len(values)
+        self.y_data[:-n_values] = self.y_data[n_values:]
+        self.y_data[-n_values:] = values
+        self.line.set_ydata(self.y_data)
+
 
-def live_plotter(plot_data: PlotData):
+def live_plotter(plot_label) -> bool:
     """
-    Updates the plot line and the x-axes label and automatically adjusts the boundaries.
-    :param plot_data: requires a PlotData object
-    :return PlotData.line: 2D-Line
+    Adjusts the y-limits of a subplot to the graphs within it. The limits grow as soon as a value goes beyond them and
+    only shrink if they are SHRINK_FACTOR times larger than needed, so the axes are not redrawn on every update.
+    :param plot_label: class name of the subplot
+    :return bool: True if the y-limits changed and the figure has to be redrawn
     """
-    # after the figure, axis, and line are created, we only need to update the y-data
-    plot_data.line.set_ydata(plot_data.y_data)
-
-    # find coherent graph's in subplots
-    share_plot_object = None
-    # check if there is another plot_data object in queue which has the same title
-    # it is assumed that there are only 2 graphs in a plot for the sake of clarity
-    for plotdata_object in queues:
-        if plotdata_object.title == plot_data.title and plotdata_object != plot_data:
-            share_plot_object = plotdata_object
-            break
-
-    if share_plot_object is not None:
-        # determine the min and max from both graphs within one plot
-        min_value = min(np.min(plot_data.y_data), np.min(plotdata_object.y_data))
-        max_value = max(np.max(plot_data.y_data), np.max(plotdata_object.y_data))
-
-        # adjust limits if new data goes beyond bounds, borders are defined within
-        # MIN_Y_BORDER_SCALING and MAX_Y_BORDER_SCALING constants which means the scaling of the y-axis doesn't go
-        # above or below that range
-        if min_value <= plot_data.line.axes.get_ylim()[0] or max_value >= plot_data.line.axes.get_ylim()[1]:
-            plot_data.ax.set_ylim([min(min_value - np.std(plot_data.y_data), MIN_Y_BORDER_SCALING), max(max_value + np.std(plot_data.y_data), MAX_Y_BORDER_SCALING)])
-        elif min_value >= plot_data.line.axes.get_ylim()[0] or max_value <= plot_data.line.axes.get_ylim()[1]:
-            plot_data.ax.set_ylim([min(min_value - np.std(plot_data.y_data), MIN_Y_BORDER_SCALING), max(max_value + np.std(plot_data.y_data), MAX_Y_BORDER_SCALING)])
-
-    # return line, so we can update it again in the next iteration
-    return plot_data.line
+    plot_data = [plot_data for plot_data in queues if plot_data.title == plot_label]
+    # subplots with a single graph (the label) have fixed limits
+    if len(plot_data) < 2:
+        return False
+    ax = plot_data[0].ax
+    y_data = np.concatenate([data.y_data for data in plot_data])
+    min_value, max_value = np.min(y_data), np.max(y_data)
+    std = np.std(plot_data[0].y_data)
+    # borders are defined within MIN_Y_BORDER_SCALING and MAX_Y_BORDER_SCALING constants which means the scaling of the
+    # y-axis doesn't go above or below that range
+    new_limits = (min(min_value - std, MIN_Y_BORDER_SCALING), max(max_value + std, MAX_Y_BORDER_SCALING))
+    lower, upper = ax.get_ylim()
+    exceeds = min_value <= lower or max_value >= upper
+    too_large = upper - lower > SHRINK_FACTOR * (new_limits[1] - new_limits[0])
+    if not (exceeds or too_large):
+        return False
+    ax.set_ylim(new_limits)
+    return True
 
 
 def perform_live_plot():
     """
-    Periodically plots new values from each queue in queues.
+    Periodically plots the new telemetry records, all plots are updated with one read of the telemetry ring.
+    Calls within 1 / config.LIVE_PLOT_MAX_FPS after the last frame are skipped.
     """
-    global fig, queues
-    if fig:
-        has_changes = False
-        for plot_data in queues:
-            if plot_data.q.empty():
-                # skip if queue has no new values
-                continue
-            has_changes = True
-            content_y = list()
-            # read all new values from the queue
-            while not plot_data.q.empty() or len(content_y) > AXES_SIZE:
-                content_y.append(plot_data.q.get(True))
-            content_y = np.asarray(content_y)
-            bound = plot_data.x_data[-1] + 1
-            # create a list with the same dimensions as content_y and as start value the last one of x_data
-            content_x = list(range(bound, bound + len(content_y)))
-            # remove as many elements from the list as new ones are added
-            plot_data.x_data = plot_data.x_data[len(content_x):]
-            # append the new values
-            plot_data.x_data += content_x
-            # add same amount of 0 at the end of the array, as new values are going to be added to the array
-            plot_data.y_data = np.append(plot_data.y_data[len(content_y):], [0.0] * len(content_y))
-            # overwrite the last elements with the new values
-            plot_data.y_data[-len(content_y):] = content_y
-            # replot data and legend
-            plot_data.line = live_plotter(plot_data)
-            # show legend with graph description
-            plot_data.ax.legend(loc='upper left')
-        if has_changes:
-            # draw canvas only if values have changed
-            fig.canvas.draw()
+    global last_frame_time
+    if not (fig and telemetry_reader):
+        return
+    now = time.perf_counter()
+    if now - last_frame_time < 1 / config.LIVE_PLOT_MAX_FPS:
+        return
+    # only the newest AXES_SIZE records can be shown
+    records = telemetry_reader.read(AXES_SIZE)
+    if len(records) == 0:
+        # skip if there are no new values
+        return
+    last_frame_time = now
+    for plot_data in queues:
+        plot_data.append(records[plot_data.field])
+    limits_changed = False
+    for plot_label in plots:
+        limits_changed |= live_plotter(plot_label)
+    if limits_changed or background is None:
+        # the draw_event callback caches the new background and blits the lines
+        fig.canvas.draw()
+    else:
+        blit_lines()
+
+
+def blit_lines():
+    """Restores the cached background and draws only the lines onto it"""
+    fig.canvas.restore_region(background)
+    for plot_data in queues:
+        plot_data.ax.draw_artist(plot_data.line)
+    fig.canvas.blit(fig.bbox)
+
+
+def on_draw(event):
+    """
+    Called after each full draw of the canvas (e.g. limits changed, resize), the animated lines are excluded from it,
+    so the drawn figure is cached as background before the lines are blitted onto it
+    """
+    global background
+    if event is not None and event.canvas is not fig.canvas:
+        return
+    background = fig.canvas.copy_from_bbox(fig.bbox)
+    for plot_data in queues:
+        plot_data.ax.draw_artist(plot_data.line)
 
 
 def remove_all_plots():
-    global queues, plots, fig
+    global queues, plots, fig, telemetry_reader, background
+    telemetry_reader = None
+    background = None
     if fig:
         fig.clf()
         queues = list()
@@ -139,16 +173,39 @@ def initial_draw():
         fig.canvas.draw()
 
 
-def connect_queue(queue: queue.Queue, plot_label, row: int, color: str, name: str, column: int, position: int, y_labels: list = None):
+def connect_telemetry(telemetry: SharedRing):
+    """
+    Replaces all plots with the plots of the telemetry of the algorithm
+    :param telemetry: telemetry ring of the algorithm (see telemetry.py)
     """
-    Creates a PlotData object for the queue and assigns the queue to a subplot.
+    global telemetry_reader
+    remove_all_plots()
+    if not fig:
+        return
+    connect_field('c3_pow', 'pow', color='#0096db', row=3, column=1, position=1, name='C3 pow')
+    connect_field('c4_pow', 'pow', color='#009d6b', row=3, column=1, position=1, name='C4 pow')
+    connect_field('hcon', 'hcon', color='#f17a2c', row=3, column=1, position=2, name='hcon')
+    connect_field('hcon_stand', 'hcon', color='#FFC107', row=3, column=1, position=2, name='hcon standardized')
+    connect_field('label', 'label', color='#96669e', row=3, column=1, position=3, y_labels=['n', 'l', 'r'],
+                  name='calculated label')
+    # the legends are static, so they are drawn once into the background
+    for ax in plots.values():
+        ax.legend(loc='upper left')
+    # only the records written after the connection are plotted
+    telemetry_reader = telemetry.reader()
+    initial_draw()
+
+
+def connect_field(field: str, plot_label, row: int, color: str, name: str, column: int, position: int, y_labels: list = None):
+    """
+    Creates a PlotData object for a field of the telemetry records and assigns it to a subplot.
     :param color: color of the plotted line graph
     :param name: name of the plotted line graph
     :param y_labels: custom y lables
     :param position: Position of the subplot, counting from right to left and from top to bottom.
     :param column: arrangement of the subplot in the corresponding column
     :param row: arrangement of the subplot in the corresponding row
-    :param queue: queue which should be plotted
+    :param field: name of the field which should be plotted
     :param plot_label: class name
     """
     if plot_label in plots:
@@ -162,12 +219,16 @@ def connect_queue(queue: queue.Queue, plot_label, row: int, color: str, name: st
             ax.set_yticks([-1, 0, 1])
             ax.set_yticklabels(y_labels)
         plots[plot_label] = ax
-    queues.append(PlotData(queue, ax, plot_label, color, name))
+    queues.append(PlotData(field, ax, plot_label, color, name))
 
 
 def start_live_plot(figure):
     """
     Initializes plot window.
     """
-    global fig
+    global fig, draw_connection, background
+    if fig is not None and draw_connection is not None:
+        fig.canvas.mpl_disconnect(draw_connection)
     fig = figure
+    background = None
+    draw_connection = fig.canvas.mpl_connect('draw_event', on_draw)
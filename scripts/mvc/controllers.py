@@ -3,7 +3,7 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 from tkinter.messagebox import askyesno, showinfo
 
-from scripts.config import CALIBRATION_TIME, BCI_CHANNELS
+from scripts.config import CALIBRATION_TIME
 from scripts.data.acquisition.read_data import live_Data
 from scripts.data.extraction import trial_handler
 from scripts.data.extraction.trial_handler import save_session
@@ -11,6 +11,7 @@ from scripts.data.visualisation.liveplot_matlab import start_live_plot, perform_
 from scripts.mvc.models import MetaData
 from scripts.mvc.view import View, ConfigView, GameView
 from scripts.pong.game import End
+from scripts.utils.latency import recorder as latency_recorder
 
 
 class Controller(ABC):
@@ -118,6 +119,12 @@ class ConfigController(Controller):
         else:
             showinfo("Warning", "Connection failed. Try again.")
 
+    def on_acquisition_failed(self):
+        """Discards the session if the acquisition process could not connect the board"""
+        self.__stop_calibration()
+        showinfo("Warning", "Connection failed. Try again.")
+        self.__discard_session()
+
     def __start_session(self):
         """Starts the session, if the input fields are valid, by disabling the input fields, starting the game
         window and the liveplot."""
@@ -147,6 +154,7 @@ class ConfigController(Controller):
             self.data.draw_plot = False
             from scripts.data.acquisition.read_data import stop_stream
             stop_stream()
+            latency_recorder.dump()
             # Only allow saving if trial recording is turned on
             if self.data.trial_recording and live_Data:
                 from scripts.data.extraction.trial_handler import count_trials
@@ -171,10 +179,11 @@ class ConfigController(Controller):
         """
         self.__set_comment()
         from scripts.data.extraction.trial_handler import count_trials, count_event_types
+        from scripts.data.acquisition.read_data import SAMPLING_RATE, channel_names
         meta_data = MetaData(sid=self.data.subject_id, age=self.data.subject_age, sex=self.data.subject_sex,
                              time=self.session_start_time.time(), comment=self.data.comment,
                              amount_events=count_event_types, amount_trials=count_trials,
-                             channel_mapping=BCI_CHANNELS)
+                             channel_mapping=channel_names, sampling_rate=SAMPLING_RATE)
         print(meta_data.__str__())
         file_name = "session-%s-%s" % (self.data.subject_id, self.session_start_time.strftime("%d%m%Y-%H%M%S"))
 
@@ -375,9 +384,7 @@ class ConfigController(Controller):
     def __clear_global_variables():
         """Clears the global variables"""
         from scripts.data.extraction.trial_handler import reset_data
-        from scripts.data.analysis.cursor_control_algorithm import clear_ring_buffer
         reset_data()
-        clear_ring_buffer()
 
 
 class GameController(Controller):
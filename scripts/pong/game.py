@@ -5,6 +5,8 @@ from tkinter import *
 import scripts.config as config
 import scripts.pong.player as player
 import scripts.pong.target as target
+from scripts.utils.control_channel import MOVE_EVENTS, channel as control_channel
+from scripts.utils.event_listener import post_event
 
 
 class GameState(object):
@@ -96,6 +98,8 @@ class Game(tk.Frame):
         Handles the time and returns a delta for correction
     clear():
         Clears the canvas background. Very important function to avoid flickering and artifacts
+    destroy():
+        Removes the subscriptions of the player and destroys the frame
     change(state):
         Changes the internal state to state if possible
     init_labels():
@@ -143,6 +147,8 @@ class Game(tk.Frame):
 
         # State of the game - default is idle
         self.state = Idle()
+        # commands of a previous game are discarded
+        control_channel.clear()
 
         self.score = 0
         self.miss = 0
@@ -184,6 +190,11 @@ class Game(tk.Frame):
 
         delta = self.handle_time()
 
+        # moves the player with the newest command of the algorithm, older commands of this frame are coalesced
+        command = control_channel.receive()
+        if command is not None:
+            post_event(MOVE_EVENTS[command.label])
+
         if curr_state is Idle.name:
             pass
 
@@ -305,6 +316,14 @@ class Game(tk.Frame):
 
         self.canvas.configure(bg="white")
 
+    def destroy(self):
+        """
+        Removes the subscriptions of the player before the frame is destroyed, so the events of later games are not
+        dispatched to it
+        """
+        self.player.destroy()
+        tk.Frame.destroy(self)
+
     def change(self, state):
         """
         Changes the internal state to state if possible
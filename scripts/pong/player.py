@@ -3,6 +3,7 @@ import time
 import scripts.config as config
 import scripts.data.extraction.trial_handler as trial_handler
 import scripts.pong.game as game
+from scripts.utils.latency import recorder as latency_recorder
 
 
 # Define player properties and functions
@@ -18,6 +19,7 @@ class Player:
     :method draw(): Draw the plyer
     :method reset(): Reset the player
     :method init(): Initializes the player object and its position
+    :method destroy(): Removes the subscriptions of the player
     :method move_left(evt): Moves player left
     :method move_right(evt): Moves player right
     :method collision_with_border(): checks collision with border
@@ -61,6 +63,7 @@ class Player:
         :attribute int self.last_direction_update: last direction update
         :attribute Label self.trial_label: type of the event in the trial
         :attribute float self.y_pos: y-cord for the player
+        :attribute list self.subscriptions: subscriptions of the move methods to the events of the strategy
         """
 
         self.root = root
@@ -85,7 +88,7 @@ class Player:
         self.trial_label = trial_handler.Labels.INVALID
         self.y_pos = self.canvas_height * 0.5 - self.height
 
-        self.request(strategy).control(self)
+        self.subscriptions = self.request(strategy).control(self)
 
         self.init()
 
@@ -132,6 +135,7 @@ class Player:
 
         self.canvas.move(self.id, self.velocity_x_axis * self.speed_factor, 0)
         self.pos = self.canvas.coords(self.id)
+        latency_recorder.mark_draw()
 
     def reset(self):
         """Reset the player"""
@@ -151,6 +155,12 @@ class Player:
         self.pos = self.canvas.coords(self.id)
         self.target.spawn_new_target(self.pos)
 
+    def destroy(self):
+        """Removes the subscriptions of the player, so the events are no longer dispatched to it"""
+        for subscription in self.subscriptions:
+            subscription.unsubscribe()
+        self.subscriptions = []
+
     def move_left(self, event=None):
         """Move player left"""
 
@@ -14,6 +14,7 @@ class IStrategy(metaclass=ABCMeta):
         """
         Abstract method
         :param player: player object
+        :return: list of the subscriptions of the player, which are removed when the player is destroyed
         """
 
 
@@ -27,9 +28,11 @@ class KeyStrategy(IStrategy):
         """
         Binds the keys with the move methods of the player
         :param player: player object
+        :return: empty list, the key bindings are replaced by the next player
         """
         player.canvas.bind_all('<KeyPress-Left>', player.move_left)
         player.canvas.bind_all('<KeyPress-Right>', player.move_right)
+        return []
 
 
 class AlgorithmsStrategy(IStrategy):
@@ -42,6 +45,7 @@ class AlgorithmsStrategy(IStrategy):
         """
         Binds events posted by the algorithm with the move methods of the player
         :param player: player object
+        :return: list of the subscriptions of the move methods
         """
-        subscribe("move_left_direction", player.move_left)
-        subscribe("move_right_direction", player.move_right)
+        return [subscribe("move_left_direction", player.move_left),
+                subscribe("move_right_direction", player.move_right)]
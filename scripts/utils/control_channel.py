@@ -0,0 +1,61 @@
+import threading
+from typing import NamedTuple, Optional
+
+"""Script to pass the movement commands of the cursor control algorithm to the Tk main thread"""
+
+# events, which are posted on the Tk main thread for the labels 0 (left) and 1 (right)
+MOVE_EVENTS = ("move_left_direction", "move_right_direction")
+
+
+class ControlCommand(NamedTuple):
+    """Movement command of a sliding window"""
+    label: int  # 0 = left, 1 = right
+
+
+class ControlChannel:
+    """
+    Thread-safe channel of movement commands from the acquisition thread (or the poll of the acquisition process) to
+    the game loop on the Tk main thread.
+
+    The channel keeps only the newest command: the game moves the player once per frame, so older commands which have
+    not been received yet are overwritten (coalesced). Sending and receiving only swap a reference under a lock.
+    """
+
+    def __init__(self):
+        """Constructor method"""
+        self.__lock = threading.Lock()
+        self.__command = None
+        self.sent = 0
+        self.coalesced = 0  # amount of commands which were overwritten before they were received
+
+    def send(self, label: int):
+        """
+        Sends a movement command, can be called from any thread
+        :param int label: 0 = left, 1 = right
+        """
+        command = ControlCommand(label)
+        with self.__lock:
+            if self.__command is not None:
+                self.coalesced += 1
+            self.__command = command
+            self.sent += 1
+
+    def receive(self) -> Optional[ControlCommand]:
+        """
+        Takes the newest command out of the channel, called once per frame by the game loop
+        :return: ControlCommand or None if no command was sent since the last call
+        """
+        with self.__lock:
+            command, self.__command = self.__command, None
+        return command
+
+    def clear(self):
+        """Discards the pending command and resets the counters"""
+        with self.__lock:
+            self.__command = None
+            self.sent = 0
+            self.coalesced = 0
+
+
+# channel of the cursor control algorithm
+channel = ControlChannel()
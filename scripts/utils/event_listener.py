@@ -1,14 +1,139 @@
-from collections import defaultdict
+import inspect
+import itertools
+import threading
+import time
+import weakref
 # See: https://dev.to/kuba_szw/build-your-own-event-system-in-python-5hk6
 
-subscribers = defaultdict(list)
+"""Script for the events between the components of the game (e.g. the move events of the player)"""
 
 
-def subscribe(event_type, fn):
-    subscribers[event_type].append(fn)
+class Subscription:
+    """Handle of a subscribed callback, which is used to unsubscribe it again"""
+
+    def __init__(self, bus, event_type, handle_id: int):
+        self.bus = bus
+        self.event_type = event_type
+        self.id = handle_id
+
+    def unsubscribe(self):
+        """Removes the callback from the bus, calling it more than once has no effect"""
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """
+    Event bus, which calls the subscribed callbacks of an event type when the event is posted.
+
+    Bound methods are referenced weakly, so the subscription of an object ends at the latest when the object is
+    garbage collected. For each event type the callbacks are compiled into a tuple whenever the subscriptions change,
+    so posting an event only iterates over this tuple. An optional rate limit drops events, which are posted faster.
+    """
+
+    def __init__(self):
+        """Constructor method"""
+        # reentrant, because the weak references may be finalized by the garbage collector while the lock is held
+        self.__lock = threading.RLock()
+        self.__ids = itertools.count()
+        self.__subscribers = dict()  # event type -> {id: (reference, is weak)}
+        self.__dispatch = dict()  # event type -> compiled tuple of (reference, is weak)
+        self.__min_intervals = dict()  # event type -> minimal time between two dispatched events in s
+        self.__last_dispatch = dict()  # event type -> time.perf_counter() of the last dispatched event
+
+    def subscribe(self, event_type, fn) -> Subscription:
+        """
+        :param event_type: type of the event
+        :param fn: callback without parameters, bound methods are referenced weakly
+        :return: Subscription: handle to unsubscribe the callback
+        """
+        with self.__lock:
+            handle_id = next(self.__ids)
+            if inspect.ismethod(fn):
+                reference = (weakref.WeakMethod(fn, lambda _: self.__remove(event_type, handle_id)), True)
+            else:
+                reference = (fn, False)
+            self.__subscribers.setdefault(event_type, dict())[handle_id] = reference
+            self.__compile(event_type)
+        return Subscription(self, event_type, handle_id)
+
+    def unsubscribe(self, subscription: Subscription):
+        """
+        :param Subscription subscription: handle of the callback
+        """
+        self.__remove(subscription.event_type, subscription.id)
+
+    def set_rate_limit(self, event_type, max_rate: float = None):
+        """
+        Limits the rate of an event type, events which are posted faster are dropped
+        :param event_type: type of the event
+        :param float max_rate: maximal amount of events per second, None to remove the limit
+        """
+        with self.__lock:
+            if max_rate:
+                self.__min_intervals[event_type] = 1 / max_rate
+            else:
+                self.__min_intervals.pop(event_type, None)
+            self.__last_dispatch.pop(event_type, None)
+
+    def post_event(self, event_type):
+        """
+        Calls the callbacks of the event type
+        :param event_type: type of the event
+        """
+        callbacks = self.__dispatch.get(event_type)
+        if not callbacks:
+            return
+        min_interval = self.__min_intervals.get(event_type)
+        if min_interval is not None:
+            now = time.perf_counter()
+            if now - self.__last_dispatch.get(event_type, -min_interval) < min_interval:
+                return
+            self.__last_dispatch[event_type] = now
+        for reference, is_weak in callbacks:
+            fn = reference() if is_weak else reference
+            if fn is not None:
+                fn()
+
+    def subscriber_count(self, event_type) -> int:
+        """
+        :param event_type: type of the event
+        :return: int: amount of subscribed callbacks
+        """
+        return len(self.__dispatch.get(event_type, ()))
+
+    def clear(self):
+        """Removes all subscriptions and rate limits"""
+        with self.__lock:
+            self.__subscribers.clear()
+            self.__dispatch.clear()
+            self.__min_intervals.clear()
+            self.__last_dispatch.clear()
+
+    def __remove(self, event_type, handle_id: int):
+        with self.__lock:
+            if self.__subscribers.get(event_type, dict()).pop(handle_id, None) is not None:
+                self.__compile(event_type)
+
+    def __compile(self, event_type):
+        subscribers = self.__subscribers.get(event_type)
+        if subscribers:
+            self.__dispatch[event_type] = tuple(subscribers.values())
+        else:
+            self.__subscribers.pop(event_type, None)
+            self.__dispatch.pop(event_type, None)
+
+
+# event bus of the game
+bus = EventBus()
+
+
+def subscribe(event_type, fn) -> Subscription:
+    return bus.subscribe(event_type, fn)
+
+
+def unsubscribe(subscription: Subscription):
+    bus.unsubscribe(subscription)
 
 
 def post_event(event_type):
-    if event_type in subscribers:
-        for fn in subscribers[event_type]:
-            fn()
+    bus.post_event(event_type)
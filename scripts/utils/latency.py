@@ -0,0 +1,115 @@
+import enum
+import time
+
+import numpy as np
+
+import scripts.config as config
+
+"""Script to measure the latency from the arrival of a sample until the player moves on the canvas"""
+
+
+class Stage(enum.IntEnum):
+    """
+    Stages of the processing chain, which get a time stamp for each sliding window
+    """
+    acquisition = 0  # block with the newest sample of the window left board.get_board_data
+    window_emit = 1  # window is emitted by send_window
+    standardization = 2
+    spatial_filtering = 3
+    spectral_analysis = 4
+    band_power = 5
+    normalization = 6  # hcon is derived and standardized
+    post_event = 7  # move command is sent to the game loop (see control_channel)
+    player_draw = 8  # player is drawn after the move command
+
+
+class LatencyRecorder:
+    """
+    Records a time stamp (time.perf_counter in s) for each stage of each sliding window.
+
+    The records are kept in a preallocated array (windows x stages), which is used as a ring, so recording does not
+    allocate memory. Stages that are not reached (e.g. no event is posted for a neutral label) stay NaN.
+    """
+
+    def __init__(self, capacity: int = 10000, enabled: bool = True):
+        """
+        Constructor method
+        :param int capacity: amount of windows which can be recorded, older records are overwritten
+        :param bool enabled: disabled recorders ignore all calls
+        """
+        self.enabled = enabled
+        self.records = np.full((capacity, len(Stage)), np.nan)
+        self.count = 0  # amount of recorded windows
+        self.current = -1  # row of the window which is currently processed
+        self.pending_draw = -1  # row of the last window which posted an event, but was not drawn yet
+
+    def reset(self):
+        """Clears all records"""
+        self.records.fill(np.nan)
+        self.count = 0
+        self.current = -1
+        self.pending_draw = -1
+
+    def begin(self, acquisition_time: float, emit_time: float = None):
+        """
+        Starts the record of a new window
+        :param float acquisition_time: time stamp at which the newest sample of the window was acquired
+        :param float emit_time: time stamp at which the window was emitted, None for now
+        """
+        if not self.enabled:
+            return
+        row = self.count % len(self.records)
+        self.records[row] = np.nan
+        self.records[row, Stage.acquisition] = acquisition_time
+        self.records[row, Stage.window_emit] = time.perf_counter() if emit_time is None else emit_time
+        self.current = row
+        self.count += 1
+
+    def mark(self, stage: Stage):
+        """
+        Sets the time stamp of a stage of the current window
+        :param Stage stage: reached stage
+        """
+        if not self.enabled or self.current < 0:
+            return
+        self.records[self.current, stage] = time.perf_counter()
+        if stage == Stage.post_event:
+            self.pending_draw = self.current
+
+    def mark_draw(self):
+        """Sets the time stamp of the player_draw stage of the last window which posted an event"""
+        if not self.enabled or self.pending_draw < 0:
+            return
+        self.records[self.pending_draw, Stage.player_draw] = time.perf_counter()
+        self.pending_draw = -1
+
+    def summary(self) -> dict:
+        """
+        Calculates the percentiles of the latency from the acquisition until each stage
+        :return: dict: stage name -> (p50, p95, p99) in ms, NaN if the stage was never reached
+        """
+        records = self.records[:min(self.count, len(self.records))]
+        latencies = (records - records[:, [Stage.acquisition]]) * 1000
+        result = dict()
+        for stage in Stage:
+            values = latencies[:, stage]
+            values = values[~np.isnan(values)]
+            result[stage.name] = tuple(np.percentile(values, [50, 95, 99])) if len(values) else (np.nan,) * 3
+        return result
+
+    def dump(self, file_path: str = None):
+        """
+        Prints the latency summary and optionally saves the raw records as npy file
+        :param str file_path: path of the npy file, None to only print the summary
+        """
+        if not self.enabled or self.count == 0:
+            return
+        print(f'======LATENCY (ms) of {self.count} windows======')
+        print(f'{"stage":<20}{"p50":>10}{"p95":>10}{"p99":>10}')
+        for name, (p50, p95, p99) in self.summary().items():
+            print(f'{name:<20}{p50:>10.2f}{p95:>10.2f}{p99:>10.2f}')
+        if file_path:
+            np.save(file_path, self.records[:min(self.count, len(self.records))])
+
+
+recorder = LatencyRecorder(config.LATENCY_RECORD_SIZE, config.LATENCY_RECORDING)
@@ -0,0 +1,159 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+"""Single writer ring buffer of numpy records, which can be placed in shared memory to pass data between processes"""
+
+HEADER_SIZE = 64  # in bytes, contains the write counter and the pending counter, the rest keeps the records aligned
+
+
+class SharedRing:
+    """
+    Ring buffer for fixed size records with exactly one writer and any number of readers.
+
+    The buffer holds a write counter (amount of records written since the creation), a pending counter (write counter
+    including the write in progress) and the records. The writer first publishes the pending counter, then writes the
+    records and then increments the write counter. Readers discard the records which may be overwritten by a write in
+    progress according to the pending counter, so they never need a lock. Each reader
+    keeps its own cursor (see RingReader), so readers do not interfere with each other or with the writer.
+    If a reader falls behind by more than the capacity, the overwritten records are dropped and counted.
+
+    With shared=True the buffer lives in a multiprocessing.shared_memory block and can be attached by other
+    processes via the spec of the ring.
+    """
+
+    def __init__(self, capacity: int, record_shape: tuple = (), dtype=float, shared: bool = True, name: str = None):
+        """
+        Constructor method, creates a new ring or attaches an existing shared ring if a name is passed
+        :param int capacity: amount of records
+        :param tuple record_shape: shape of one record, e.g. (n_channels,) for one multichannel sample
+        :param dtype: numpy data type of the records, can be a structured data type
+        :param bool shared: create the ring in shared memory
+        :param str name: name of an existing shared memory block to attach to
+        """
+        self.capacity = capacity
+        self.record_shape = tuple(record_shape)
+        self.dtype = np.dtype(dtype)
+        size = HEADER_SIZE + capacity * int(np.prod(self.record_shape, dtype=int)) * self.dtype.itemsize
+
+        self.__memory = None
+        if name is not None:
+            self.__memory = shared_memory.SharedMemory(name=name)
+            buffer = self.__memory.buf
+        elif shared:
+            self.__memory = shared_memory.SharedMemory(create=True, size=size)
+            buffer = self.__memory.buf
+        else:
+            buffer = bytearray(size)
+        self.__owner = name is None
+
+        self.__counter = np.ndarray((1,), dtype=np.int64, buffer=buffer)
+        self.__pending = np.ndarray((1,), dtype=np.int64, buffer=buffer, offset=self.__counter.nbytes)
+        self.__records = np.ndarray((capacity,) + self.record_shape, dtype=self.dtype, buffer=buffer,
+                                    offset=HEADER_SIZE)
+        if self.__owner:
+            self.__counter[0] = 0
+            self.__pending[0] = 0
+
+    @classmethod
+    def attach(cls, spec: dict):
+        """
+        Attaches to a shared ring created in another process
+        :param dict spec: spec of the ring, see SharedRing.spec
+        :return: SharedRing
+        """
+        return cls(**spec)
+
+    @property
+    def spec(self) -> dict:
+        """Picklable description of a shared ring, which is needed to attach it in another process"""
+        return {'capacity': self.capacity, 'record_shape': self.record_shape, 'dtype': self.dtype,
+                'name': self.__memory.name if self.__memory else None}
+
+    @property
+    def write_count(self) -> int:
+        """Amount of records written since the creation of the ring"""
+        return int(self.__counter[0])
+
+    @property
+    def pending_count(self) -> int:
+        """Amount of records written since the creation of the ring including the records of a write in progress"""
+        return int(self.__pending[0])
+
+    def write(self, records):
+        """
+        Appends records to the ring, only one writer is allowed
+        :param records: array of records with the shape (n,) + record_shape
+        """
+        records = np.asarray(records, dtype=self.dtype)
+        count = int(self.__counter[0])
+        stop = count + records.shape[0]
+        if records.shape[0] > self.capacity:
+            # only the newest records fit into the ring
+            records = records[records.shape[0] - self.capacity:]
+        # announce the slots which are overwritten before they are touched
+        self.__pending[0] = stop
+        position = (stop - records.shape[0]) % self.capacity
+        first = min(records.shape[0], self.capacity - position)
+        self.__records[position:position + first] = records[:first]
+        self.__records[:records.shape[0] - first] = records[first:]
+        # publish the records only after they are written
+        self.__counter[0] = stop
+
+    def reader(self, from_start: bool = False):
+        """
+        Creates a new reader with its own cursor
+        :param bool from_start: read the records which are still in the ring, otherwise only new records are read
+        :return: RingReader
+        """
+        return RingReader(self, 0 if from_start else self.write_count)
+
+    def get_records(self, start: int, stop: int) -> np.ndarray:
+        """
+        Copies the records with the (absolute) indices start until stop out of the ring
+        :return: np.ndarray records
+        """
+        start_position = start % self.capacity
+        stop_position = start_position + stop - start
+        if stop_position <= self.capacity:
+            return self.__records[start_position:stop_position].copy()
+        return np.concatenate((self.__records[start_position:], self.__records[:stop_position - self.capacity]))
+
+    def close(self):
+        """Closes the ring, the ring which created the shared memory also frees it"""
+        if self.__memory:
+            # the numpy views have to be released before the shared memory can be closed
+            del self.__counter, self.__pending, self.__records
+            self.__memory.close()
+            if self.__owner:
+                self.__memory.unlink()
+            self.__memory = None
+
+
+class RingReader:
+    """Reader of a SharedRing with its own cursor"""
+
+    def __init__(self, ring: SharedRing, cursor: int):
+        self.ring = ring
+        self.cursor = cursor
+        self.dropped = 0  # amount of records which were overwritten before they could be read
+
+    def read(self, max_records: int = None) -> np.ndarray:
+        """
+        Reads all new records since the last read
+        :param int max_records: maximal amount of records to read, the oldest ones are skipped and counted as dropped
+        :return: np.ndarray: copy of the new records, oldest record first
+        """
+        stop = self.ring.write_count
+        start = max(self.cursor, stop - self.ring.capacity)
+        if max_records is not None:
+            start = max(start, stop - max_records)
+        records = self.ring.get_records(start, stop)
+        # records which were (or are being) overwritten by the writer during the copy are not valid
+        overwritten = min(self.ring.pending_count - self.ring.capacity, stop)
+        if overwritten > start:
+            records = records[overwritten - start:]
+            start = overwritten
+        self.dropped += start - self.cursor
+        self.cursor = stop
+        return records
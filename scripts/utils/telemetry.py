@@ -0,0 +1,21 @@
+import numpy as np
+
+import scripts.config as config
+from scripts.utils.shared_ring import SharedRing
+
+"""Script for the telemetry of the cursor control algorithm, which is read by the live plot, loggers and metrics"""
+
+# record of each sliding window: time stamp (time.perf_counter) of the calculation, band power of C3a and C4a,
+# control signal hcon, standardized hcon and the calculated label (0 = left, 1 = right, -1 = none)
+TELEMETRY_RECORD = np.dtype([('time', 'f8'), ('c3_pow', 'f8'), ('c4_pow', 'f8'), ('hcon', 'f8'),
+                             ('hcon_stand', 'f8'), ('label', 'i1')])
+
+
+def create_telemetry_ring(shared: bool = False) -> SharedRing:
+    """
+    Creates the ring for the telemetry records, the algorithm is the only writer, every consumer reads the records
+    with its own reader (see SharedRing.reader)
+    :param bool shared: create the ring in shared memory, needed if the algorithm runs in the acquisition process
+    :return: SharedRing
+    """
+    return SharedRing(config.TELEMETRY_RING_SIZE, dtype=TELEMETRY_RECORD, shared=shared)
@@ -0,0 +1,27 @@
+import multiprocessing
+import time
+import unittest
+from unittest import mock
+
+from scripts.data.acquisition import acquisition_process
+from scripts.data.acquisition.acquisition_process import AcquisitionProcess
+from scripts.mvc.models import ConfigData
+
+
+class TestAcquisitionProcess(unittest.TestCase):
+
+    def test_join_terminates_hung_worker(self):
+        acquisition = AcquisitionProcess(ConfigData())
+        # a worker which ignores the stop event
+        acquisition.process = multiprocessing.get_context('spawn').Process(target=time.sleep, args=(60,), daemon=True)
+        acquisition.start()
+        start = time.perf_counter()
+        with mock.patch.object(acquisition_process, 'JOIN_TIMEOUT', 0.5):
+            acquisition.join()
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertFalse(acquisition.process.is_alive())
+        self.assertIsNone(acquisition.control_ring.spec['name'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+import numpy as np
+
+import scripts.config as config
+from scripts.data.acquisition.channel_map import ChannelMap
+
+
+class TestChannelMap(unittest.TestCase):
+
+    def setUp(self):
+        self.window = np.arange(len(config.BCI_CHANNELS) * 20, dtype=float).reshape(len(config.BCI_CHANNELS), 20)
+
+    def test_headset_layout(self):
+        channel_map = ChannelMap(config.BCI_CHANNELS)
+        self.assertEqual(['C3', 'C4', 'FC5', 'FC1', 'FC2', 'FC6', 'CP5', 'CP1', 'CP2', 'CP6'], channel_map.names)
+        selected = channel_map.select(self.window)
+        for row, name in zip(selected, channel_map.names):
+            np.testing.assert_array_equal(row, self.window[config.BCI_CHANNELS.index(name)])
+        self.assertEqual(['FC5', 'FC1', 'CP5', 'CP1'], [channel_map.names[i] for i in channel_map.channels_around_c3])
+        self.assertEqual(['FC2', 'FC6', 'CP2', 'CP6'], [channel_map.names[i] for i in channel_map.channels_around_c4])
+
+    def test_buffer_is_reused(self):
+        channel_map = ChannelMap(config.BCI_CHANNELS)
+        first = channel_map.select(self.window)
+        second = channel_map.select(self.window + 1)
+        self.assertIs(first, second)
+        np.testing.assert_array_equal(second[0], self.window[0] + 1)
+
+    def test_unknown_channels_are_not_used(self):
+        channel_map = ChannelMap(config.BCI_CHANNELS + ['EEG17'])
+        self.assertNotIn('EEG17', channel_map.names)
+
+    def test_midline_channels_belong_to_both_areas(self):
+        channel_map = ChannelMap(['Cz', 'C4', 'C3', 'FC1'], weights=[1, 1, 1, 1])
+        np.testing.assert_array_equal([2, 1, 0, 3], channel_map.indices)
+        self.assertEqual(['Cz', 'FC1'], [channel_map.names[i] for i in channel_map.channels_around_c3])
+        self.assertEqual(['Cz'], [channel_map.names[i] for i in channel_map.channels_around_c4])
+
+    def test_missing_c3(self):
+        with self.assertRaises(ValueError):
+            ChannelMap(['C4', 'FC1'], weights=[1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
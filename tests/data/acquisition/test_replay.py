@@ -0,0 +1,34 @@
+import unittest
+
+import numpy as np
+
+from scripts.data.acquisition.replay import SessionReplay
+
+
+class TestSessionReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.arange(2 * 100, dtype=float).reshape(2, 100)
+
+    def test_as_fast_as_possible(self):
+        replay = SessionReplay(self.data, 125, speed=0, block_size=30)
+        blocks = list(replay.blocks())
+        self.assertEqual([30, 30, 30, 10], [block.shape[1] for block in blocks])
+        np.testing.assert_array_equal(np.concatenate(blocks, axis=1), self.data)
+        self.assertAlmostEqual(0.8, replay.virtual_time)
+
+    def test_paced_replay_returns_same_samples(self):
+        replay = SessionReplay(self.data, 125, speed=20, block_size=30)
+        blocks = list(replay.blocks())
+        np.testing.assert_array_equal(np.concatenate(blocks, axis=1), self.data)
+        # 100 samples at 125 Hz take 0.8 s in real time, 0.04 s with 20x speed
+        self.assertGreaterEqual(replay.elapsed_time, 0.035)
+        self.assertLess(replay.elapsed_time, 0.5)
+
+    def test_invalid_speed(self):
+        with self.assertRaises(ValueError):
+            SessionReplay(self.data, 125, speed=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+import numpy as np
+from scipy import signal
+
+from scripts.data.acquisition.stream_filter import StreamFilter
+
+
+class TestStreamFilter(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        t = np.arange(1250) / 125
+        self.data = rng.normal(size=(4, t.size)) + np.sin(2 * np.pi * 50 * t)
+
+    def test_blockwise_equals_whole_stream(self):
+        whole = StreamFilter(4, 125, bandstop=[48, 52], bandpass=[1, 40]).filter(self.data)
+        stream_filter = StreamFilter(4, 125, bandstop=[48, 52], bandpass=[1, 40])
+        blocks = [stream_filter.filter(self.data[:, start:start + 7]) for start in range(0, self.data.shape[1], 7)]
+        np.testing.assert_array_almost_equal(np.concatenate(blocks, axis=1), whole)
+
+    def test_bandstop_removes_powerline_noise(self):
+        filtered = StreamFilter(4, 125, bandstop=[48, 52]).filter(self.data)
+        freqs, psd = signal.periodogram(filtered[:, 625:], 125)
+        freqs_raw, psd_raw = signal.periodogram(self.data[:, 625:], 125)
+        idx = np.argmin(np.abs(freqs - 50))
+        self.assertTrue(np.all(psd[:, idx] < psd_raw[:, idx] / 100))
+
+    def test_invalid_band(self):
+        with self.assertRaises(ValueError):
+            StreamFilter(4, 125, bandpass=[1, 70])
+
+    def test_no_filter(self):
+        self.assertIs(self.data, StreamFilter(4, 125).filter(self.data))
+
+
+if __name__ == '__main__':
+    unittest.main()
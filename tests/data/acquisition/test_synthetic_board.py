@@ -0,0 +1,44 @@
+import unittest
+
+import numpy as np
+
+from scripts.data.acquisition.synthetic_board import SyntheticBoard, get_synthetic_channel_names
+
+
+class TestSyntheticBoard(unittest.TestCase):
+
+    def setUp(self):
+        self.channel_names = get_synthetic_channel_names(20, ['C3', 'Cz', 'C4'])
+        self.board = SyntheticBoard(self.channel_names, 250, noise=1, mu_amplitude=10, erd=0.5,
+                                    schedule=[('left', 4), ('right', 4)], seed=0)
+
+    def test_channel_names(self):
+        self.assertEqual(20, len(self.channel_names))
+        self.assertEqual(['C3', 'Cz', 'C4', 'EEG4'], self.channel_names[:4])
+
+    def test_schedule(self):
+        self.assertEqual('left', self.board.get_label(0))
+        self.assertEqual('right', self.board.get_label(1000))
+        self.assertEqual('left', self.board.get_label(2000))
+
+    def test_mu_modulation(self):
+        data = np.concatenate([self.board.generate(n) for n in [7, 993, 1000]], axis=1)
+        self.assertEqual((20, 2000), data.shape)
+        c3_left, c3_right = np.std(data[0, :1000]), np.std(data[0, 1000:])
+        c4_left, c4_right = np.std(data[2, :1000]), np.std(data[2, 1000:])
+        # left: ERD on C3 and ERS on C4, right vice versa
+        self.assertLess(c3_left, c3_right)
+        self.assertGreater(c4_left, c4_right)
+        # channels without mu rhythm contain only noise
+        self.assertAlmostEqual(1, np.std(data[1]), delta=0.1)
+
+    def test_stream(self):
+        self.assertEqual(0, self.board.get_board_data_count())
+        self.board.start_stream()
+        self.assertEqual(20, self.board.get_board_data().shape[0])
+        self.board.stop_stream()
+        self.assertEqual(0, self.board.get_board_data_count())
+
+
+if __name__ == '__main__':
+    unittest.main()
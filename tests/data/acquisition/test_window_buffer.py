@@ -0,0 +1,39 @@
+import unittest
+
+import numpy as np
+
+from scripts.data.acquisition.window_buffer import WindowBuffer
+
+
+class TestWindowBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.arange(3 * 50, dtype=float).reshape(3, 50)
+
+    def test_window_contains_newest_samples(self):
+        buffer = WindowBuffer(3, 10)
+        start = 0
+        for block_size in [1, 4, 9, 3, 11, 2, 7, 13]:
+            buffer.extend(self.data[:, start:start + block_size])
+            start += block_size
+            if start >= 10:
+                np.testing.assert_array_equal(buffer.get_window(), self.data[:, start - 10:start])
+        self.assertTrue(buffer.is_full)
+
+    def test_not_full(self):
+        buffer = WindowBuffer(3, 10)
+        buffer.extend(self.data[:, :4])
+        self.assertFalse(buffer.is_full)
+        self.assertEqual(4, len(buffer))
+        np.testing.assert_array_equal(buffer.get_window()[:, -4:], self.data[:, :4])
+
+    def test_window_is_read_only_view(self):
+        buffer = WindowBuffer(3, 10)
+        buffer.extend(self.data[:, :15])
+        window = buffer.get_window()
+        self.assertFalse(window.flags.owndata)
+        self.assertFalse(window.flags.writeable)
+
+
+if __name__ == '__main__':
+    unittest.main()
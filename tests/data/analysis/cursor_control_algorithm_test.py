@@ -1,10 +1,11 @@
 import unittest
 
 import numpy as np
-import numpy_ringbuffer
+import scipy.integrate
 
 from scripts.data.analysis import cursor_control_algorithm
-from tests.data.analysis import BCIC_dataset_loader as bdl
+from scripts.data.analysis.normalization import create_hcon_normalizer
+from scripts.data.loader import bcic_dataset_loader as bdl
 
 # constants
 TMIN = 100.0  # Minimum time value shown in the following figures
@@ -54,7 +55,7 @@ def load_bcic_dataset(ch_weight):
 def test_algorithm(chan_data, label_data, used_ch_names):
     """
     - create overlapping sliding windows
-    - Calls the cursor control algorithm
+    - Calls the cursor control algorithm for all windows at once
     - calculate und plot accuracy
     :return: None
     """
@@ -63,20 +64,22 @@ def test_algorithm(chan_data, label_data, used_ch_names):
     found_label = False
     num_valid_sliding_windows = 0
     n_slices = int((TMAX - TMIN - config.window_size) / config.offset_in_percentage)
-    toff = np.zeros(n_slices, dtype=float)
-    label = np.zeros(n_slices, dtype=int)
-    for i in range(n_slices):
-        toff[i] = TMIN + i * config.offset_in_percentage
-        label[i] = label_data[int((TMIN + i * config.offset_in_percentage) * config.sampling_rate)]
-        start_idx = int(toff[i] * config.sampling_rate)
-        stop_idx = int(((toff[i] + config.window_size) * config.sampling_rate) - 1)
-
-        # calls the one and only cursor control algorithm
-        calculated_label = cursor_control_algorithm.perform_algorithm(chan_data[:, start_idx:stop_idx], used_ch_names, config.sampling_rate, data_mdl=config, offset_in_percentage=config.offset_in_percentage)
+    normalizer = create_hcon_normalizer(config.window_size, config.offset_in_percentage)
+    window_samples = int(config.window_size * config.sampling_rate) - 1
+    offset_samples = int(config.offset_in_percentage * config.sampling_rate)
+    start_idx = int(TMIN * config.sampling_rate)
+    stop_idx = start_idx + (n_slices - 1) * offset_samples + window_samples
+    label = label_data[start_idx:stop_idx:offset_samples][:n_slices]
+
+    # calls the one and only cursor control algorithm
+    _, _, calculated_labels = cursor_control_algorithm.perform_algorithm_batch(
+        chan_data[:, start_idx:stop_idx], used_ch_names, config.sampling_rate, data_mdl=config,
+        window_samples=window_samples, offset_samples=offset_samples, normalizer=normalizer)
 
+    for i in range(n_slices):
         # compare the calculated label with the predefined label, if same -> increase accuracy
         if label[i] != -1:
-            if label[i] == calculated_label:
+            if label[i] == calculated_labels[i]:
                 found_label = True
 
         if label[i] != label[i - 1]:
@@ -222,18 +225,230 @@ class TestCursorControlAlgorithm(unittest.TestCase):
         result_with_filter = integrate_psd_values(y, x, freq_range=[8, 12])
         self.assertEqual(result_without_filter, result_with_filter)
 
-    def test_manage_ringbuffer_method(self) -> None:
+
+class TestStandardization(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.window = np.random.default_rng(0).normal(loc=5, scale=3, size=(4, 250))
+        self.window[2] = 0.1  # flat channel
+
+    def test_standardize_data_method(self) -> None:
+        """
+        Tests standardize_data() method with a flat channel
+        Expected result:
+            - each channel is standardized like np.std does it
+            - the flat channel is set to 0 instead of NaN
+        """
+        result = cursor_control_algorithm.standardize_data(self.window)
+        channels = self.window[[0, 1, 3]]
+        expected = (channels - np.mean(channels, axis=1, keepdims=True)) / np.std(channels, axis=1, keepdims=True)
+        np.testing.assert_array_equal(expected, result[[0, 1, 3]])
+        np.testing.assert_array_equal(np.zeros(250), result[2])
+
+    def test_workspace(self) -> None:
+        """
+        Tests standardize_data() method with a workspace
+        Expected result:
+            - the result is written into the workspace and equals the result without workspace
+            - the input window is not modified
+        """
+        window = self.window.copy()
+        workspace = cursor_control_algorithm.Workspace(window.shape)
+        result = cursor_control_algorithm.standardize_data(window, workspace)
+        self.assertIs(workspace.standardized, result)
+        np.testing.assert_array_equal(cursor_control_algorithm.standardize_data(window), result)
+        np.testing.assert_array_equal(self.window, window)
+
+
+class TestSpatialFiltering(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.used_ch_names = ['C3', 'C4', 'FC3', 'FC1', 'FCz', 'FC2', 'FC4', 'CP3', 'CP1', 'CP2', 'CP4']
+        self.samples = np.random.default_rng(0).normal(size=(len(self.used_ch_names), 250))
+
+    def test_calculate_spatial_filtering_method(self) -> None:
+        """
+        Tests calculate_spatial_filtering() method
+        Expected result:
+            - C3 minus the average of FC3, FC1, FCz, CP3, CP1
+            - C4 minus the average of FCz, FC2, FC4, CP2, CP4
+        """
+        samples_c3a, samples_c4a = cursor_control_algorithm.calculate_spatial_filtering(self.samples,
+                                                                                       self.used_ch_names)
+        np.testing.assert_almost_equal(samples_c3a, self.samples[0] - np.mean(self.samples[[2, 3, 4, 7, 8]], axis=0))
+        np.testing.assert_almost_equal(samples_c4a, self.samples[1] - np.mean(self.samples[[4, 5, 6, 9, 10]], axis=0))
+
+    def test_get_laplacian_matrix_method(self) -> None:
+        """
+        Tests get_laplacian_matrix() method
+        Expected result:
+            - the weights of each row sum up to 0
+            - the matrix is cached for the same channel names
+        """
+        weights = cursor_control_algorithm.get_laplacian_matrix(tuple(self.used_ch_names))
+        self.assertEqual((2, len(self.used_ch_names)), weights.shape)
+        np.testing.assert_almost_equal(weights.sum(axis=1), [0, 0])
+        self.assertIs(weights, cursor_control_algorithm.get_laplacian_matrix(tuple(self.used_ch_names)))
+
+
+class TestBurg(unittest.TestCase):
+
+    def setUp(self) -> None:
+        from scipy import signal
+        self.ar_coefficients = [1, -1.5, 0.8]
+        noise = np.random.default_rng(0).normal(size=(2, 20000))
+        self.samples = signal.lfilter([1], self.ar_coefficients, noise)
+
+    def test_calculate_burg_coefficients_method(self) -> None:
+        """
+        Tests calculate_burg_coefficients() method
+        Expected result:
+            - the coefficients and the noise variance of a known AR(2) process are recovered for each channel
+        """
+        ar_coefficients, variance = cursor_control_algorithm.calculate_burg_coefficients(self.samples, 2)
+        np.testing.assert_allclose(ar_coefficients, [self.ar_coefficients] * 2, atol=0.02)
+        np.testing.assert_allclose(variance, [1, 1], atol=0.05)
+
+    def test_perform_burg_method(self) -> None:
+        """
+        Tests perform_burg() method
+        Expected result:
+            - the psd is evaluated on the grid in between F_MIN and F_MAX for each channel
+            - a single channel returns a 1-dim psd
+        """
+        psd, freqs = cursor_control_algorithm.perform_burg(self.samples[:, :50], 250, 8, 12, order=4)
+        self.assertEqual((2, len(freqs)), psd.shape)
+        self.assertEqual((8, 12), (freqs[0], freqs[-1]))
+        self.assertTrue(np.all(psd > 0))
+        single_psd, _ = cursor_control_algorithm.perform_burg(self.samples[0, :50], 250, 8, 12, order=4)
+        np.testing.assert_allclose(single_psd, psd[0])
+
+
+class TestCursorControlPipeline(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.used_ch_names = ['C3', 'C4', 'FC3', 'FC1', 'FC2', 'FC4', 'CP3', 'CP1', 'CP2', 'CP4']
+        rng = np.random.default_rng(0)
+        self.samples = rng.normal(size=(len(self.used_ch_names), 250 * 20))
+        # alternating mu rhythm on C3 and C4
+        t = np.arange(self.samples.shape[1]) / 250
+        envelope = (np.sin(2 * np.pi * 0.25 * t) > 0).astype(float)
+        self.samples[0] += 3 * envelope * np.sin(2 * np.pi * 10 * t)
+        self.samples[1] += 3 * (1 - envelope) * np.sin(2 * np.pi * 10 * t)
+        self.data_mdl = ConfigData()
+        self.data_mdl.threshold = 0.5
+
+    def create_pipeline(self, psd_method, **kwargs):
+        from scripts.data.analysis.normalization import NORMALIZATION_MODE, RunningNormalizer
+        return cursor_control_algorithm.CursorControlPipeline(
+            self.used_ch_names, 250, self.data_mdl, RunningNormalizer(NORMALIZATION_MODE.calibration, 200),
+            psd_method=psd_method, emit_events=False, **kwargs)
+
+    def test_process_batch_method(self) -> None:
+        """
+        Tests process_batch() method
+        Expected result:
+            - the labels of the batch evaluation are the same as the labels of the window by window evaluation
+            - independent pipelines with different psd methods don't interfere
+        """
+        methods = list(cursor_control_algorithm.PSD_METHOD)
+        pipelines = [self.create_pipeline(method) for method in methods]
+        labels = [[] for _ in methods]
+        for start in range(0, self.samples.shape[1] - 249, 25):
+            for i, pipeline in enumerate(pipelines):
+                labels[i].append(pipeline.process(self.samples[:, start:start + 250], new_samples=25))
+        for i, method in enumerate(methods):
+            _, _, batch_labels = self.create_pipeline(method).process_batch(self.samples, 250, 25, chunk_size=50)
+            np.testing.assert_array_equal(labels[i], batch_labels, err_msg=method.name)
+            self.assertIn(0, batch_labels)
+            self.assertIn(1, batch_labels)
+
+    def test_telemetry(self) -> None:
+        """
+        Tests the telemetry records of process()
+        Expected result:
+            - one record per window with the hcon values and the label of the window
+        """
+        from scripts.utils.telemetry import create_telemetry_ring
+        telemetry = create_telemetry_ring()
+        reader = telemetry.reader()
+        pipeline = self.create_pipeline(cursor_control_algorithm.PSD_METHOD.multitaper)
+        labels = [pipeline.process(self.samples[:, start:start + 250], new_samples=25, telemetry=telemetry)
+                  for start in range(0, 250 * 5, 25)]
+        records = reader.read()
+        hcon, standardized_hcon, _ = self.create_pipeline(cursor_control_algorithm.PSD_METHOD.multitaper) \
+            .process_batch(self.samples[:, :250 * 5 + 225], 250, 25)
+        np.testing.assert_array_equal(labels, records['label'])
+        np.testing.assert_allclose(hcon, records['hcon'])
+        np.testing.assert_allclose(standardized_hcon, records['hcon_stand'])
+        np.testing.assert_allclose(hcon, records['c4_pow'] - records['c3_pow'])
+        self.assertEqual(0, reader.dropped)
+
+    def test_flat_channel(self) -> None:
+        """
+        Tests a flat channel with an offset
+        Expected result:
+            - the sliding dft standardizes the flat channel to 0 like the standardization of the samples, so its
+              band powers equal the ones of the periodogram
+        """
+        from scripts.utils.telemetry import create_telemetry_ring
+        samples = self.samples.copy()
+        samples[3] = 123.4567
+        telemetry = {method: create_telemetry_ring() for method in (cursor_control_algorithm.PSD_METHOD.periodogram,
+                                                                     cursor_control_algorithm.PSD_METHOD.sliding_dft)}
+        readers = {method: ring.reader() for method, ring in telemetry.items()}
+        for method, ring in telemetry.items():
+            pipeline = self.create_pipeline(method)
+            for start in range(0, 250 * 5, 25):
+                pipeline.process(samples[:, start:start + 250], new_samples=25, telemetry=ring)
+        expected, records = [reader.read() for reader in readers.values()]
+        np.testing.assert_allclose(expected['c3_pow'], records['c3_pow'], rtol=1e-7)
+        np.testing.assert_allclose(expected['c4_pow'], records['c4_pow'], rtol=1e-7)
+
+    def test_band_powers(self) -> None:
+        """
+        Tests the additional bands of the pipeline
+        Expected result:
+            - the labels don't change if additional bands are integrated from the same spectrum
+            - the band powers equal the integral over the psd of each band
+        """
+        bands = {'mu': (8, 12), 'beta': (13, 30)}
+        for method in cursor_control_algorithm.PSD_METHOD:
+            pipeline = self.create_pipeline(method)
+            multi_band_pipeline = self.create_pipeline(method, bands=bands)
+            for start in range(0, self.samples.shape[1] - 249, 25):
+                window = self.samples[:, start:start + 250]
+                self.assertEqual(pipeline.process(window, new_samples=25),
+                                 multi_band_pipeline.process(window, new_samples=25), msg=method.name)
+            self.assertEqual(set(bands), set(multi_band_pipeline.band_powers))
+            self.assertEqual((2,), np.shape(multi_band_pipeline.band_powers['beta']))
+
+        pipeline = self.create_pipeline(cursor_control_algorithm.PSD_METHOD.periodogram, bands=bands)
+        samples = pipeline.spatial_filter @ np.asarray([cursor_control_algorithm.standardize_data(channel)
+                                                   for channel in self.samples[:, :250]])
+        pipeline.process(self.samples[:, :250])
+        freqs, psds = cursor_control_algorithm.perform_periodogram(samples, 250)
+        in_band = (freqs >= 13) & (freqs <= 30)
+        np.testing.assert_allclose(pipeline.band_powers['beta'],
+                                   scipy.integrate.trapezoid(psds[:, in_band], freqs[in_band], axis=-1))
+
+    def test_get_band_bins_method(self) -> None:
         """
-        Tests manage_ringbuffer() method, especially the Singleton behaviour
+        Tests get_band_bins() method
         Expected result:
-            - manage_ringbuffer() should return a numpy_ringbuffer.RingBuffer object
-            - multiple manage_ringbuffer() calls should return the same ringbuffer object
+            - the bins of the band are a slice of the rfft bins, which is cached per window length, sampling rate
+              and band
         """
-        from scripts.data.analysis.cursor_control_algorithm import manage_ringbuffer
-        r1 = manage_ringbuffer(1.0, 0.05)
-        self.assertTrue(type(r1) == numpy_ringbuffer.RingBuffer)  # object should be a numpy_ringbuffer.RingBuffer
-        r2 = manage_ringbuffer(1.0, 0.05)
-        self.assertEqual(id(r2), id(r1))  # ringbuffer r1 should be the same as ringbuffer r2
+        freqs = np.fft.rfftfreq(250, 1 / 250)
+        bins = cursor_control_algorithm.get_band_bins(250, 250, 8, 12)
+        np.testing.assert_array_equal([8, 9, 10, 11, 12], freqs[bins])
+        self.assertIs(bins, cursor_control_algorithm.get_band_bins(250, 250, 8, 12))
+        # the bins of a grid which starts above 0 Hz are shifted (e.g. multitaper)
+        psds = np.arange(len(freqs), dtype=float)
+        np.testing.assert_allclose(
+            cursor_control_algorithm.integrate_psd_values(psds, freqs, freq_range=(8, 12)),
+            cursor_control_algorithm.integrate_psd_values(psds[5:40], freqs[5:40], freq_range=(8, 12), n_fft=250,
+                                                          sfreq=250))
 
 
 if __name__ == '__main__':
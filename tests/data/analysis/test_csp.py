@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from scripts.data.analysis import csp
+from scripts.data.analysis.cursor_control_algorithm import CursorControlPipeline, PSD_METHOD
+from scripts.data.analysis.normalization import NORMALIZATION_MODE, RunningNormalizer
+from scripts.data.extraction.trial_handler import Labels
+from scripts.mvc.models import ConfigData
+
+
+class TestCSP(unittest.TestCase):
+
+    def setUp(self):
+        self.channel_names = ['C3', 'Cz', 'C4', 'FC1', 'FC2', 'CP1', 'CP2']
+        self.sampling_rate = 125
+        rng = np.random.default_rng(0)
+        n_trials, trial_samples, pause_samples = 20, 4 * self.sampling_rate, self.sampling_rate
+        n_samples = n_trials * (trial_samples + pause_samples) + pause_samples
+        self.raw_data = rng.normal(size=(len(self.channel_names), n_samples))
+        # mu rhythm, which is mixed into all channels: on C4 during LEFT and on C3 during RIGHT trials
+        t = np.arange(n_samples) / self.sampling_rate
+        self.positions = pause_samples + np.arange(n_trials) * (trial_samples + pause_samples)
+        self.labels = np.arange(n_trials) % 2
+        mixing = rng.uniform(0.2, 0.5, size=len(self.channel_names))
+        for position, label in zip(self.positions, self.labels):
+            source = 2 * np.sin(2 * np.pi * 10 * t[position:position + trial_samples])
+            self.raw_data[:, position:position + trial_samples] += mixing[:, np.newaxis] * source
+            self.raw_data[0 if label == Labels.RIGHT.value else 2, position:position + trial_samples] += 2 * source
+        self.durations = np.full(n_trials, trial_samples)
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.session_path = os.path.join(self.directory.name, 'session.npz')
+        meta = {'sampling_rate': self.sampling_rate, 'channels': self.channel_names}
+        np.savez(self.session_path, meta=np.asarray(list(meta.items()), dtype=object), raw_data=self.raw_data,
+                 event_type=np.asarray([Labels(label) for label in self.labels]), event_pos=self.positions,
+                 event_duration=self.durations)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_extract_epochs(self):
+        """The epochs equal a loop over the trials, the incomplete epoch at the end of a trial is cut off"""
+        positions, durations = np.array([10, 100, 395]), np.array([50, 35, 20])
+        epochs, trials = csp.extract_epochs(self.raw_data, positions, durations, 20)
+        expected = [self.raw_data[:, position + i * 20:position + (i + 1) * 20]
+                    for position, duration in zip(positions, durations) for i in range(duration // 20)]
+        np.testing.assert_array_equal(np.asarray(expected), epochs)
+        np.testing.assert_array_equal([0, 0, 1, 2], trials)
+
+    def test_train_and_apply(self):
+        """The trained filters separate the trials online"""
+        filters, eigenvalues, channel_names = csp.train_csp_from_sessions([self.session_path])
+        # the used channels of the config (Cz has the weight 0)
+        self.assertEqual(['C3', 'C4', 'FC1', 'FC2', 'CP1', 'CP2'], channel_names)
+        self.assertEqual((2, len(channel_names)), filters.shape)
+        self.assertLess(eigenvalues[0], 0.5)
+        self.assertGreater(eigenvalues[1], 0.5)
+
+        filter_path = os.path.join(self.directory.name, 'filters.npz')
+        csp.save_csp_filters(filter_path, filters, eigenvalues, channel_names)
+        reordered_names = channel_names[::-1]
+        np.testing.assert_array_equal(filters[:, ::-1], csp.load_csp_filters(filter_path, reordered_names))
+        with self.assertRaises(ValueError):
+            csp.load_csp_filters(filter_path, channel_names[:-1])
+
+        data_mdl = ConfigData(threshold=0.5)
+        pipeline = CursorControlPipeline(channel_names, self.sampling_rate, data_mdl,
+                                         RunningNormalizer(NORMALIZATION_MODE.calibration, 200),
+                                         psd_method=PSD_METHOD.periodogram, emit_events=False,
+                                         spatial_filter=csp.load_csp_filters(filter_path, channel_names))
+        chan_data = self.raw_data[[self.channel_names.index(name) for name in channel_names]]
+        _, _, window_labels = pipeline.process_batch(chan_data, self.sampling_rate, self.sampling_rate)
+        # label of the windows, which are completely within a trial
+        window_starts = np.arange(len(window_labels)) * self.sampling_rate
+        correct, total = 0, 0
+        for position, duration, label in zip(self.positions, self.durations, self.labels):
+            in_trial = (window_starts >= position) & (window_starts + self.sampling_rate <= position + duration)
+            correct += np.count_nonzero(window_labels[in_trial] == label)
+            total += np.count_nonzero(in_trial)
+        self.assertGreater(correct / total, 0.8)
+
+
+if __name__ == '__main__':
+    unittest.main()
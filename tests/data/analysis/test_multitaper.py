@@ -0,0 +1,35 @@
+import unittest
+
+import mne
+import numpy as np
+
+from scripts.data.analysis.multitaper import get_tapers, psd_multitaper
+
+
+class TestMultitaper(unittest.TestCase):
+
+    def setUp(self):
+        self.samples = np.random.default_rng(0).normal(size=(2, 250))
+
+    def test_matches_mne(self):
+        for fmin, fmax in [(8, 12), (0, 125), (8, 30)]:
+            expected, expected_freqs = mne.time_frequency.psd_array_multitaper(
+                self.samples, sfreq=250, bandwidth=fmax - fmin, fmin=fmin, fmax=fmax, verbose=False)
+            psds, freqs = psd_multitaper(self.samples, 250, fmax - fmin, fmin, fmax)
+            np.testing.assert_allclose(psds, expected, rtol=1e-8)
+            np.testing.assert_array_equal(freqs, expected_freqs)
+
+    def test_single_channel(self):
+        psds, freqs = psd_multitaper(self.samples[0], 250, 4, 8, 12)
+        batch_psds, _ = psd_multitaper(self.samples, 250, 4, 8, 12)
+        self.assertEqual((len(freqs),), psds.shape)
+        np.testing.assert_allclose(psds, batch_psds[0])
+
+    def test_tapers_are_cached(self):
+        self.assertIs(get_tapers(250, 4, 250), get_tapers(250, 4, 250))
+        with self.assertRaises(ValueError):
+            get_tapers(250, 0.5, 250)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+
+from scripts.data.analysis.normalization import NORMALIZATION_MODE, RunningNormalizer, create_hcon_normalizer
+
+
+class TestRunningNormalizer(unittest.TestCase):
+
+    def setUp(self):
+        self.values = np.random.default_rng(0).normal(loc=3, scale=2, size=500)
+
+    def test_calibration(self):
+        """The statistics of the first capacity values are frozen"""
+        normalizer = RunningNormalizer(NORMALIZATION_MODE.calibration, capacity=100)
+        for value in self.values:
+            normalizer.update(value)
+        self.assertTrue(normalizer.is_frozen)
+        self.assertAlmostEqual(np.mean(self.values[:100]), normalizer.mean)
+        self.assertAlmostEqual(np.std(self.values[:100]), normalizer.std)
+        self.assertAlmostEqual((5 - normalizer.mean) / normalizer.std, normalizer.standardize(5))
+
+    def test_sliding(self):
+        """The statistics contain the newest capacity values"""
+        normalizer = RunningNormalizer(NORMALIZATION_MODE.sliding, capacity=64)
+        for i, value in enumerate(self.values):
+            normalizer.update(value)
+            window = self.values[max(0, i - 63):i + 1]
+            self.assertAlmostEqual(np.mean(window), normalizer.mean)
+            self.assertAlmostEqual(np.std(window), normalizer.std)
+
+    def test_exponential(self):
+        """The statistics follow a shifted stream"""
+        normalizer = RunningNormalizer(NORMALIZATION_MODE.exponential, capacity=50)
+        for value in np.concatenate((self.values, self.values + 100)):
+            normalizer.update(value)
+        self.assertAlmostEqual(103, normalizer.mean, delta=1.5)
+        self.assertAlmostEqual(2, normalizer.std, delta=0.5)
+
+    def test_constant_values(self):
+        normalizer = RunningNormalizer(NORMALIZATION_MODE.calibration, capacity=10)
+        normalizer.update(1.0)
+        normalizer.update(1.0)
+        self.assertEqual(0, normalizer.standardize(1.0))
+
+    def test_create_hcon_normalizer(self):
+        # windows of 1 s with an offset of 40 ms within 30 s
+        self.assertEqual(726, create_hcon_normalizer(1.0, 0.04).capacity)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+from scipy import signal
+
+from scripts.data.analysis.sliding_dft import SlidingDFT
+
+
+class TestSlidingDFT(unittest.TestCase):
+
+    def setUp(self):
+        self.stream = np.random.default_rng(0).normal(loc=100, scale=10, size=(4, 5000))
+        self.weights = np.array([[1, 0, -0.5, -0.5], [0, 1, -0.5, -0.5]])
+
+    def test_matches_periodogram(self):
+        """The psd of the tracked windows equals the periodogram of the standardized, spatially filtered windows"""
+        sliding_dft = SlidingDFT(resync_interval=50)
+        n_samples, start = 250, 0
+        for offset in [250] + [10, 1, 7, 25] * 40:
+            start += offset
+            window = self.stream[:, start - n_samples:start]
+            psds, freqs = sliding_dft.psd(window, self.weights, offset, 250, 8, 30)
+            standardized = (window - window.mean(axis=1, keepdims=True)) / window.std(axis=1, keepdims=True)
+            expected_freqs, expected = signal.periodogram(self.weights @ standardized, 250)
+            band = (expected_freqs >= 8) & (expected_freqs <= 30)
+            np.testing.assert_allclose(psds, expected[:, band], rtol=1e-7, atol=1e-12)
+            np.testing.assert_array_equal(freqs, expected_freqs[band])
+
+    def test_drifting_offset(self):
+        """The running mean and standard deviation stay accurate for a large, drifting offset"""
+        stream = self.stream + 1e5 + np.linspace(0, 1e4, self.stream.shape[1])
+        sliding_dft = SlidingDFT()
+        for start in range(250, 5000, 25):
+            window = stream[:, start - 250:start]
+            psds, _ = sliding_dft.psd(window, self.weights, 25, 250, 8, 30)
+        standardized = (window - window.mean(axis=1, keepdims=True)) / window.std(axis=1, keepdims=True)
+        expected_freqs, expected = signal.periodogram(self.weights @ standardized, 250)
+        band = (expected_freqs >= 8) & (expected_freqs <= 30)
+        self.assertEqual(189, sliding_dft.updates_since_sync)
+        np.testing.assert_allclose(psds, expected[:, band], rtol=1e-7)
+
+    def test_resync(self):
+        sliding_dft = SlidingDFT(resync_interval=3)
+        for start in range(250, 310, 10):
+            sliding_dft.update(self.stream[:, start - 250:start], 10, 250, 8, 12)
+        self.assertEqual(1, sliding_dft.updates_since_sync)
+        # a changed window layout starts from scratch
+        sliding_dft.update(self.stream[:, :125], 10, 125, 8, 12)
+        self.assertEqual(0, sliding_dft.updates_since_sync)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+
+from scripts.data.acquisition.synthetic_board import SyntheticBoard
+from scripts.data.analysis.cursor_control_algorithm import PSD_METHOD
+from scripts.data.analysis.sweep import Session, calculate_trial_accuracy, get_trials, run_sweep
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.channel_names = ['C3', 'C4', 'FC3', 'FC1', 'FC2', 'FC4', 'CP3', 'CP1', 'CP2', 'CP4']
+        # no trial during the calibration of the normalization
+        schedule = [('rest', 10)] + [('left', 4), ('right', 4)] * 6
+        board = SyntheticBoard(self.channel_names, 250, noise=1, mu_amplitude=3, erd=1, schedule=schedule, seed=0)
+        n_samples = 250 * sum(duration for _, duration in schedule)
+        self.chan_data = board.generate(n_samples)
+        # the schedule of the board is named after the game directions of the pipeline
+        label_values = {'rest': -1, 'left': 0, 'right': 1}
+        self.labels = np.array([label_values[board.get_label(i)] for i in range(n_samples)], dtype=np.int8)
+
+    def test_get_trials(self):
+        labels = np.array([-1, 0, 0, 1, 1, 1, -1, 0])
+        self.assertEqual([(1, 3, 0), (3, 6, 1), (7, 8, 0)], [tuple(int(v) for v in trial) for trial in get_trials(labels)])
+
+    def test_calculate_trial_accuracy(self):
+        trials = [(0, 10, 0), (10, 20, 1), (20, 30, 1)]
+        window_ends = np.arange(0, 30, 2)
+        window_labels = np.array([0, 0, 1, -1, 0, 1, 1, -1, -1, 0, -1, -1, -1, -1, -1])
+        # the third trial contains no movement
+        self.assertAlmostEqual(2 / 3, calculate_trial_accuracy(window_labels, window_ends, trials))
+
+    def test_run_sweep(self):
+        """The band which contains the mu rhythm is ranked before the band without it"""
+        session = Session('synthetic', self.chan_data, self.labels, 250, self.channel_names)
+        try:
+            ranked = run_sweep([session], [self.channel_names], [1000], [200], [(8, 12), (20, 30)], [0.5, 1],
+                               psd_method=PSD_METHOD.periodogram, processes=1)
+        finally:
+            session.close()
+        self.assertEqual(4, len(ranked))
+        self.assertEqual((8, 12), (ranked[0]['f_min'], ranked[0]['f_max']))
+        self.assertGreater(ranked[0]['accuracy'], 0.8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 
 import numpy as np
@@ -53,6 +55,21 @@ class MyTestCase(unittest.TestCase):
         self.assertEqual(None, chan_data)
         self.assertEqual(None, chan_label)
 
+    def test_load_raw_data(self):
+        raw_data = game_dataset_loader.load_raw_data('../../../scripts/data/session/test_loader.npz')
+        self.assertIsInstance(raw_data, np.memmap)
+        expected = np.load('../../../scripts/data/session/test_loader.npz', allow_pickle=True)['raw_data']
+        np.testing.assert_array_equal(expected, raw_data)
+
+    def test_load_raw_data_compressed(self):
+        data = np.arange(12, dtype=float).reshape(3, 4)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'compressed.npz')
+            np.savez_compressed(path, raw_data=data)
+            raw_data = game_dataset_loader.load_raw_data(path)
+            self.assertNotIsInstance(raw_data, np.memmap)
+            np.testing.assert_array_equal(data, raw_data)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,74 @@
+import multiprocessing
+import sys
+import time
+import types
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from scripts.data.visualisation import dashboard_process
+from scripts.data.visualisation.dashboard_process import DashboardProcess, run_dashboard, shift
+from scripts.utils.shared_ring import SharedRing
+from scripts.utils.telemetry import create_telemetry_ring
+
+
+class TestDashboardProcess(unittest.TestCase):
+
+    def setUp(self):
+        self.telemetry_ring = create_telemetry_ring(shared=True)
+        self.sample_ring = SharedRing(50, record_shape=(3,))
+
+    def tearDown(self):
+        self.telemetry_ring.close()
+        self.sample_ring.close()
+
+    def test_shift(self):
+        data = np.arange(5.0)
+        shift(data, np.array([10.0, 11.0]))
+        np.testing.assert_array_equal([2, 3, 4, 10, 11], data)
+        shift(data, np.array([]))
+        np.testing.assert_array_equal([2, 3, 4, 10, 11], data)
+        shift(data, np.arange(5.0))
+        np.testing.assert_array_equal(np.arange(5.0), data)
+
+    def test_shift_records(self):
+        data = np.zeros(4, dtype=self.telemetry_ring.dtype)
+        records = np.zeros(1, dtype=self.telemetry_ring.dtype)
+        records['label'] = 1
+        shift(data, records)
+        np.testing.assert_array_equal([0, 0, 0, 1], data['label'])
+
+    def test_run_dashboard(self):
+        """The dashboard reads the attached rings and detaches them when its window is closed"""
+        self.sample_ring.write(np.ones((5, 3)))
+        attached = dict()
+
+        def start_liveplot(telemetry, samples, channel_names, sampling_rate, stop_event):
+            attached.update(telemetry=telemetry, samples=samples)
+            np.testing.assert_array_equal(np.ones((5, 3)), samples.reader(from_start=True).read())
+            self.assertEqual(['C3', 'C4', 'Cz'], channel_names)
+
+        liveplot = types.SimpleNamespace(start_liveplot=start_liveplot)
+        with mock.patch.dict(sys.modules, {'scripts.data.visualisation.liveplot': liveplot}):
+            run_dashboard(self.telemetry_ring.spec, self.sample_ring.spec, ['C3', 'C4', 'Cz'], 125, None)
+        self.assertIsNone(attached['telemetry'].spec['name'])
+        self.assertIsNone(attached['samples'].spec['name'])
+        # the rings of the writer are still usable
+        self.sample_ring.write(np.zeros((1, 3)))
+        self.assertEqual(6, self.sample_ring.write_count)
+
+    def test_join_terminates_hung_dashboard(self):
+        dashboard = DashboardProcess(self.telemetry_ring, self.sample_ring, ['C3', 'C4', 'Cz'], 125)
+        # a dashboard which ignores the stop event
+        dashboard.process = multiprocessing.get_context('spawn').Process(target=time.sleep, args=(60,), daemon=True)
+        dashboard.start()
+        start = time.perf_counter()
+        with mock.patch.object(dashboard_process, 'JOIN_TIMEOUT', 0.5):
+            dashboard.join()
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertFalse(dashboard.process.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
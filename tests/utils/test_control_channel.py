@@ -0,0 +1,51 @@
+import threading
+import unittest
+
+from scripts.utils.control_channel import ControlChannel
+
+
+class TestControlChannel(unittest.TestCase):
+
+    def setUp(self):
+        self.channel = ControlChannel()
+
+    def test_coalescing(self):
+        self.assertIsNone(self.channel.receive())
+        self.channel.send(0)
+        self.channel.send(1)
+        self.assertEqual(1, self.channel.receive().label)
+        self.assertIsNone(self.channel.receive())
+        self.assertEqual(1, self.channel.coalesced)
+
+    def test_send_from_threads(self):
+        """Commands of several threads are neither lost nor duplicated"""
+        received = []
+
+        def send():
+            for i in range(1000):
+                self.channel.send(i % 2)
+
+        threads = [threading.Thread(target=send) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            command = self.channel.receive()
+            if command is not None:
+                received.append(command)
+        for thread in threads:
+            thread.join()
+        command = self.channel.receive()
+        if command is not None:
+            received.append(command)
+        self.assertEqual(4000, self.channel.sent)
+        self.assertEqual(4000, len(received) + self.channel.coalesced)
+
+    def test_clear(self):
+        self.channel.send(0)
+        self.channel.clear()
+        self.assertIsNone(self.channel.receive())
+        self.assertEqual(0, self.channel.sent)
+
+
+if __name__ == '__main__':
+    unittest.main()
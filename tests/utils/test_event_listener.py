@@ -0,0 +1,67 @@
+import gc
+import time
+import unittest
+
+from scripts.utils.event_listener import EventBus
+
+
+class Receiver:
+
+    def __init__(self):
+        self.count = 0
+
+    def receive(self):
+        self.count += 1
+
+
+class TestEventBus(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = EventBus()
+
+    def test_unsubscribe(self):
+        receiver = Receiver()
+        subscription = self.bus.subscribe('event', receiver.receive)
+        self.bus.post_event('event')
+        subscription.unsubscribe()
+        subscription.unsubscribe()
+        self.bus.post_event('event')
+        self.assertEqual(1, receiver.count)
+        self.assertEqual(0, self.bus.subscriber_count('event'))
+
+    def test_weak_reference(self):
+        """Subscriptions of bound methods end when the object is garbage collected"""
+        receiver = Receiver()
+        self.bus.subscribe('event', receiver.receive)
+        self.assertEqual(1, self.bus.subscriber_count('event'))
+        del receiver
+        gc.collect()
+        self.assertEqual(0, self.bus.subscriber_count('event'))
+        self.bus.post_event('event')
+
+    def test_functions_are_referenced_strongly(self):
+        calls = []
+        self.bus.subscribe('event', lambda: calls.append(1))
+        gc.collect()
+        self.bus.post_event('event')
+        self.bus.post_event('other event')
+        self.assertEqual([1], calls)
+
+    def test_rate_limit(self):
+        receiver = Receiver()
+        self.bus.subscribe('event', receiver.receive)
+        self.bus.set_rate_limit('event', 10)
+        for _ in range(5):
+            self.bus.post_event('event')
+        self.assertEqual(1, receiver.count)
+        time.sleep(0.11)
+        self.bus.post_event('event')
+        self.assertEqual(2, receiver.count)
+        self.bus.set_rate_limit('event', None)
+        for _ in range(5):
+            self.bus.post_event('event')
+        self.assertEqual(7, receiver.count)
+
+
+if __name__ == '__main__':
+    unittest.main()
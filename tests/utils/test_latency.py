@@ -0,0 +1,50 @@
+import time
+import unittest
+
+import numpy as np
+
+from scripts.utils.latency import LatencyRecorder, Stage
+
+
+class TestLatencyRecorder(unittest.TestCase):
+
+    def test_record_stages(self):
+        recorder = LatencyRecorder(capacity=10)
+        start = time.perf_counter()
+        recorder.begin(start)
+        for stage in (Stage.standardization, Stage.spatial_filtering, Stage.post_event):
+            recorder.mark(stage)
+        recorder.mark_draw()
+        record = recorder.records[0]
+        self.assertEqual(record[Stage.acquisition], start)
+        self.assertTrue(np.all(np.diff(record[[Stage.acquisition, Stage.window_emit, Stage.standardization,
+                                               Stage.spatial_filtering, Stage.post_event,
+                                               Stage.player_draw]]) >= 0))
+        # stages which were not reached stay NaN
+        self.assertTrue(np.isnan(record[Stage.spectral_analysis]))
+        # a draw without a new event is not recorded
+        draw_time = record[Stage.player_draw]
+        recorder.mark_draw()
+        self.assertEqual(recorder.records[0, Stage.player_draw], draw_time)
+
+    def test_ring(self):
+        recorder = LatencyRecorder(capacity=4)
+        for i in range(10):
+            recorder.begin(float(i), float(i) + 0.001)
+        self.assertEqual(recorder.count, 10)
+        self.assertEqual(sorted(recorder.records[:, Stage.acquisition]), [6, 7, 8, 9])
+        summary = recorder.summary()
+        np.testing.assert_allclose(summary['window_emit'], (1, 1, 1), rtol=1e-6)
+        self.assertTrue(np.all(np.isnan(summary['player_draw'])))
+
+    def test_disabled(self):
+        recorder = LatencyRecorder(capacity=4, enabled=False)
+        recorder.begin(0.0)
+        recorder.mark(Stage.post_event)
+        recorder.mark_draw()
+        self.assertEqual(recorder.count, 0)
+        self.assertTrue(np.all(np.isnan(recorder.records)))
+
+
+if __name__ == '__main__':
+    unittest.main()
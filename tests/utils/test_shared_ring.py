@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+
+from scripts.utils.shared_ring import SharedRing
+
+
+class InterruptedRecords(np.ndarray):
+    """Records of a ring, which call on_write after the first assignment to simulate a reader during a write"""
+    on_write = None
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if self.on_write is not None:
+            on_write, self.on_write = self.on_write, None
+            on_write()
+
+
+class TestSharedRing(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = SharedRing(10, record_shape=(2,))
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_read_new_records(self):
+        reader = self.ring.reader()
+        self.ring.write(np.ones((3, 2)))
+        self.ring.write(np.full((4, 2), 2.0))
+        np.testing.assert_array_equal([1, 1, 1, 2, 2, 2, 2], reader.read()[:, 0])
+        self.assertEqual(0, len(reader.read()))
+        self.assertEqual(0, reader.dropped)
+
+    def test_dropped_records(self):
+        reader = self.ring.reader()
+        self.ring.write(np.arange(24.0).reshape(12, 2))
+        self.ring.write(np.arange(6.0).reshape(3, 2))
+        records = reader.read()
+        np.testing.assert_array_equal([10, 12, 14, 16, 18, 20, 22, 0, 2, 4], records[:, 0])
+        self.assertEqual(5, reader.dropped)
+
+    def test_read_during_write(self):
+        """A reader which is exactly capacity behind skips the slots of a concurrent write"""
+        reader = self.ring.reader()
+        self.ring.write(np.arange(20.0).reshape(10, 2))
+        records = self.ring._SharedRing__records.view(InterruptedRecords)
+        self.ring._SharedRing__records = records
+        result = dict()
+        records.on_write = lambda: result.update(records=reader.read())
+        self.ring.write(np.full((3, 2), -1.0))
+        # the first 3 slots were already overwritten, but the write counter was not incremented yet
+        np.testing.assert_array_equal(np.arange(6.0, 20.0, 2), result['records'][:, 0])
+        self.assertEqual(3, reader.dropped)
+        np.testing.assert_array_equal([-1, -1, -1], reader.read()[:, 0])
+
+    def test_independent_readers(self):
+        reader1 = self.ring.reader()
+        self.ring.write(np.ones((3, 2)))
+        reader2 = self.ring.reader()
+        self.ring.write(np.zeros((2, 2)))
+        self.assertEqual(5, len(reader1.read()))
+        self.assertEqual(2, len(reader2.read()))
+
+    def test_attach(self):
+        attached = SharedRing.attach(self.ring.spec)
+        reader = attached.reader()
+        self.ring.write(np.ones((3, 2)))
+        np.testing.assert_array_equal(np.ones((3, 2)), reader.read())
+        attached.close()
+
+    def test_structured_records(self):
+        ring = SharedRing(4, dtype=[('time', 'f8'), ('label', 'i1')], shared=False)
+        reader = ring.reader()
+        ring.write(np.array([(1.0, 0), (2.0, 1)], dtype=ring.dtype))
+        records = reader.read()
+        np.testing.assert_array_equal([0, 1], records['label'])
+
+
+if __name__ == '__main__':
+    unittest.main()